@@ -0,0 +1,68 @@
+"""Times dispatching on a string over twelve cases, with a chain of ifs
+that tests them one after the other and with a match on literals, which
+jumps through a table, in the tree-walker with tiering off and in the
+closure compiler.
+
+Run from the repository root: python benchmarks/dispatch.py
+"""
+
+from harness import main
+
+PROGRAMS = {
+    "if chain": """
+fn step(op, x) {
+    if op == 'a': return x + 1;
+    if op == 'b': return x + 2;
+    if op == 'c': return x + 3;
+    if op == 'd': return x + 4;
+    if op == 'e': return x + 5;
+    if op == 'f': return x + 6;
+    if op == 'g': return x + 7;
+    if op == 'h': return x + 8;
+    if op == 'i': return x + 9;
+    if op == 'j': return x + 10;
+    if op == 'k': return x + 11;
+    if op == 'l': return x + 12;
+    return x;
+}
+let total = 0;
+for let i = 0; i < 6000; i++ {
+    let op = "l";
+    if i % 2 == 0: op = "f";
+    if i % 3 == 0: op = "a";
+    total = step(op, total);
+}
+echo total;
+""",
+    "match": """
+fn step(op, x) {
+    match op {
+        'a' -> return x + 1;
+        'b' -> return x + 2;
+        'c' -> return x + 3;
+        'd' -> return x + 4;
+        'e' -> return x + 5;
+        'f' -> return x + 6;
+        'g' -> return x + 7;
+        'h' -> return x + 8;
+        'i' -> return x + 9;
+        'j' -> return x + 10;
+        'k' -> return x + 11;
+        'l' -> return x + 12;
+    }
+    return x;
+}
+let total = 0;
+for let i = 0; i < 6000; i++ {
+    let op = "l";
+    if i % 2 == 0: op = "f";
+    if i % 3 == 0: op = "a";
+    total = step(op, total);
+}
+echo total;
+""",
+}
+
+
+if __name__ == "__main__":
+    main(PROGRAMS)
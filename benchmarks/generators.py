@@ -0,0 +1,65 @@
+"""Times keeping the even numbers below 20000 and summing their squares
+with one loop that does everything inline, with a pipeline of two
+generators fed by range, and with the same pipeline behind three more
+generators that only pass values on, in the tree-walker with tiering off
+and in the closure compiler. Every stage of a pipeline resumes a suspended
+body per value instead of building an intermediate collection.
+
+Run from the repository root: python benchmarks/generators.py
+"""
+
+from harness import main
+
+PROGRAMS = {
+    "counting for": """
+let total = 0;
+for let i = 0; i < 100000; i++ {
+    total = total + i;
+}
+echo total;
+""",
+    "for in range": """
+let total = 0;
+for i in range(0, 100000) {
+    total = total + i;
+}
+echo total;
+""",
+}
+
+PROGRAMS = {
+    "inline": """
+let total = 0;
+for x in range(0, 20000) {
+    if x % 2 == 0: total += x * x;
+}
+echo total;
+""",
+    "pipeline": """
+fn evens(source) {
+    for x in source {
+        if x % 2 == 0: yield x;
+    }
+}
+fn squares(source) { for x in source yield x * x; }
+let total = 0;
+for x in squares(evens(range(0, 20000))) total += x;
+echo total;
+""",
+    "chained": """
+fn evens(source) {
+    for x in source {
+        if x % 2 == 0: yield x;
+    }
+}
+fn squares(source) { for x in source yield x * x; }
+fn pass(source) { for x in source yield x; }
+let total = 0;
+for x in pass(pass(pass(squares(evens(range(0, 20000)))))) total += x;
+echo total;
+""",
+}
+
+
+if __name__ == "__main__":
+    main(PROGRAMS)
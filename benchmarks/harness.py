@@ -0,0 +1,46 @@
+"""Runs a benchmark's programs in the tree-walker with tiering off and in
+the closure compiler, and prints the best of three runs of each.
+
+A benchmark defines its programs and calls main():
+
+    from harness import main
+
+    PROGRAMS = {"name": "source", ...}
+
+    if __name__ == "__main__":
+        main(PROGRAMS)
+"""
+
+import contextlib
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from closure_compiler import ClosureInterpreter  # noqa: E402
+from interpreter import Interpreter  # noqa: E402
+from plox import Plox  # noqa: E402
+
+ENGINES = {
+    "tree": lambda: Interpreter(),
+    "closure": lambda: ClosureInterpreter(),
+}
+
+
+def run(engine: str, source: str):
+    interpreter = ENGINES[engine]()
+    interpreter.tiering.threshold = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        Plox(interpreter).run(source)
+
+
+def main(programs: dict[str, str]):
+    print(f"{'program':>14} {'tree':>9} {'closure':>9}")
+    for name, source in programs.items():
+        times = [
+            min(timeit.repeat(lambda: run(engine, source), number=1, repeat=3))
+            for engine in ENGINES
+        ]
+        print(f"{name:>14}" + "".join(f" {t * 1000:>7.0f}ms" for t in times))
@@ -0,0 +1,30 @@
+"""Times summing the numbers below 100000 with a counting for, which
+evaluates a condition and an increment per iteration, and with a for-in
+over range, which takes the numbers from a Python iterator, in the
+tree-walker with tiering off and in the closure compiler.
+
+Run from the repository root: python benchmarks/iteration.py
+"""
+
+from harness import main
+
+PROGRAMS = {
+    "counting for": """
+let total = 0;
+for let i = 0; i < 100000; i++ {
+    total = total + i;
+}
+echo total;
+""",
+    "for in range": """
+let total = 0;
+for i in range(0, 100000) {
+    total = total + i;
+}
+echo total;
+""",
+}
+
+
+if __name__ == "__main__":
+    main(PROGRAMS)
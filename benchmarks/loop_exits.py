@@ -0,0 +1,63 @@
+"""Times searches that leave their loops early, written with a flag
+variable, with a `return` from a wrapper function and with `break`, in the
+tree-walker with tiering off and in the closure compiler. Without `break`
+a flag costs one more condition per iteration and a wrapper costs a call
+per search.
+
+Run from the repository root: python benchmarks/loop_exits.py
+"""
+
+from harness import main
+
+PROGRAMS = {
+    "flag": """
+let found = 0;
+for let n = 0; n < 300; n++ {
+    let done = false;
+    for let i = 0; !done and i < 1000; i++ {
+        if i * i > n * 50: {
+            found = found + i;
+            done = true;
+        }
+    }
+}
+echo found;
+""",
+    "wrapper": """
+fn search(n) {
+    for let i = 0; i < 1000; i++ {
+        if i * i > n * 50: return i;
+    }
+    return 0;
+}
+let found = 0;
+for let n = 0; n < 300; n++ {
+    found = found + search(n);
+}
+echo found;
+""",
+    "break": """
+let found = 0;
+for let n = 0; n < 300; n++ {
+    for let i = 0; i < 1000; i++ {
+        if i * i > n * 50: {
+            found = found + i;
+            break;
+        }
+    }
+}
+echo found;
+""",
+    "continue": """
+let total = 0;
+for let i = 0; i < 20000; i++ {
+    if i % 3 == 0: continue;
+    total = total + i;
+}
+echo total;
+""",
+}
+
+
+if __name__ == "__main__":
+    main(PROGRAMS)
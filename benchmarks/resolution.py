@@ -0,0 +1,47 @@
+"""Compares looking up a resolved scope distance by hashing the expression's
+str(), as the Interpreter used to, with reading it off the node. The str()
+of an assignment renders its whole value, so the lookup for `a = ...` grew
+with the expression assigned.
+
+Run from the repository root: python benchmarks/resolution.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from interpreter import Interpreter  # noqa: E402
+from parser import Parser  # noqa: E402
+from resolver import Resolver  # noqa: E402
+from scanner import Scanner  # noqa: E402
+
+LOOKUPS = 10_000
+
+
+def deep_expression(depth: int) -> str:
+    """a + a * a - a ..., a tree depth operators deep."""
+    return "a" + "".join(f" {'+-'[i % 2]} a" for i in range(depth))
+
+
+def main():
+    print("Time per lookup for the assignment a = a + a - a ...")
+    print(f"{'depth':>6} {'hash(str(expr))':>16} {'expr.depth':>11}")
+    for depth in (1, 4, 16, 64, 256):
+        source = f"fn f(a) {{ a = {deep_expression(depth)}; }}"
+        statements = Parser(Scanner(source).scan_tokens(), source).parse()
+        Resolver(Interpreter()).analyze(statements)
+        assign = statements[0].body[0].expression
+
+        by_str = {str(assign): assign.depth}
+        old = timeit.timeit(lambda: by_str.get(str(assign)), number=LOOKUPS)
+        new = timeit.timeit(lambda: assign.depth, number=LOOKUPS)
+        print(
+            f"{depth:>6} {old / LOOKUPS * 1e6:>14.2f}us"
+            f" {new / LOOKUPS * 1e6:>9.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Times recursive programs, where most of the work is calling and returning,
+in the tree-walker with tiering off and in the closure compiler. A `return`
+used to raise an exception that unwound every block it was nested in, and
+a call in tail position used to nest Python frames like any other.
+
+Run from the repository root: python benchmarks/returns.py
+"""
+
+from harness import main
+
+PROGRAMS = {
+    "fib": """
+fn fib(n) {
+    if n < 2: return n;
+    return fib(n - 1) + fib(n - 2);
+}
+echo fib(20);
+""",
+    "ackermann": """
+fn ack(m, n) {
+    if m == 0: return n + 1;
+    if n == 0: return ack(m - 1, 1);
+    return ack(m - 1, ack(m, n - 1));
+}
+echo ack(2, 30);
+""",
+    "nested blocks": """
+fn sum(n) {
+    if n == 0: {
+        return 0;
+    }
+    {
+        let rest = sum(n - 1);
+        {
+            return n + rest;
+        }
+    }
+}
+let total = 0;
+for let i = 0; i < 400; i++ {
+    total = total + sum(i % 40);
+}
+echo total;
+""",
+    "tail calls": """
+fn count(n, total) {
+    if n == 0: return total;
+    return count(n - 1, total + n);
+}
+let total = 0;
+for let i = 0; i < 200; i++ {
+    total = total + count(i % 100, 0);
+}
+echo total;
+""",
+}
+
+
+if __name__ == "__main__":
+    main(PROGRAMS)
@@ -0,0 +1,1342 @@
+from typing import Any, Callable
+
+from objects.callable import PloxCallable
+from objects.klass import PloxClass, PloxInstance
+from objects.function import PloxAnonymFunction, PloxFunction
+from objects.generator import PloxGenerator
+from objects.returns import BREAK, CONTINUE, Returns, TailCall
+
+from values.tokens import Token, TokenType
+from values import expr
+from values import stmt
+
+from environment import UNDEFINED, Cell, Env, Globals, capture, frame
+from interpreter import Interpreter
+from inference import BOOL
+from quickening import FLOAT_OPERATORS, proven
+
+from errors.exceptions import PloxRuntimeError
+from errors.error import runtime_error
+
+Node = Callable[[Env | Globals], Any]
+
+COMPARISONS = {
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+}
+
+
+class CompiledFunction(PloxFunction):
+    def __init__(
+        self,
+        declaration: stmt.Function,
+        closure: Env,
+        is_initializer: bool,
+        body: Node,
+    ) -> None:
+        super().__init__(declaration, closure, is_initializer)
+        self.body = body
+        self.locals = [None] * (declaration.slots - len(declaration.params))
+        self.cells = declaration.cells
+
+    def call(self, interpreter, arguments: list):
+        # run() inlined, calls are the hot path.
+        arguments.extend(self.locals)
+        if self.cells:
+            frame(arguments, self.cells)
+        returns = self.body(Env(self.closure, arguments))
+        if self.is_initializer:
+            return self.closure.values[0].value
+        if type(returns) is Returns:
+            value = returns.value
+            if type(value) is TailCall:
+                return value.trampoline(interpreter)
+            return value
+        return None
+
+    def run(self, interpreter, arguments: list):
+        arguments.extend(self.locals)
+        if self.cells:
+            frame(arguments, self.cells)
+        returns = self.body(Env(self.closure, arguments))
+        if self.is_initializer:
+            return self.closure.values[0].value
+        if type(returns) is Returns:
+            return returns.value
+        return None
+
+    def bind(self, instance: PloxInstance):
+        closure = Env(None, [Cell(instance), *self.closure.values[1:]])
+        return CompiledFunction(
+            self.delcaration, closure, self.is_initializer, self.body
+        )
+
+
+class CompiledAnonymFunction(PloxAnonymFunction):
+    def __init__(self, expression: expr.Anonym, closure: Env, body: Node) -> None:
+        super().__init__(expression, closure)
+        self.body = body
+        self.locals = [None] * (expression.slots - len(expression.params))
+        self.cells = expression.cells
+
+    def call(self, interpreter, arguments: list):
+        # run() inlined, calls are the hot path.
+        arguments.extend(self.locals)
+        if self.cells:
+            frame(arguments, self.cells)
+        returns = self.body(Env(self.closure, arguments))
+        if type(returns) is Returns:
+            value = returns.value
+            if type(value) is TailCall:
+                return value.trampoline(interpreter)
+            return value
+        return None
+
+    def run(self, interpreter, arguments: list):
+        arguments.extend(self.locals)
+        if self.cells:
+            frame(arguments, self.cells)
+        returns = self.body(Env(self.closure, arguments))
+        if type(returns) is Returns:
+            return returns.value
+        return None
+
+
+def may_return(statement: stmt.Stmt) -> bool:
+    """Whether running statement can run a `return` of the enclosing
+    function."""
+    if isinstance(statement, stmt.Return):
+        return True
+    if isinstance(statement, stmt.If):
+        return may_return(statement.then) or (
+            statement.els is not None and may_return(statement.els)
+        )
+    if isinstance(statement, stmt.Match):
+        return any(may_return(arm) for arm in branches(statement))
+    if isinstance(statement, (stmt.While, stmt.ForIn)):
+        return may_return(statement.body)
+    if isinstance(statement, stmt.Block):
+        return any(may_return(inner) for inner in statement.statements)
+    return False
+
+
+def exits_loop(statement: stmt.Stmt) -> bool:
+    """Whether running statement can run a `break` or `continue` of the
+    loop it is in, the ones in a nested loop belong to that loop."""
+    if isinstance(statement, (stmt.Break, stmt.Continue)):
+        return True
+    if isinstance(statement, stmt.If):
+        return exits_loop(statement.then) or (
+            statement.els is not None and exits_loop(statement.els)
+        )
+    if isinstance(statement, stmt.Match):
+        return any(exits_loop(arm) for arm in branches(statement))
+    if isinstance(statement, stmt.Block):
+        return any(exits_loop(inner) for inner in statement.statements)
+    return False
+
+
+def branches(statement: stmt.Match) -> list[stmt.Stmt]:
+    if statement.els is None:
+        return statement.arms
+    return [*statement.arms, statement.els]
+
+
+def may_jump(statement: stmt.Stmt) -> bool:
+    """Whether statement can stop the statements after it from running."""
+    return may_return(statement) or exits_loop(statement)
+
+
+# How a generator body runs a statement: its closure, `yield from` its
+# generator closure, or, for a `yield`, yielding what its closure gives.
+RUN, SUSPEND, YIELD = 0, 1, 2
+
+FUNCTIONS = {
+    PloxFunction,
+    PloxAnonymFunction,
+    CompiledFunction,
+    CompiledAnonymFunction,
+}
+
+
+class ClosureCompiler(expr.Visitor, stmt.Visitor):
+    """Turns every AST node into a Python closure, once.
+
+    Each closure takes the current Env and already holds its children, its
+    operator and its resolved scope distance, so running the program no
+    longer goes through accept(), operator dispatch or resolution lookups.
+    Expression closures return their value. A statement closure gives back
+    a Returns when it ran a `return`, BREAK or CONTINUE when it ran a
+    `break` or `continue`, and the enclosing statements pass these up.
+    Anything else it gives back means it ran to completion: sequences of
+    statements that can neither return nor leave their loop skip checking.
+    Sites that the type feedback shows to be monomorphic get a closure that
+    checks for the recorded types first.
+    """
+
+    def __init__(self, interpreter: Interpreter) -> None:
+        self.interpreter = interpreter
+        self.globals = interpreter.globals
+        self.feedback = interpreter.feedback
+
+    def compile(self, statements: list[stmt.Stmt]) -> Node:
+        return self.sequence(statements)
+
+    def compile_node(self, node) -> Node:
+        return node.accept(self)
+
+    def loop(self, statement: stmt.While | stmt.ForIn) -> Node:
+        """A loop the tree-walker switches to while running it."""
+        if isinstance(statement, stmt.ForIn):
+            return self.iteration(statement)
+        return self.compile_node(statement)
+
+    def sequence(self, statements: list[stmt.Stmt]) -> Node:
+        nodes = [self.compile_node(statement) for statement in statements]
+        if len(nodes) == 0:
+            return lambda env: None
+        if len(nodes) == 1:
+            return nodes[0]
+
+        if any(may_jump(statement) for statement in statements[:-1]):
+            # What the last statement gives back is passed on either way.
+            checked = [
+                (node, may_jump(statement))
+                for node, statement in zip(nodes[:-1], statements)
+            ]
+            last = nodes[-1]
+
+            def run_checked(env):
+                for node, jumps in checked:
+                    result = node(env)
+                    if jumps and (
+                        type(result) is Returns or result is BREAK or result is CONTINUE
+                    ):
+                        return result
+                return last(env)
+
+            return run_checked
+
+        if len(nodes) == 2:
+            first, second = nodes
+
+            def run_two(env):
+                first(env)
+                return second(env)
+
+            return run_two
+
+        init, last = nodes[:-1], nodes[-1]
+
+        def run_all(env):
+            for node in init:
+                node(env)
+            return last(env)
+
+        return run_all
+
+    def condition(self, expression: expr.Expr) -> Node:
+        """Compiles an expression used for its truthiness. Comparisons already
+        produce a bool, anything else is folded to one here."""
+        compiled = self.compile_node(expression)
+        if self.is_boolean(expression):
+            return compiled
+
+        def truthy(env):
+            value = compiled(env)
+            return value is not None and value is not False
+
+        return truthy
+
+    def is_boolean(self, expression: expr.Expr) -> bool:
+        if expression.inferred == BOOL:
+            return True
+        if isinstance(expression, expr.Grouping):
+            return self.is_boolean(expression.expression)
+        if isinstance(expression, expr.Literal):
+            return isinstance(expression.value, bool)
+        if isinstance(expression, expr.Binary):
+            return expression.operator._type in COMPARISONS
+        if isinstance(expression, expr.Unary):
+            return expression.operator._type == TokenType.BANG
+        if isinstance(expression, expr.Logical):
+            return self.is_boolean(expression.left) and self.is_boolean(
+                expression.right
+            )
+        return False
+
+    def function_body(self, declaration: stmt.Function | expr.Anonym) -> Node:
+        if declaration.generator:
+            return self.generator_body(declaration)
+        return self.sequence(declaration.body)
+
+    def declaration_body(self, declaration: stmt.Function) -> Node | None:
+        """The compiled body, None for a body that is not parsed yet. Such
+        functions stay tree-walker functions, which parse it when called."""
+        if declaration.pending is not None:
+            return None
+        return self.function_body(declaration)
+
+    def declare(
+        self, statement: stmt.Var | stmt.Function | stmt._Class
+    ) -> Callable[[Env | Globals, Any], None]:
+        """Stores the value of a declaration: in the Cell of a global, in
+        its slot or in the Cell there for a local."""
+        if statement.slot is None:
+            cell = self.globals.cell(statement.name.symbol)
+
+            def declare_global(env, value):
+                cell.value = value
+
+            return declare_global
+
+        slot = statement.slot
+        if statement.cell:
+
+            def declare_cell(env, value):
+                env.values[slot].value = value
+
+            return declare_cell
+
+        def declare_local(env, value):
+            env.values[slot] = value
+
+        return declare_local
+
+    # Statements
+
+    def visit_block_stmt(self, statement: stmt.Block) -> Any:
+        body = self.sequence(statement.statements)
+
+        if not statement.scoped:
+            return body
+
+        slots = statement.slots
+        cells = statement.cells
+
+        if cells:
+
+            def block_with_cells(env):
+                return body(Env(env, frame([None] * slots, cells)))
+
+            return block_with_cells
+
+        def block(env):
+            return body(Env(env, [None] * slots))
+
+        return block
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        name = statement.name
+        declare = self.declare(statement)
+        superclass_node = None
+        if statement.superclass:
+            superclass_node = self.compile_node(statement.superclass)
+        methods = [
+            (method, self.declaration_body(method), method.name.symbol == "init")
+            for method in statement.methods
+        ]
+
+        def class_declaration(env):
+            superclass = None
+            if superclass_node is not None:
+                superclass = superclass_node(env)
+                if not isinstance(superclass, PloxClass):
+                    raise PloxRuntimeError(
+                        statement.superclass.name, "superclass must be a class."
+                    )
+
+            declare(env, None)
+
+            enclosing = env
+            if superclass_node is not None:
+                enclosing = Env(env, [Cell(superclass)])
+            scope = Env(enclosing, [Cell(None)])
+
+            functions = {}
+            for method, body, is_initializer in methods:
+                closure = capture(scope, method.captures)
+                if body is None:
+                    functions[method.name.symbol] = PloxFunction(
+                        method, closure, is_initializer
+                    )
+                else:
+                    functions[method.name.symbol] = CompiledFunction(
+                        method, closure, is_initializer, body
+                    )
+            declare(env, PloxClass(name.symbol, functions, superclass))
+
+        return class_declaration
+
+    def visit_expression_stmt(self, statement: stmt.Expression) -> Any:
+        return self.compile_node(statement.expression)
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        declare = self.declare(statement)
+        captures = statement.captures
+        body = self.declaration_body(statement)
+        if body is None:
+
+            def pending_declaration(env):
+                declare(env, PloxFunction(statement, capture(env, captures), False))
+
+            return pending_declaration
+
+        def function_declaration(env):
+            closure = capture(env, captures)
+            declare(env, CompiledFunction(statement, closure, False, body))
+
+        return function_declaration
+
+    def visit_if_stmt(self, statement: stmt.If) -> Any:
+        condition = self.condition(statement.condition)
+        then = self.compile_node(statement.then)
+
+        if statement.els is None:
+
+            def if_then(env):
+                if condition(env):
+                    return then(env)
+
+            return if_then
+
+        els = self.compile_node(statement.els)
+
+        def if_then_else(env):
+            if condition(env):
+                return then(env)
+            return els(env)
+
+        return if_then_else
+
+    def visit_match_stmt(self, statement: stmt.Match) -> Any:
+        value = self.compile_node(statement.value)
+        arms = [self.compile_node(arm) for arm in statement.arms]
+        els = lambda env: None
+        if statement.els is not None:
+            els = self.compile_node(statement.els)
+
+        if statement.table is not None:
+            jumps = {key: arms[index] for key, index in statement.table.items()}
+
+            def match_table(env):
+                return jumps.get(value(env), els)(env)
+
+            return match_table
+
+        cases = list(zip([self.compile_node(p) for p in statement.patterns], arms))
+
+        def match_cases(env):
+            subject = value(env)
+            for pattern, arm in cases:
+                if subject == pattern(env):
+                    return arm(env)
+            return els(env)
+
+        return match_cases
+
+    def visit_echo_stmt(self, statement: stmt.Echo) -> Any:
+        value = self.compile_node(statement.expression)
+        stringify = self.interpreter.stringify
+
+        def echo(env):
+            print(stringify(value(env)))
+
+        return echo
+
+    def visit_return_stmt(self, statement: stmt.Return) -> Any:
+        if statement.value is None:
+
+            def return_none(env):
+                return Returns(None)
+
+            return return_none
+
+        if statement.tail:
+            return self.tail_call(statement.value)
+
+        value = self.compile_node(statement.value)
+
+        def return_value(env):
+            return Returns(value(env))
+
+        return return_value
+
+    def visit_yield_stmt(self, statement: stmt.Yield) -> Any:
+        # Generator bodies compile their yields through part(), the Resolver
+        # rejects them anywhere else.
+        raise PloxRuntimeError(
+            statement.keyword, "Can only yield from the body of a generator."
+        )
+
+    def visit_break_stmt(self, statement: stmt.Break) -> Any:
+        return lambda env: BREAK
+
+    def visit_continue_stmt(self, statement: stmt.Continue) -> Any:
+        return lambda env: CONTINUE
+
+    def tail_call(self, expression: expr.Call) -> Node:
+        callee_node = self.compile_node(expression.callee)
+        argument_nodes = [self.compile_node(arg) for arg in expression.arguments]
+        count = len(argument_nodes)
+        paren = expression.paren
+        interpreter = self.interpreter
+
+        def return_call(env):
+            callee = callee_node(env)
+            arguments = [argument(env) for argument in argument_nodes]
+
+            if type(callee) in FUNCTIONS and len(callee.delcaration.params) == count:
+                return Returns(TailCall(callee, arguments))
+            if not isinstance(callee, PloxCallable):
+                raise PloxRuntimeError(paren, "Can only call functions and classes.")
+            if count != callee.arity():
+                raise PloxRuntimeError(
+                    paren, f"Expected {callee.arity()} arguments but got {count}."
+                )
+            return Returns(callee.call(interpreter, arguments))
+
+        return return_call
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        if statement.cell or statement.slot is None:
+            declare = self.declare(statement)
+            initializer = self.compile_node(statement.initializer or expr.Literal(None))
+            return lambda env: declare(env, initializer(env))
+
+        slot = statement.slot
+        if statement.initializer is None:
+
+            def declare(env):
+                env.values[slot] = None
+
+            return declare
+
+        initializer = self.compile_node(statement.initializer)
+
+        def define(env):
+            env.values[slot] = initializer(env)
+
+        return define
+
+    def visit_while_stmt(self, statement: stmt.While) -> Any:
+        condition = self.condition(statement.condition)
+        body = self.compile_node(statement.body)
+        increment = None
+        if statement.increment is not None:
+            increment = self.compile_node(statement.increment)
+
+        if may_jump(statement.body):
+            step = increment or (lambda env: None)
+
+            def jumping_loop(env):
+                while condition(env):
+                    result = body(env)
+                    if result is BREAK:
+                        return None
+                    if type(result) is Returns:
+                        return result
+                    step(env)
+
+            return jumping_loop
+
+        if increment is not None:
+
+            def counting_loop(env):
+                while condition(env):
+                    body(env)
+                    increment(env)
+
+            return counting_loop
+
+        def loop(env):
+            while condition(env):
+                body(env)
+
+        return loop
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        iterable = self.compile_node(statement.iterable)
+        iterate = self.interpreter.iterate
+        iteration = self.iteration(statement)
+        keyword = statement.keyword
+
+        if statement.cell:
+
+            def for_in_cells(env):
+                iterator = iterate(iterable(env), keyword)
+                return iteration(Env(env, [None]), map(Cell, iterator))
+
+            return for_in_cells
+
+        def for_in(env):
+            return iteration(Env(env, [None]), iterate(iterable(env), keyword))
+
+        return for_in
+
+    def iteration(self, statement: stmt.ForIn) -> Callable[[Env, Any], Any]:
+        """Runs the body of a for-in loop once per item the iterator has
+        left, with the item in slot 0 of env."""
+        body = self.compile_node(statement.body)
+        reentered = self.interpreter.reentered
+        keyword = statement.keyword
+
+        if may_jump(statement.body):
+
+            def jumping_iteration(env, iterator):
+                values = env.values
+                try:
+                    for values[0] in iterator:
+                        result = body(env)
+                        if result is BREAK:
+                            return None
+                        if type(result) is Returns:
+                            return result
+                except ValueError as error:
+                    reentered(error, keyword)
+
+            return jumping_iteration
+
+        def iteration(env, iterator):
+            values = env.values
+            try:
+                for values[0] in iterator:
+                    body(env)
+            except ValueError as error:
+                reentered(error, keyword)
+
+        return iteration
+
+    # Generators
+    #
+    # A generator body compiles to Python generator functions wherever a
+    # `yield` can suspend it. Each takes the Env, suspends at the yields in
+    # its statement and gives back what the statement's closure would, as
+    # the value of its StopIteration. Statements that cannot yield compile
+    # to their usual closures.
+
+    def generator_body(self, declaration: stmt.Function | expr.Anonym) -> Node:
+        steps = self.suspending_sequence(declaration.body)
+        name = "Anonymous"
+        if isinstance(declaration, stmt.Function):
+            name = declaration.name.symbol
+
+        def start_generator(env):
+            return Returns(PloxGenerator(name, steps(env)))
+
+        return start_generator
+
+    def part(self, statement: stmt.Stmt) -> tuple[Node, int]:
+        if type(statement) is stmt.Yield:
+            if statement.value is None:
+                return (lambda env: None), YIELD
+            return self.compile_node(statement.value), YIELD
+        if statement.yields:
+            return self.suspending(statement), SUSPEND
+        return self.compile_node(statement), RUN
+
+    def suspending_sequence(self, statements: list[stmt.Stmt]) -> Node:
+        parts = [
+            (*self.part(statement), may_jump(statement)) for statement in statements
+        ]
+        if len(parts) == 1 and parts[0][1] == SUSPEND:
+            return parts[0][0]
+
+        def sequence(env):
+            for node, kind, checked in parts:
+                if kind == YIELD:
+                    yield node(env)
+                    continue
+                if kind == SUSPEND:
+                    result = yield from node(env)
+                else:
+                    result = node(env)
+                if checked and (
+                    type(result) is Returns or result is BREAK or result is CONTINUE
+                ):
+                    return result
+
+        return sequence
+
+    def suspending(self, statement: stmt.Stmt) -> Node:
+        if isinstance(statement, stmt.Block):
+            return self.suspending_block(statement)
+        if isinstance(statement, (stmt.If, stmt.Match)):
+            return self.suspending_branches(statement)
+        return self.suspending_loop(statement)
+
+    def suspending_block(self, statement: stmt.Block) -> Node:
+        body = self.suspending_sequence(statement.statements)
+        if not statement.scoped:
+            return body
+        slots = statement.slots
+        cells = statement.cells
+
+        def block(env):
+            values = [None] * slots
+            if cells:
+                frame(values, cells)
+            return (yield from body(Env(env, values)))
+
+        return block
+
+    def suspending_branches(self, statement: stmt.If | stmt.Match) -> Node:
+        """An if or a match, which picks the part to run first."""
+        none = (lambda env: None), RUN
+        if isinstance(statement, stmt.If):
+            condition = self.condition(statement.condition)
+            then = self.part(statement.then)
+            els = none if statement.els is None else self.part(statement.els)
+
+            def pick(env):
+                return then if condition(env) else els
+
+        else:
+            value = self.compile_node(statement.value)
+            patterns = [self.compile_node(pattern) for pattern in statement.patterns]
+            arms = [self.part(arm) for arm in statement.arms]
+            els = none if statement.els is None else self.part(statement.els)
+            table = statement.table
+            is_equal = self.interpreter.is_equal
+
+            def pick(env):
+                subject = value(env)
+                if table is not None:
+                    index = table.get(subject)
+                    return els if index is None else arms[index]
+                for pattern, arm in zip(patterns, arms):
+                    if is_equal(subject, pattern(env)):
+                        return arm
+                return els
+
+        def branch(env):
+            node, kind = pick(env)
+            if kind == YIELD:
+                yield node(env)
+                return None
+            if kind == SUSPEND:
+                return (yield from node(env))
+            return node(env)
+
+        return branch
+
+    def suspending_loop(self, statement: stmt.While | stmt.ForIn) -> Node:
+        body, kind = self.part(statement.body)
+        if isinstance(statement, stmt.While):
+            condition = self.condition(statement.condition)
+            increment = None
+            if statement.increment is not None:
+                increment = self.compile_node(statement.increment)
+            step = increment or (lambda env: None)
+
+            def items(env):
+                while condition(env):
+                    yield env
+                    step(env)
+
+        else:
+            iterable = self.compile_node(statement.iterable)
+            iterate = self.interpreter.iterate
+            reentered = self.interpreter.reentered
+            keyword = statement.keyword
+            cell = statement.cell
+
+            def items(env):
+                iterator = iterate(iterable(env), keyword)
+                if cell:
+                    iterator = map(Cell, iterator)
+                loop_env = Env(env, [None])
+                values = loop_env.values
+                try:
+                    for values[0] in iterator:
+                        yield loop_env
+                except ValueError as error:
+                    reentered(error, keyword)
+
+        if kind == YIELD:
+
+            def yielding_loop(env):
+                for inner in items(env):
+                    yield body(inner)
+
+            return yielding_loop
+
+        def suspending_loop(env):
+            for inner in items(env):
+                result = yield from body(inner)
+                if result is BREAK:
+                    return None
+                if type(result) is Returns:
+                    return result
+
+        return suspending_loop
+
+    # Expressions
+
+    def visit_literal_expr(self, expression: expr.Literal) -> Any:
+        value = expression.value
+        return lambda env: value
+
+    def visit_self_expr(self, expression: expr.Self) -> Any:
+        return self.variable(expression.keyword, expression)
+
+    def visit_variable_expr(self, expression: expr.Variable) -> Any:
+        variable = self.variable(expression.name, expression)
+        if not expression.constant:
+            return variable
+
+        def constant(env):
+            value = expression.value
+            if value is expr.UNSET:
+                value = expression.value = variable(env)
+            return value
+
+        return constant
+
+    def visit_grouping_expr(self, expression: expr.Grouping) -> Any:
+        return self.compile_node(expression.expression)
+
+    def visit_increment_expr(self, expression: expr.Increment) -> Any:
+        operator = expression.operator
+        target = expression.target
+        step = 1.0 if operator._type == TokenType.PLUS_PLUS else -1.0
+        prefix = expression.prefix
+        checked = not proven(target)
+
+        if isinstance(target, expr.Get):
+            return self.increment_field(expression, step)
+
+        if target.depth == 0 and not target.cell:
+            # Counters in loops, read and written in the frame in one go.
+            slot = target.slot
+
+            def increment_local(env):
+                values = env.values
+                value = values[slot]
+                if checked and type(value) is not float:
+                    raise PloxRuntimeError(operator, "Operand must be a number")
+                values[slot] = value + step
+                return value + step if prefix else value
+
+            return increment_local
+
+        read = self.compile_node(target)
+        store = self.store(target)
+
+        def increment(env):
+            value = read(env)
+            if checked and type(value) is not float:
+                raise PloxRuntimeError(operator, "Operand must be a number")
+            store(env, value + step)
+            return value + step if prefix else value
+
+        return increment
+
+    def increment_field(self, expression: expr.Increment, step: float) -> Node:
+        operator = expression.operator
+        obj_node = self.compile_node(expression.target.obj)
+        name = expression.target.name
+        symbol = name.symbol
+        prefix = expression.prefix
+
+        def increment_field(env):
+            obj = obj_node(env)
+            if not isinstance(obj, PloxInstance):
+                raise PloxRuntimeError(name, "Only instances have properties.")
+            fields = obj.fields
+            value = fields.get(symbol)
+            if type(value) is not float:
+                obj.get(name)
+                raise PloxRuntimeError(operator, "Operand must be a number")
+            fields[symbol] = value + step
+            return value + step if prefix else value
+
+        return increment_field
+
+    def visit_unary_expr(self, expression: expr.Unary) -> Any:
+        operator = expression.operator
+        right = self.compile_node(expression.right)
+
+        if operator._type == TokenType.BANG:
+
+            def bang(env):
+                value = right(env)
+                return value is None or value is False
+
+            return bang
+
+        if proven(expression.right):
+            return lambda env: -right(env)
+
+        def negate(env):
+            value = right(env)
+            if type(value) is not float:
+                raise PloxRuntimeError(operator, "Operand must be a number")
+            return -value
+
+        return negate
+
+    def visit_binary_expr(self, expression: expr.Binary) -> Any:
+        operator = expression.operator
+        left = self.compile_node(expression.left)
+        right = self.compile_node(expression.right)
+
+        if (
+            operator._type in FLOAT_OPERATORS
+            and proven(expression.left)
+            and proven(expression.right)
+        ):
+            apply = FLOAT_OPERATORS[operator._type]
+            return lambda env: apply(left(env), right(env))
+
+        match operator._type:
+            case TokenType.PLUS:
+                if self.feedback.monomorphic(operator) == "str str":
+
+                    def concat(env):
+                        a = left(env)
+                        b = right(env)
+                        if type(a) is str and type(b) is str:
+                            return a + b
+                        if type(a) is float and type(b) is float:
+                            return a + b
+                        if isinstance(a, str) or isinstance(b, str):
+                            return str(a) + str(b)
+                        raise PloxRuntimeError(
+                            operator, "Operands must be two numbers or two strings."
+                        )
+
+                    return concat
+
+                def add(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a + b
+                    if isinstance(a, str) or isinstance(b, str):
+                        return str(a) + str(b)
+                    raise PloxRuntimeError(
+                        operator, "Operands must be two numbers or two strings."
+                    )
+
+                return add
+            case TokenType.MINUS:
+
+                def subtract(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a - b
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+
+                return subtract
+            case TokenType.STAR:
+
+                def multiply(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a * b
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+
+                return multiply
+            case TokenType.SLASH:
+
+                def divide(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is not float or type(b) is not float:
+                        raise PloxRuntimeError(operator, "Operands must be numbers")
+                    if a == 0 or b == 0:
+                        raise PloxRuntimeError(operator, "Trying to devide by Zero.")
+                    return a / b
+
+                return divide
+            case TokenType.MODULO:
+
+                def modulo(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a % b
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+
+                return modulo
+            case TokenType.GREATER:
+
+                def greater(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a > b
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+
+                return greater
+            case TokenType.GREATER_EQUAL:
+
+                def greater_equal(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a >= b
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+
+                return greater_equal
+            case TokenType.LESS:
+
+                def less(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a < b
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+
+                return less
+            case TokenType.LESS_EQUAL:
+
+                def less_equal(env):
+                    a = left(env)
+                    b = right(env)
+                    if type(a) is float and type(b) is float:
+                        return a <= b
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+
+                return less_equal
+            case TokenType.BANG_EQUAL:
+                return lambda env: not left(env) == right(env)
+            case TokenType.EQUAL_EQUAL:
+                return lambda env: left(env) == right(env)
+
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign) -> Any:
+        operator = expression.operator
+        target = expression.target
+        value_node = self.compile_node(expression.value)
+        match operator._type:
+            case TokenType.PLUS_ASSIGN:
+                apply = float.__add__
+            case TokenType.MINUS_ASSIGN:
+                apply = float.__sub__
+            case TokenType.STAR_ASSIGN:
+                apply = float.__mul__
+            case _:
+                apply = float.__truediv__
+        divides = operator._type == TokenType.SLASH_ASSIGN
+        checked = not (proven(target) and proven(expression.value))
+
+        if isinstance(target, expr.Get):
+            obj_node = self.compile_node(target.obj)
+            name = target.name
+            symbol = name.symbol
+
+            def compound_field(env):
+                obj = obj_node(env)
+                if not isinstance(obj, PloxInstance):
+                    raise PloxRuntimeError(name, "Only instances have properties.")
+                fields = obj.fields
+                a = fields[symbol] if symbol in fields else obj.get(name)
+                b = value_node(env)
+                if type(a) is not float or type(b) is not float:
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+                if divides and (a == 0 or b == 0):
+                    raise PloxRuntimeError(operator, "Trying to devide by Zero.")
+                value = fields[symbol] = apply(a, b)
+                return value
+
+            return compound_field
+
+        if target.depth == 0 and not target.cell:
+            slot = target.slot
+
+            def compound_local(env):
+                values = env.values
+                a = values[slot]
+                b = value_node(env)
+                if checked and (type(a) is not float or type(b) is not float):
+                    raise PloxRuntimeError(operator, "Operands must be numbers")
+                if divides and (a == 0 or b == 0):
+                    raise PloxRuntimeError(operator, "Trying to devide by Zero.")
+                value = values[slot] = apply(a, b)
+                return value
+
+            return compound_local
+
+        read = self.compile_node(target)
+        store = self.store(target)
+
+        def compound(env):
+            a = read(env)
+            b = value_node(env)
+            if checked and (type(a) is not float or type(b) is not float):
+                raise PloxRuntimeError(operator, "Operands must be numbers")
+            if divides and (a == 0 or b == 0):
+                raise PloxRuntimeError(operator, "Trying to devide by Zero.")
+            value = apply(a, b)
+            store(env, value)
+            return value
+
+        return compound
+
+    def visit_logical_expr(self, expression: expr.Logical) -> Any:
+        left = self.compile_node(expression.left)
+        right = self.compile_node(expression.right)
+
+        if expression.operator._type == TokenType.OR:
+
+            def logical_or(env):
+                value = left(env)
+                if value is not None and value is not False:
+                    return value
+                return right(env)
+
+            return logical_or
+
+        def logical_and(env):
+            value = left(env)
+            if value is None or value is False:
+                return value
+            return right(env)
+
+        return logical_and
+
+    def visit_ternary_expr(self, expression: expr.Ternary) -> Any:
+        condition = self.condition(expression.condition)
+        expression_true = self.compile_node(expression.expression_true)
+        expression_false = self.compile_node(expression.expression_false)
+
+        def ternary(env):
+            if condition(env):
+                return expression_true(env)
+            return expression_false(env)
+
+        return ternary
+
+    def visit_assign_expr(self, expression: expr.Assign) -> Any:
+        name = expression.name
+        slot = expression.slot
+        value = self.compile_node(expression.value)
+        distance = expression.depth
+
+        if distance is None:
+            cell = expression.global_cell
+
+            def assign_global(env):
+                result = value(env)
+                if cell.value is UNDEFINED:
+                    raise PloxRuntimeError(name, f"Undefined variable '{name.symbol}'.")
+                cell.value = result
+                return result
+
+            return assign_global
+
+        if expression.cell:
+
+            def assign_cell(env):
+                result = value(env)
+                env.ancestor(distance).values[slot].value = result
+                return result
+
+            return assign_cell
+
+        if distance == 0:
+
+            def assign_local(env):
+                result = value(env)
+                env.values[slot] = result
+                return result
+
+            return assign_local
+
+        def assign_enclosing(env):
+            result = value(env)
+            env.ancestor(distance).values[slot] = result
+            return result
+
+        return assign_enclosing
+
+    def visit_call_expr(self, expression: expr.Call) -> Any:
+        callee_node = self.compile_node(expression.callee)
+        argument_nodes = [self.compile_node(arg) for arg in expression.arguments]
+        count = len(argument_nodes)
+        paren = expression.paren
+        interpreter = self.interpreter
+
+        kinds = self.feedback.kinds(paren)
+        if kinds and all(kind == "function" for kind in kinds):
+
+            def call_function(env):
+                callee = callee_node(env)
+                arguments = [argument(env) for argument in argument_nodes]
+
+                if (
+                    type(callee) in FUNCTIONS
+                    and len(callee.delcaration.params) == count
+                ):
+                    try:
+                        return callee.call(interpreter, arguments)
+                    except RecursionError:
+                        raise PloxRuntimeError(paren, "Stack overflow.") from None
+                if not isinstance(callee, PloxCallable):
+                    raise PloxRuntimeError(
+                        paren, "Can only call functions and classes."
+                    )
+                if count != callee.arity():
+                    raise PloxRuntimeError(
+                        paren, f"Expected {callee.arity()} arguments but got {count}."
+                    )
+                try:
+                    return callee.call(interpreter, arguments)
+                except RecursionError:
+                    raise PloxRuntimeError(paren, "Stack overflow.") from None
+
+            return call_function
+
+        def call(env):
+            callee = callee_node(env)
+            arguments = [argument(env) for argument in argument_nodes]
+
+            if not isinstance(callee, PloxCallable):
+                raise PloxRuntimeError(paren, "Can only call functions and classes.")
+            if count != callee.arity():
+                raise PloxRuntimeError(
+                    paren, f"Expected {callee.arity()} arguments but got {count}."
+                )
+            try:
+                return callee.call(interpreter, arguments)
+            except RecursionError:
+                raise PloxRuntimeError(paren, "Stack overflow.") from None
+
+        return call
+
+    def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
+        body = self.function_body(expression)
+        captures = expression.captures
+        return lambda env: CompiledAnonymFunction(
+            expression, capture(env, captures), body
+        )
+
+    def visit_get_expr(self, expression: expr.Get) -> Any:
+        obj_node = self.compile_node(expression.obj)
+        name = expression.name
+
+        def get(env):
+            obj = obj_node(env)
+            if isinstance(obj, PloxInstance):
+                return obj.get(name)
+            raise PloxRuntimeError(name, "Only instances have properties.")
+
+        return get
+
+    def visit_set_expr(self, expression: expr.Set) -> Any:
+        obj_node = self.compile_node(expression.obj)
+        value_node = self.compile_node(expression.value)
+        name = expression.name
+        symbol = name.symbol
+
+        def set(env):
+            obj = obj_node(env)
+            if not isinstance(obj, PloxInstance):
+                raise PloxRuntimeError(name, "Only instances have fields.")
+            value = value_node(env)
+            obj.fields[symbol] = value
+            return value
+
+        return set
+
+    def visit_super_expr(self, expression: expr.Super) -> Any:
+        distance = expression.depth
+        slot = expression.slot
+        self_slot = expression.self_slot
+        method_name = expression.method
+
+        def super_method(env):
+            closure = env.ancestor(distance)
+            superclass = closure.values[slot].value
+            obj = closure.values[self_slot].value
+            method = superclass.find_method(method_name.symbol)
+            if method is None:
+                raise PloxRuntimeError(
+                    method_name, f"undefined property '{method_name.symbol}'."
+                )
+            return method.bind(obj)
+
+        return super_method
+
+    def variable(self, name: Token, expression: expr.Expr) -> Node:
+        symbol = name.symbol
+        distance = expression.depth
+
+        if distance is None:
+            cell = expression.global_cell
+
+            def global_variable(env):
+                value = cell.value
+                if value is UNDEFINED:
+                    raise PloxRuntimeError(name, f"Undefined variable '{symbol}'.")
+                return value
+
+            return global_variable
+
+        slot = expression.slot
+        if expression.cell:
+            if distance == 0:
+                return lambda env: env.values[slot].value
+            if distance == 1:
+                return lambda env: env.enclosing.values[slot].value
+            return lambda env: env.ancestor(distance).values[slot].value
+        if distance == 0:
+            return lambda env: env.values[slot]
+        if distance == 1:
+            return lambda env: env.enclosing.values[slot]
+        if distance == 2:
+            return lambda env: env.enclosing.enclosing.values[slot]
+        return lambda env: env.ancestor(distance).values[slot]
+
+    def store(self, target: expr.Variable) -> Callable[[Env | Globals, Any], None]:
+        """Writes a value to the variable target is resolved to."""
+        name = target.name
+        slot = target.slot
+        distance = target.depth
+
+        if distance is None:
+            cell = target.global_cell
+
+            def store_global(env, value):
+                if cell.value is UNDEFINED:
+                    raise PloxRuntimeError(name, f"Undefined variable '{name.symbol}'.")
+                cell.value = value
+
+            return store_global
+
+        if target.cell:
+
+            def store_cell(env, value):
+                env.ancestor(distance).values[slot].value = value
+
+            return store_cell
+
+        if distance == 0:
+
+            def store_local(env, value):
+                env.values[slot] = value
+
+            return store_local
+
+        def store_enclosing(env, value):
+            env.ancestor(distance).values[slot] = value
+
+        return store_enclosing
+
+
+class ClosureInterpreter(Interpreter):
+    """Runs programs through the ClosureCompiler instead of walking the AST."""
+
+    def interpret(self, statements):
+        program = ClosureCompiler(self).compile(statements)
+        try:
+            program(self.globals)
+        except PloxRuntimeError as error:
+            runtime_error(error)
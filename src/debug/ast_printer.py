@@ -29,11 +29,12 @@ class AstPrinter(expr.Visitor):
     def visit_unary_expr(self, expression: expr.Unary):
         return self.parenthesize(expression.operator.symbol, expression.right)
 
-    def visit_postfix_expr(self, expression: expr.Postfix):
-        return self.parenthesize('postfix ' + expression.operator.symbol, expression.left)
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign):
+        return self.parenthesize(expression.operator.symbol, expression.target, expression.value)
 
-    def visit_prefix_expr(self, expression: expr.Prefix):
-        return self.parenthesize('prefix ' + expression.operator.symbol, expression.right)
+    def visit_increment_expr(self, expression: expr.Increment):
+        fix = 'prefix ' if expression.prefix else 'postfix '
+        return self.parenthesize(fix + expression.operator.symbol, expression.target)
 
     def visit_grouping_expr(self, expression: expr.Grouping):
         return self.parenthesize("group", expression.expression)
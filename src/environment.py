@@ -1,37 +1,73 @@
-from typing import Any
-
 from values.tokens import Token
 
 from errors.exceptions import PloxRuntimeError
 
 
-class Env:
-    def __init__(self, enclosing=None):
-        self.values: dict[str, Any] = {}
-        self.enclosing = enclosing
+class Cell:
+    """A local captured by a function, shared by its scope and the
+    functions capturing it, or a global."""
 
-    def get(self, name: Token):
-        if name.symbol in self.values:
-            return self.values.get(name.symbol)
+    __slots__ = ("value",)
+
+    def __init__(self, value) -> None:
+        self.value = value
+
+
+# The value of the Cell of a global that is not defined yet.
+UNDEFINED = object()
 
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
+
+class Globals:
+    """The top level scope. Every global name has one Cell for the whole
+    run, created when the Resolver first meets the name, so reads and writes
+    go through the Cell found at resolution instead of looking the name up.
+    Functions and REPL lines may refer to a global before it is defined, its
+    Cell holds UNDEFINED until then."""
+
+    def __init__(self) -> None:
+        self.cells: dict[str, Cell] = {}
+        self.enclosing = None
+
+    def cell(self, name: str) -> Cell:
+        cell = self.cells.get(name)
+        if cell is None:
+            cell = self.cells[name] = Cell(UNDEFINED)
+        return cell
+
+    def get(self, name: Token):
+        cell = self.cells.get(name.symbol)
+        if cell is not None and cell.value is not UNDEFINED:
+            return cell.value
 
         raise PloxRuntimeError(name, f"Undefined variable '{name.symbol}'.")
 
     def assign(self, name: Token, value):
-        if name.symbol in self.values:
-            self.values[name.symbol] = value
-            return
-
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
+        cell = self.cells.get(name.symbol)
+        if cell is not None and cell.value is not UNDEFINED:
+            cell.value = value
             return
 
         raise PloxRuntimeError(name, f"Undefined variable '{name.symbol}'.")
 
     def define(self, name: str, value):
-        self.values[name] = value
+        self.cell(name).value = value
+
+
+class Env:
+    """A local scope: a block, a function call, or the scopes holding `self`
+    and `super` around methods. The Resolver gives every local a slot in its
+    scope, and variables are accessed by how many scopes out and at which
+    slot they live. Captured locals are held in a Cell in their slot.
+
+    A function does not keep the Env it is created in. Its closure is an
+    Env of only the Cells it captures, with no enclosing Env, which
+    encloses the Env of each of its calls."""
+
+    __slots__ = ("values", "enclosing")
+
+    def __init__(self, enclosing, values: list) -> None:
+        self.values = values
+        self.enclosing = enclosing
 
     def ancestor(self, distance: int):
         env = self
@@ -39,8 +75,20 @@ class Env:
             env = env.enclosing
         return env
 
-    def get_at(self, distance: int, name: str):
-        return self.ancestor(distance).values.get(name)
+    def get_at(self, distance: int, slot: int):
+        return self.ancestor(distance).values[slot]
+
+    def assign_at(self, distance: int, slot: int, value):
+        self.ancestor(distance).values[slot] = value
+
+
+def frame(values: list, cells) -> list:
+    """Puts the slots of a new Env's values that are captured into Cells."""
+    for slot in cells:
+        values[slot] = Cell(values[slot])
+    return values
+
 
-    def assign_at(self, distance, name, value):
-        self.ancestor(distance).values[name.symbol] = value
+def capture(env: Env | Globals, captures) -> Env:
+    """The closure of a function created in env."""
+    return Env(None, [env.ancestor(depth).values[slot] for depth, slot in captures])
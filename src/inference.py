@@ -0,0 +1,142 @@
+from dataclasses import fields
+
+from values.tokens import TokenType
+from values import expr
+from values import stmt
+
+from transpiler.scopes import Binding, ScopeAnalyzer
+
+FLOAT = "float"
+STR = "str"
+BOOL = "bool"
+
+# Not yet known, on the way down to a type or None during the fixpoint.
+ANY = "*"
+
+NUMERIC = {
+    TokenType.MINUS,
+    TokenType.STAR,
+    TokenType.SLASH,
+    TokenType.MODULO,
+}
+
+BOOLEAN = {
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+}
+
+
+def join(a, b):
+    if a == ANY:
+        return b
+    if b == ANY:
+        return a
+    return a if a == b else None
+
+
+def nodes(node):
+    """Every statement and expression in node, depth first."""
+    if isinstance(node, list):
+        for item in node:
+            yield from nodes(item)
+    elif isinstance(node, (expr.Expr, stmt.Stmt)):
+        yield node
+        for field in fields(node):
+            yield from nodes(getattr(node, field.name))
+
+
+class TypeInference:
+    """Infers which expressions always evaluate to a float, a string or a
+    boolean, and stores that in expression.inferred.
+
+    Only operators and locals are typed. An operator's result type follows
+    from the operator itself: arithmetic either yields a float or raises.
+    A local declared with let is typed when every value ever assigned to it
+    has the same type, found by a fixpoint that starts out assuming every
+    local is typed. ++, -- and compound assignment only ever store floats,
+    so they never untype a local. Globals, parameters and everything else
+    stay untyped and keep their runtime checks.
+    """
+
+    def __init__(self) -> None:
+        self.analyzer = ScopeAnalyzer()
+        self.writes: dict[Binding, list[expr.Expr | None]] = {}
+        self.types: dict[Binding, str | None] = {}
+
+    def analyze(self, statements: list[stmt.Stmt]):
+        self.analyzer.analyze(statements)
+        references = self.analyzer.references
+
+        for node in nodes(statements):
+            if isinstance(node, stmt.Var):
+                binding = self.analyzer.declarations[id(node)]
+                if binding is not None:
+                    self.writes.setdefault(binding, []).append(node.initializer)
+            elif isinstance(node, expr.Assign):
+                binding = references[id(node)]
+                if binding in self.writes:
+                    self.writes[binding].append(node.value)
+
+        self.types = {binding: ANY for binding in self.writes}
+        changed = True
+        while changed:
+            changed = False
+            for binding, writes in self.writes.items():
+                inferred = ANY
+                for value in writes:
+                    inferred = join(inferred, self.infer(value))
+                previous = self.types[binding]
+                if inferred != previous:
+                    # A local only ever loses precision, which bounds the
+                    # number of rounds.
+                    self.types[binding] = inferred if previous == ANY else None
+                    changed = True
+        for binding, inferred in self.types.items():
+            if inferred == ANY:
+                self.types[binding] = None
+
+        for node in nodes(statements):
+            if isinstance(node, expr.Expr):
+                inferred = self.infer(node)
+                if inferred is not None and inferred != ANY:
+                    node.inferred = inferred
+
+    def infer(self, node: expr.Expr | None) -> str | None:
+        if isinstance(node, expr.Literal):
+            return {float: FLOAT, str: STR, bool: BOOL}.get(type(node.value))
+        if isinstance(node, expr.Grouping):
+            return self.infer(node.expression)
+        if isinstance(node, expr.Variable):
+            binding = self.analyzer.references[id(node)]
+            return self.types.get(binding)
+        if isinstance(node, (expr.CompoundAssign, expr.Increment)):
+            return FLOAT
+        if isinstance(node, expr.Unary):
+            if node.operator._type == TokenType.BANG:
+                return BOOL
+            return FLOAT
+        if isinstance(node, expr.Binary):
+            operator = node.operator._type
+            if operator in NUMERIC:
+                return FLOAT
+            if operator in BOOLEAN:
+                return BOOL
+            left, right = self.infer(node.left), self.infer(node.right)
+            if left == STR or right == STR:
+                return STR
+            if left in (FLOAT, ANY) and right in (FLOAT, ANY):
+                return join(left, right)
+            return None
+        if isinstance(node, expr.Logical):
+            return join(self.infer(node.left), self.infer(node.right))
+        if isinstance(node, expr.Ternary):
+            return join(
+                self.infer(node.expression_true), self.infer(node.expression_false)
+            )
+        if isinstance(node, (expr.Assign, expr.Set)):
+            return self.infer(node.value)
+        return None
@@ -3,27 +3,44 @@ from typing import Any
 from objects.callable import PloxCallable
 from objects.klass import PloxClass, PloxInstance
 from objects.function import PloxAnonymFunction, PloxFunction
-from objects.returns import Returns
+from objects.returns import BREAK, CONTINUE, LoopExit, Returns, TailCall
 
 from values.tokens import Token, TokenType
 from values import expr
 from values import stmt
 
-from environment import Env
+from environment import UNDEFINED, Cell, Env, Globals, capture, frame
+from tiering import Tiering
+from profiles import TypeFeedback
+from quickening import (
+    quicken_binary,
+    quicken_compound,
+    quicken_increment,
+    quicken_unary,
+)
 from stdlib.plox_time import PloxTime, PloxPrint
+from stdlib.plox_range import PloxRange, Range
 
 from errors.exceptions import PloxRuntimeError
 from errors.error import runtime_error
 
+# How many iterations a loop runs between checks for a compiled version.
+LOOP_CHECK_INTERVAL = 64
+
 
 class Interpreter(expr.Visitor, stmt.Visitor):
     def __init__(self):
-        self.globals = Env()
-        self.env: Env = self.globals
-        self.locals: dict[expr.Expr, int] = {}
+        self.globals = Globals()
+        self.env: Env | Globals = self.globals
+        # Names declared with const at the top level, by this or earlier
+        # REPL lines.
+        self.constants: set[str] = set()
+        self.tiering = Tiering(self)
+        self.feedback = TypeFeedback()
 
         self.globals.define("time", PloxTime())
         self.globals.define("print", PloxPrint())
+        self.globals.define("range", PloxRange())
 
     def interpret(self, statements):
         try:
@@ -35,77 +52,329 @@ class Interpreter(expr.Visitor, stmt.Visitor):
     def evaluate(self, expression: expr.Expr):
         return expression.accept(self)
 
-    def execute(self, statement: stmt.Stmt):
-        statement.accept(self)
+    def execute(self, statement: stmt.Stmt) -> Returns | LoopExit | None:
+        """Runs statement, gives back a Returns when it ran a `return` and
+        BREAK or CONTINUE when it ran a `break` or `continue`."""
+        return statement.accept(self)
+
+    def resolve(self, expression: expr.Expr, depth: int, slot: int):
+        expression.depth = depth
+        expression.slot = slot
+
+    def resolve_global(self, expression: expr.Expr, name: str):
+        expression.global_cell = self.globals.cell(name)
 
-    def resolve(self, expression: expr.Expr, depth: int):
-        self.locals[expression] = depth
+    def declare(self, statement: stmt.Var | stmt.Function | stmt._Class, value):
+        if statement.slot is None:
+            self.globals.define(statement.name.symbol, value)
+        elif statement.cell:
+            self.env.values[statement.slot].value = value
+        else:
+            self.env.values[statement.slot] = value
 
-    def execute_block(self, statements: list[stmt.Stmt], env: Env):
+    def execute_block(
+        self, statements: list[stmt.Stmt], env: Env
+    ) -> Returns | LoopExit | None:
         previous: Env = self.env
         try:
             self.env = env
 
             for statement in statements:
-                self.execute(statement)
+                returns = self.execute(statement)
+                if returns is not None:
+                    return returns
         finally:
             self.env = previous
 
     def visit_block_stmt(self, statement: stmt.Block) -> Any:
-        self.execute_block(statement.statements, Env(self.env))
+        if not statement.scoped:
+            for inner in statement.statements:
+                returns = self.execute(inner)
+                if returns is not None:
+                    return returns
+            return None
+
+        values = [None] * statement.slots
+        if statement.cells:
+            frame(values, statement.cells)
+        return self.execute_block(statement.statements, Env(self.env, values))
 
     def visit_class_stmt(self, statement: stmt._Class) -> Any:
         superclass = None
         if statement.superclass:
             superclass = self.evaluate(statement.superclass)
             if not isinstance(superclass, PloxClass):
-                raise RuntimeError(
+                raise PloxRuntimeError(
                     statement.superclass.name, "superclass must be a class."
                 )
 
-        self.env.define(statement.name.symbol, None)
+        self.declare(statement, None)
 
         if statement.superclass:
-            self.env = Env(self.env)
-            self.env.define("super", superclass)
+            self.env = Env(self.env, [Cell(superclass)])
 
+        # The scope of `self`, bind gives each bound method its own Cell.
+        scope = Env(self.env, [Cell(None)])
         methods = {}
         for method in statement.methods:
-            function = PloxFunction(method, self.env, method.name.symbol == "init")
+            function = PloxFunction(
+                method, capture(scope, method.captures), method.name.symbol == "init"
+            )
             methods[method.name.symbol] = function
         klass = PloxClass(statement.name.symbol, methods, superclass)
         if superclass:
             self.env = self.env.enclosing
 
-        self.env.assign(statement.name, klass)
+        self.declare(statement, klass)
 
     def visit_function_stmt(self, statement: stmt.Function) -> Any:
-        function: PloxFunction = PloxFunction(statement, self.env, False)
-        self.env.define(statement.name.symbol, function)
+        function: PloxFunction = PloxFunction(
+            statement, capture(self.env, statement.captures), False
+        )
+        self.declare(statement, function)
 
     def visit_if_stmt(self, statement: stmt.If) -> Any:
         if self.is_truthy(self.evaluate(statement.condition)):
-            self.execute(statement.then)
+            return self.execute(statement.then)
         elif statement.els is not None:
-            self.execute(statement.els)
+            return self.execute(statement.els)
+
+    def visit_match_stmt(self, statement: stmt.Match) -> Any:
+        arm = self.match_arm(statement)
+        if arm is not None:
+            return self.execute(arm)
+
+    def match_arm(self, statement: stmt.Match) -> stmt.Stmt | None:
+        """The arm matching the value, the else or None without one."""
+        value = self.evaluate(statement.value)
+        if statement.table is not None:
+            index = statement.table.get(value)
+            if index is not None:
+                return statement.arms[index]
+        else:
+            for pattern, arm in zip(statement.patterns, statement.arms):
+                if self.is_equal(value, self.evaluate(pattern)):
+                    return arm
+        return statement.els
 
     def visit_var_stmt(self, statement: stmt.Var) -> Any:
         value = None
         if statement.initializer is not None:
             value = self.evaluate(statement.initializer)
 
-        self.env.define(statement.name.symbol, value)
+        self.declare(statement, value)
 
     def visit_return_stmt(self, statement: stmt.Return) -> Any:
+        if statement.tail:
+            function, arguments = self.call_arguments(statement.value)
+            if isinstance(function, (PloxFunction, PloxAnonymFunction)):
+                return Returns(TailCall(function, arguments))
+            return Returns(function.call(self, arguments))
+
         value = None
         if statement.value is not None:
             value = self.evaluate(statement.value)
 
-        raise Returns(value)
+        return Returns(value)
+
+    def visit_yield_stmt(self, statement: stmt.Yield) -> Any:
+        # Generator bodies run their yields through generate_statement, the
+        # Resolver rejects them anywhere else.
+        raise PloxRuntimeError(
+            statement.keyword, "Can only yield from the body of a generator."
+        )
+
+    def visit_break_stmt(self, statement: stmt.Break) -> Any:
+        return BREAK
+
+    def visit_continue_stmt(self, statement: stmt.Continue) -> Any:
+        return CONTINUE
 
     def visit_while_stmt(self, statement: stmt.While) -> Any:
+        compiled = self.tiering.loop(statement, 0)
+        if compiled is not None:
+            return compiled(self.env)
+
+        increment = statement.increment
+        back_edges = 0
         while self.is_truthy(self.evaluate(statement.condition)):
-            self.execute(statement.body)
+            returns = self.execute(statement.body)
+            if returns is not None and returns is not CONTINUE:
+                self.tiering.loop(statement, back_edges)
+                if returns is BREAK:
+                    return None
+                return returns
+            if increment is not None:
+                self.evaluate(increment)
+            back_edges += 1
+            if back_edges == LOOP_CHECK_INTERVAL:
+                compiled = self.tiering.loop(statement, back_edges)
+                if compiled is not None:
+                    return compiled(self.env)
+                back_edges = 0
+        self.tiering.loop(statement, back_edges)
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        iterator = self.iterate(self.evaluate(statement.iterable), statement.keyword)
+        if statement.cell:
+            iterator = map(Cell, iterator)
+        values = [None]
+        env = Env(self.env, values)
+        compiled = self.tiering.loop(statement, 0)
+        if compiled is not None:
+            return compiled(env, iterator)
+
+        previous = self.env
+        back_edges = 0
+        try:
+            self.env = env
+            for values[0] in iterator:
+                returns = self.execute(statement.body)
+                if returns is not None and returns is not CONTINUE:
+                    self.tiering.loop(statement, back_edges)
+                    if returns is BREAK:
+                        return None
+                    return returns
+                back_edges += 1
+                if back_edges == LOOP_CHECK_INTERVAL:
+                    compiled = self.tiering.loop(statement, back_edges)
+                    if compiled is not None:
+                        return compiled(env, iterator)
+                    back_edges = 0
+        except ValueError as error:
+            self.reentered(error, statement.keyword)
+        finally:
+            self.env = previous
+        self.tiering.loop(statement, back_edges)
+
+    def iterate(self, iterable, keyword: Token):
+        """The Python iterator a for-in loop takes its values from: the
+        numbers of a range, the characters of a string, the values of a
+        generator or the items of any iterable the host provides."""
+        if isinstance(iterable, Range):
+            if type(iterable.start) is not float or type(iterable.stop) is not float:
+                raise PloxRuntimeError(keyword, "Range bounds must be numbers.")
+        try:
+            return iter(iterable)
+        except TypeError:
+            raise PloxRuntimeError(
+                keyword,
+                "Can only iterate over ranges, strings, generators and collections.",
+            ) from None
+
+    def reentered(self, error: ValueError, keyword: Token):
+        """Raises what a for-in loop failed with while asking its iterator
+        for the next item. Asking a generator whose body is running further
+        up the stack, directly or through other generators, is reported at
+        the `in` of the loop."""
+        if str(error) != "generator already executing":
+            raise error
+        raise PloxRuntimeError(
+            keyword, "Can't resume a generator that is already running."
+        ) from None
+
+    # Generators
+    #
+    # The body of a generator call runs as a Python generator that suspends
+    # at every `yield`. Statements that cannot yield run as usual, the ones
+    # that can are walked by generate_statement. Other code runs with
+    # self.env while the body is suspended, so generate() swaps the Env of
+    # the body in and out around every step. The walk itself restores Envs
+    # without `finally`, a body dropped while suspended is closed without
+    # touching self.env, and errors restore it in generate().
+
+    def generate(self, statements: list[stmt.Stmt], env: Env):
+        steps = self.generate_sequence(statements)
+        current = env
+        while True:
+            caller = self.env
+            self.env = current
+            try:
+                value = next(steps)
+            except StopIteration:
+                return
+            finally:
+                current = self.env
+                self.env = caller
+            yield value
+
+    def generate_sequence(self, statements: list[stmt.Stmt]):
+        for statement in statements:
+            if statement.yields or type(statement) is stmt.Yield:
+                returns = yield from self.generate_statement(statement)
+            else:
+                returns = self.execute(statement)
+            if returns is not None:
+                return returns
+
+    def generate_statement(self, statement: stmt.Stmt):
+        """Runs statement in a generator body, gives back what execute
+        would."""
+        if type(statement) is stmt.Yield:
+            value = None
+            if statement.value is not None:
+                value = self.evaluate(statement.value)
+            yield value
+            return None
+        if not statement.yields:
+            return self.execute(statement)
+
+        if type(statement) is stmt.Block:
+            if not statement.scoped:
+                return (yield from self.generate_sequence(statement.statements))
+            values = [None] * statement.slots
+            if statement.cells:
+                frame(values, statement.cells)
+            previous = self.env
+            self.env = Env(previous, values)
+            returns = yield from self.generate_sequence(statement.statements)
+            self.env = previous
+            return returns
+
+        if type(statement) is stmt.If:
+            if self.is_truthy(self.evaluate(statement.condition)):
+                return (yield from self.generate_statement(statement.then))
+            if statement.els is not None:
+                return (yield from self.generate_statement(statement.els))
+            return None
+
+        if type(statement) is stmt.Match:
+            arm = self.match_arm(statement)
+            if arm is None:
+                return None
+            return (yield from self.generate_statement(arm))
+
+        if type(statement) is stmt.While:
+            while self.is_truthy(self.evaluate(statement.condition)):
+                returns = yield from self.generate_statement(statement.body)
+                if returns is BREAK:
+                    return None
+                if type(returns) is Returns:
+                    return returns
+                if statement.increment is not None:
+                    self.evaluate(statement.increment)
+            return None
+
+        # A for-in loop.
+        iterable = self.evaluate(statement.iterable)
+        iterator = self.iterate(iterable, statement.keyword)
+        if statement.cell:
+            iterator = map(Cell, iterator)
+        values = [None]
+        previous = self.env
+        self.env = Env(previous, values)
+        returns = None
+        try:
+            for values[0] in iterator:
+                returns = yield from self.generate_statement(statement.body)
+                if returns is BREAK or type(returns) is Returns:
+                    break
+        except ValueError as error:
+            self.reentered(error, statement.keyword)
+        self.env = previous
+        if type(returns) is Returns:
+            return returns
+        return None
 
     def visit_expression_stmt(self, statement: stmt.Expression) -> Any:
         self.evaluate(statement.expression)
@@ -115,13 +384,13 @@ class Interpreter(expr.Visitor, stmt.Visitor):
         print(self.stringify(value))
 
     def visit_super_expr(self, expression: expr.Super) -> Any:
-        distance = self.locals[expression]
-        superclass = self.env.get_at(distance, "super")
-        obj = self.env.get_at(distance - 1, "self")
+        closure = self.env.ancestor(expression.depth)
+        superclass = closure.values[expression.slot].value
+        obj = closure.values[expression.self_slot].value
         method = superclass.find_method(expression.method.symbol)
 
         if method is None:
-            raise RuntimeError(
+            raise PloxRuntimeError(
                 expression.method, f"undefined property '{expression.method.symbol}'."
             )
         return method.bind(obj)
@@ -130,28 +399,41 @@ class Interpreter(expr.Visitor, stmt.Visitor):
         obj = self.evaluate(expression.obj)
 
         if not isinstance(obj, PloxInstance):
-            raise RuntimeError(expression.name, "Only instances have fields.")
+            raise PloxRuntimeError(expression.name, "Only instances have fields.")
 
         value = self.evaluate(expression.value)
         obj.set(expression.name, value)
         return value
 
     def visit_get_expr(self, expression: expr.Get) -> Any:
-        obj = self.evaluate(expression.obj)
+        return self.get_property(self.evaluate(expression.obj), expression.name)
+
+    def get_property(self, obj, name: Token):
         if isinstance(obj, PloxInstance):
-            return obj.get(expression.name)
-        raise RuntimeError(expression.name, "Only instances have properties.")
+            return obj.get(name)
+        raise PloxRuntimeError(name, "Only instances have properties.")
 
     def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
-        function: PloxAnonymFunction = PloxAnonymFunction(expression, self.env)
+        function: PloxAnonymFunction = PloxAnonymFunction(
+            expression, capture(self.env, expression.captures)
+        )
         return function
 
     def visit_call_expr(self, expression: expr.Call) -> Any:
+        function, arguments = self.call_arguments(expression)
+        try:
+            return function.call(self, arguments)
+        except RecursionError:
+            raise PloxRuntimeError(expression.paren, "Stack overflow.") from None
+
+    def call_arguments(self, expression: expr.Call) -> tuple[PloxCallable, list]:
+        """Evaluates the callee and arguments of a call and checks them."""
         callee = self.evaluate(expression.callee)
 
         arguments = []
         for arg in expression.arguments:
             arguments.append(self.evaluate(arg))
+        self.feedback.record(expression.paren, callee)
 
         if not isinstance(callee, PloxCallable):
             raise PloxRuntimeError(
@@ -164,19 +446,24 @@ class Interpreter(expr.Visitor, stmt.Visitor):
                 expression.paren,
                 f"Expected {function.arity()} arguments but got {len(arguments)}.",
             )
-
-        return function.call(self, arguments)
+        return function, arguments
 
     def visit_assign_expr(self, expression: expr.Assign) -> Any:
         value = self.evaluate(expression.value)
-        distance = self.locals.get(expression)
-        if distance is not None:
-            self.env.assign_at(distance, expression.name, value)
-        else:
-            self.globals.assign(expression.name, value)
-
+        self.assign_variable(expression, value)
         return value
 
+    def assign_variable(self, target: expr.Assign | expr.Variable, value):
+        distance = target.depth
+        if target.cell:
+            self.env.get_at(distance, target.slot).value = value
+        elif distance is not None:
+            self.env.assign_at(distance, target.slot, value)
+        elif target.global_cell.value is UNDEFINED:
+            self.undefined(target.name)
+        else:
+            target.global_cell.value = value
+
     def visit_ternary_expr(self, expression: expr.Ternary) -> Any:
         condition = self.evaluate(expression.condition)
         if self.is_truthy(condition):
@@ -197,16 +484,23 @@ class Interpreter(expr.Visitor, stmt.Visitor):
         return self.evaluate(expression.right)
 
     def visit_binary_expr(self, expression: expr.Binary) -> Any:
+        if expression.quickened is not None:
+            return expression.quickened(self, expression)
+
         left = self.evaluate(expression.left)
         right = self.evaluate(expression.right)
+        self.feedback.record(expression.operator, left, right)
+        expression.quickened = quicken_binary(expression, self.feedback)
+        return self.binary(expression, left, right)
 
+    def binary(self, expression: expr.Binary, left, right):
         match expression.operator._type:
             case TokenType.MINUS:
                 self.check_number_operands(expression.operator, left, right)
-                return float(left) - float(right)
+                return left - right
             case TokenType.PLUS:
                 if isinstance(left, float) and isinstance(right, float):
-                    return float(left) + float(right)
+                    return left + right
                 if isinstance(left, str) and isinstance(right, str):
                     return str(left) + str(right)
                 if isinstance(left, str) or isinstance(right, str):
@@ -216,128 +510,127 @@ class Interpreter(expr.Visitor, stmt.Visitor):
                 )
             case TokenType.SLASH:
                 self.check_number_operands(expression.operator, left, right)
-                if float(left) == 0 or float(right) == 0:
+                if left == 0 or right == 0:
                     raise PloxRuntimeError(
                         expression.operator, "Trying to devide by Zero."
                     )
-                return float(left) / float(right)
+                return left / right
             case TokenType.STAR:
                 self.check_number_operands(expression.operator, left, right)
-                return float(left) * float(right)
+                return left * right
             case TokenType.MODULO:
                 self.check_number_operands(expression.operator, left, right)
-                return float(left) % float(right)
+                return left % right
             case TokenType.GREATER:
                 self.check_number_operands(expression.operator, left, right)
-                return float(left) > float(right)
+                return left > right
             case TokenType.GREATER_EQUAL:
                 self.check_number_operands(expression.operator, left, right)
-                return float(left) >= float(right)
+                return left >= right
             case TokenType.LESS:
                 self.check_number_operands(expression.operator, left, right)
-                return float(left) < float(right)
+                return left < right
             case TokenType.LESS_EQUAL:
                 self.check_number_operands(expression.operator, left, right)
-                return float(left) <= float(right)
+                return left <= right
             case TokenType.BANG_EQUAL:
                 return not self.is_equal(left, right)
             case TokenType.EQUAL_EQUAL:
                 return self.is_equal(left, right)
-            case TokenType.PLUS_ASSIGN:
-                if not isinstance(expression.left, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to assign to a literal value"
-                    )
-                self.check_number_operands(expression.operator, left, right)
-                self.env.assign(expression.left.name, left + right)
-                return left + right
-            case TokenType.MINUS_ASSIGN:
-                if not isinstance(expression.left, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to assign to a literal value"
-                    )
-                self.check_number_operands(expression.operator, left, right)
-                self.env.assign(expression.left.name, left - right)
-                return left - right
-            case TokenType.STAR_ASSIGN:
-                if not isinstance(expression.left, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to assign to a literal value"
-                    )
-                self.check_number_operands(expression.operator, left, right)
-                self.env.assign(expression.left.name, left * right)
-                return left * right
-            case TokenType.SLASH_ASSIGN:
-                if not isinstance(expression.left, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to assign to a literal value"
-                    )
-                self.check_number_operands(expression.operator, left, right)
-                if float(left) == 0 or float(right) == 0:
-                    raise PloxRuntimeError(
-                        expression.operator, "Trying to devide by Zero."
-                    )
-                self.env.assign(expression.left.name, left / right)
-                return left / right
 
     def visit_unary_expr(self, expression: expr.Unary) -> Any:
+        if expression.quickened is not None:
+            return expression.quickened(self, expression)
+
         # Evaluate operand expression
         right = self.evaluate(expression.right)
+        expression.quickened = quicken_unary(expression, right)
+        return self.unary(expression, right)
 
+    def unary(self, expression: expr.Unary, right):
         # Apply unary operator
         match expression.operator._type:
             case TokenType.BANG:
                 return not self.is_truthy(right)
             case TokenType.MINUS:
                 self.check_number_operand(expression.operator, right)
-                return -float(right)
+                return -right
 
-    def visit_prefix_expr(self, expression: expr.Prefix) -> Any:
-        right = self.evaluate(expression.right)
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign) -> Any:
+        if expression.quickened is not None:
+            return expression.quickened(self, expression)
 
-        match expression.operator._type:
-            case TokenType.MINUS_MINUS:
-                if not isinstance(expression.right, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to decrement a literal value"
-                    )
-                self.check_number_operand(expression.operator, right)
-                self.env.assign(expression.right.name, right - 1)
-                return float(right - 1)
-            case TokenType.PLUS_PLUS:
-                if not isinstance(expression.right, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to increment a literal value"
-                    )
-                self.check_number_operand(expression.operator, right)
-                self.env.assign(expression.right.name, right + 1)
-                return float(right + 1)
+        value = self.compound_assign(expression)
+        expression.quickened = quicken_compound(expression, self.feedback)
+        return value
 
-    def visit_postfix_expr(self, expression: expr.Postfix) -> Any:
-        left = self.evaluate(expression.left)
+    def compound_assign(self, expression: expr.CompoundAssign):
+        target = expression.target
+        if isinstance(target, expr.Get):
+            obj = self.evaluate(target.obj)
+            current = self.get_property(obj, target.name)
+        else:
+            current = self.evaluate(target)
+        operand = self.evaluate(expression.value)
+        self.feedback.record(expression.operator, current, operand)
+        value = self.compound(expression.operator, current, operand)
+        if isinstance(target, expr.Get):
+            obj.set(target.name, value)
+        else:
+            self.assign_variable(target, value)
+        return value
 
-        match expression.operator._type:
-            case TokenType.MINUS_MINUS:
-                if not isinstance(expression.left, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to decrement a literal value"
-                    )
-                self.check_number_operand(expression.operator, left)
-                self.env.assign(expression.left.name, left - 1)
-                return float(left)
-            case TokenType.PLUS_PLUS:
-                if not isinstance(expression.left, expr.Variable):
-                    raise PloxRuntimeError(
-                        expression.operator, "attempting to increment a literal value"
-                    )
-                self.check_number_operand(expression.operator, left)
-                self.env.assign(expression.left.name, left + 1)
-                return float(left)
+    def compound(self, operator: Token, current, operand):
+        self.check_number_operands(operator, current, operand)
+        match operator._type:
+            case TokenType.PLUS_ASSIGN:
+                return current + operand
+            case TokenType.MINUS_ASSIGN:
+                return current - operand
+            case TokenType.STAR_ASSIGN:
+                return current * operand
+            case TokenType.SLASH_ASSIGN:
+                if current == 0 or operand == 0:
+                    raise PloxRuntimeError(operator, "Trying to devide by Zero.")
+                return current / operand
+
+    def visit_increment_expr(self, expression: expr.Increment) -> Any:
+        if expression.quickened is not None:
+            return expression.quickened(self, expression)
+
+        value = self.increment_assign(expression)
+        expression.quickened = quicken_increment(expression, self.feedback)
+        return value
+
+    def increment_assign(self, expression: expr.Increment):
+        target = expression.target
+        if isinstance(target, expr.Get):
+            obj = self.evaluate(target.obj)
+            current = self.get_property(obj, target.name)
+        else:
+            current = self.evaluate(target)
+        self.feedback.record(expression.operator, current)
+        value = self.increment(expression.operator, current)
+        if isinstance(target, expr.Get):
+            obj.set(target.name, value)
+        else:
+            self.assign_variable(target, value)
+        return value if expression.prefix else current
+
+    def increment(self, operator: Token, current):
+        self.check_number_operand(operator, current)
+        if operator._type == TokenType.PLUS_PLUS:
+            return current + 1
+        return current - 1
 
     def visit_grouping_expr(self, expression: expr.Grouping) -> Any:
         return self.evaluate(expression.expression)
 
     def visit_variable_expr(self, expression: expr.Variable) -> Any:
+        if expression.constant:
+            if expression.value is expr.UNSET:
+                expression.value = self.look_up_variable(expression.name, expression)
+            return expression.value
         a = self.look_up_variable(expression.name, expression)
         return a
 
@@ -348,11 +641,18 @@ class Interpreter(expr.Visitor, stmt.Visitor):
         return expression.value
 
     def look_up_variable(self, name: Token, expression: expr.Expr):
-        distance = self.locals.get(expression)
+        distance = expression.depth
+        if expression.cell:
+            return self.env.get_at(distance, expression.slot).value
         if distance is not None:
-            return self.env.get_at(distance, name.symbol)
-        else:
-            return self.globals.get(name)
+            return self.env.get_at(distance, expression.slot)
+        value = expression.global_cell.value
+        if value is UNDEFINED:
+            self.undefined(name)
+        return value
+
+    def undefined(self, name: Token):
+        raise PloxRuntimeError(name, f"Undefined variable '{name.symbol}'.")
 
     def check_number_operand(self, operator: Token, operand):
         if isinstance(operand, float):
@@ -0,0 +1,84 @@
+from values.tokens import Token
+from values import stmt
+
+from errors import error
+from errors.exceptions import PloxRuntimeError
+
+
+class PendingBody:
+    """The body of a function the Parser skipped in lazy mode.
+
+    The Parser only matches the body's braces and keeps where it starts and
+    the identifiers in it. The Resolver keeps a copy of its scopes where the
+    function is declared instead of resolving the body, and captures every
+    local named in it. The first call parses and resolves the body in that
+    context, see materialize.
+    """
+
+    def __init__(self, tokens: list[Token], start: int, names: list[Token]) -> None:
+        self.tokens = tokens
+        self.start = start
+        self.names = names
+        self.interpreter = None
+        self.kind = None
+        self.scopes: list[dict[str, bool]] = []
+        self.slots: list[dict[str, int]] = []
+        self.cells: list[set[str]] = []
+        # The captures of the function, by name.
+        self.captured: dict[str, int] = {}
+        self.constants: list[set[str]] = []
+        self.global_constants: set[str] = set()
+        self.current_class = None
+
+    def defer(self, resolver, kind, captured: dict[str, int]):
+        """Records the Resolver's state at the declaration."""
+        self.interpreter = resolver.interpreter
+        self.kind = kind
+        self.captured = captured
+        self.scopes = [dict(scope) for scope in resolver.scopes]
+        self.slots = [dict(slots) for slots in resolver.slots]
+        self.cells = [set(cells) for cells in resolver.cells]
+        self.constants = [set(constants) for constants in resolver.constants]
+        self.global_constants = set(resolver.global_constants)
+        self.current_class = resolver.current_class
+        # The body may be the only place a variable is used.
+        resolver.resolved.update(self.names)
+
+
+def materialize(declaration: stmt.Function):
+    """Parses and resolves the pending body of declaration."""
+    # Imported here, the parser creates PendingBody.
+    from parser import Parser
+    from resolver import Resolver
+
+    pending = declaration.pending
+    parser = Parser(pending.tokens, "", lazy=True)
+    parser.current = pending.start
+    body, generator = parser.function_body()
+    if error.had_error:
+        raise PloxRuntimeError(
+            declaration.name,
+            f"Can't call '{declaration.name.symbol}', its body has errors.",
+        )
+
+    declaration.body = body
+    declaration.generator = generator
+    declaration.pending = None
+    resolver = Resolver(pending.interpreter)
+    resolver.scopes = pending.scopes
+    resolver.slots = pending.slots
+    resolver.cells = pending.cells
+    resolver.declarations = [{} for _ in pending.scopes]
+    resolver.reads = [{} for _ in pending.scopes]
+    resolver.constants = pending.constants
+    resolver.global_constants = pending.global_constants | (
+        pending.interpreter.constants
+    )
+    resolver.current_class = pending.current_class
+    resolver.resolve_function(declaration, pending.kind, pending.captured)
+    resolver.warn_unused()
+    if error.had_error:
+        raise PloxRuntimeError(
+            declaration.name,
+            f"Can't call '{declaration.name.symbol}', its body has errors.",
+        )
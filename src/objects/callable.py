@@ -5,6 +5,7 @@ from typing import Any
 class PloxCallable(ABC):
     @abstractmethod
     def call(self, interpreter, arguments: list) -> Any:
+        """Callers pass a new list, functions keep it as their frame."""
         pass
 
     @abstractmethod
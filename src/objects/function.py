@@ -1,13 +1,15 @@
 from typing import Any
 
 from objects.callable import PloxCallable
+from objects.generator import PloxGenerator
 from objects.klass import PloxInstance
-from objects.returns import Returns
+from objects.returns import Returns, TailCall
 
 from values import stmt
 from values import expr
 
-from environment import Env
+from environment import Cell, Env, frame
+from lazy import materialize
 
 
 class PloxFunction(PloxCallable):
@@ -22,23 +24,41 @@ class PloxFunction(PloxCallable):
         return len(self.delcaration.params)
 
     def call(self, interpreter, arguments: list):
-        env: Env = Env(self.closure)
-        for i in range(len(self.delcaration.params)):
-            env.define(self.delcaration.params[i].symbol, arguments[i])
-        try:
-            interpreter.execute_block(self.delcaration.body, env)
-        except Returns as return_value:
-            if self.is_initializer:
-                return self.closure.get_at(0, "self")
-            return return_value.value
+        value = self.run(interpreter, arguments)
+        if type(value) is TailCall:
+            return value.trampoline(interpreter)
+        return value
+
+    def run(self, interpreter, arguments: list):
+        """Runs a call, gives back its value or the TailCall it ended in."""
+        if self.delcaration.pending is not None:
+            materialize(self.delcaration)
+        declaration = self.delcaration
+        # A new list at every call site, it becomes the values of the Env.
+        arguments.extend([None] * (declaration.slots - len(arguments)))
+        if declaration.cells:
+            frame(arguments, declaration.cells)
+        env: Env = Env(self.closure, arguments)
+        compiled = interpreter.tiering.function_body(self.delcaration)
+        if compiled is not None:
+            returns = compiled(env)
+        elif declaration.generator:
+            steps = interpreter.generate(declaration.body, env)
+            return PloxGenerator(declaration.name.symbol, steps)
+        else:
+            returns = interpreter.execute_block(self.delcaration.body, env)
 
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return self.closure.values[0].value
+        # A compiled body may give back the value of its last expression.
+        if isinstance(returns, Returns):
+            return returns.value
+        return None
 
     def bind(self, instance: PloxInstance):
-        env = Env(self.closure)
-        env.define("self", instance)
-        return PloxFunction(self.delcaration, env, self.is_initializer)
+        # `self` is always the first capture of a method.
+        closure = Env(None, [Cell(instance), *self.closure.values[1:]])
+        return PloxFunction(self.delcaration, closure, self.is_initializer)
 
     def __str__(self) -> str:
         return f"<fn {self.delcaration.name.symbol}>"
@@ -56,14 +76,28 @@ class PloxAnonymFunction(PloxCallable):
         return len(self.delcaration.params)
 
     def call(self, interpreter, arguments: list):
-        env: Env = Env(self.closure)
-        for i in range(len(self.delcaration.params)):
-            env.define(self.delcaration.params[i].symbol, arguments[i])
-        try:
-            interpreter.execute_block(self.delcaration.body, env)
-        except Returns as return_value:
-            return return_value.value
-
+        value = self.run(interpreter, arguments)
+        if type(value) is TailCall:
+            return value.trampoline(interpreter)
+        return value
+
+    def run(self, interpreter, arguments: list):
+        declaration = self.delcaration
+        arguments.extend([None] * (declaration.slots - len(arguments)))
+        if declaration.cells:
+            frame(arguments, declaration.cells)
+        env: Env = Env(self.closure, arguments)
+        compiled = interpreter.tiering.function_body(self.delcaration)
+        if compiled is not None:
+            returns = compiled(env)
+        elif declaration.generator:
+            steps = interpreter.generate(declaration.body, env)
+            return PloxGenerator("Anonymous", steps)
+        else:
+            returns = interpreter.execute_block(self.delcaration.body, env)
+
+        if isinstance(returns, Returns):
+            return returns.value
         return None
 
     def __str__(self) -> str:
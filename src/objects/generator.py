@@ -0,0 +1,20 @@
+class PloxGenerator:
+    """What calling a function whose body yields gives back: a lazy stream
+    of the values it yields. Every item asked for runs the body up to its
+    next `yield`. Iterating it hands out the Python iterator inside, so a
+    for-in loop drives the suspended body directly."""
+
+    __slots__ = ("name", "iterator")
+
+    def __init__(self, name: str, iterator) -> None:
+        self.name = name
+        self.iterator = iterator
+
+    def __iter__(self):
+        return self.iterator
+
+    def __str__(self) -> str:
+        return f"<generator {self.name}>"
+
+    def __repr__(self) -> str:
+        return f"<generator {self.name}>"
@@ -1,6 +1,8 @@
 from objects.callable import PloxCallable
 from values.tokens import Token
 
+from errors.exceptions import PloxRuntimeError
+
 
 class PloxClass(PloxCallable):
     def __init__(self, name: str, methods: dict, superclass) -> None:
@@ -49,7 +51,7 @@ class PloxInstance:
         if method:
             return method.bind(self)
 
-        raise RuntimeError(name, f"undefined property '{name.symbol}'.")
+        raise PloxRuntimeError(name, f"undefined property '{name.symbol}'.")
 
     def set(self, name: Token, value):
         self.fields[name.symbol] = value
@@ -1,3 +1,47 @@
-class Returns(Exception):
+class Returns:
+    """What executing a `return` gives back. Statements pass it up to the
+    call of their function instead of raising, so returning does not pay
+    for an exception and the unwinding of every block it is nested in."""
+
+    __slots__ = ("value",)
+
     def __init__(self, value) -> None:
         self.value = value
+
+
+class LoopExit:
+    """What executing a `break` or `continue` gives back, passed up like a
+    Returns until it reaches its loop, so leaving a loop early costs an
+    identity check instead of an exception."""
+
+    __slots__ = ("keyword",)
+
+    def __init__(self, keyword: str) -> None:
+        self.keyword = keyword
+
+    def __repr__(self) -> str:
+        return f"<{self.keyword}>"
+
+
+BREAK = LoopExit("break")
+CONTINUE = LoopExit("continue")
+
+
+class TailCall:
+    """The value a `return f(x);` gives back instead of calling f. The call
+    of the enclosing function runs it once its own frame is done, so tail
+    recursion loops in one Python frame instead of nesting."""
+
+    __slots__ = ("function", "arguments")
+
+    def __init__(self, function, arguments: list) -> None:
+        self.function = function
+        self.arguments = arguments
+
+    def trampoline(self, interpreter):
+        tail = self
+        while True:
+            value = tail.function.run(interpreter, tail.arguments)
+            if type(value) is not TailCall:
+                return value
+            tail = value
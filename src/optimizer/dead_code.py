@@ -0,0 +1,194 @@
+from typing import Any
+
+from values.tokens import Token, TokenType
+from values import expr
+from values import stmt
+
+from inference import nodes
+from transpiler.scopes import Binding, ScopeAnalyzer
+
+from optimizer.folding import is_truthy
+from optimizer.transformer import Transformer
+
+
+def first_line(node) -> int | None:
+    for inner in nodes(node):
+        for value in vars(inner).values():
+            if isinstance(value, Token):
+                return value.position.line
+    return None
+
+
+class DeadCodeEliminator(Transformer):
+    """Removes code that can never run or whose result is never used:
+    branches and loops under a constant condition, statements after a
+    return, break or continue, let declarations that are never referenced
+    and have a pure initializer, and functions and classes that are never
+    referenced. A class with a superclass is kept, reading the superclass
+    can fail.
+
+    Globals count as unreferenced only when the pass sees the whole program,
+    in the REPL a later line may still use them. Every removal is listed in
+    `removed`. The pass repeats until nothing changes, since removing a
+    function can leave the functions it called unreferenced.
+    """
+
+    def __init__(self, whole_program: bool = False) -> None:
+        self.whole_program = whole_program
+        self.removed: list[str] = []
+        self.used: list[Token] = []
+        self.declared: list[Token] = []
+        self.analyzer = ScopeAnalyzer()
+        self.referenced: set[Binding] = set()
+        self.referenced_globals: set[str] = set()
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        while True:
+            self.analyze(statements)
+            removed = len(self.removed)
+            statements = self.transform_statements(statements)
+            if len(self.removed) == removed:
+                return statements
+
+    def analyze(self, statements: list[stmt.Stmt]):
+        self.analyzer = ScopeAnalyzer()
+        self.analyzer.analyze(statements)
+        self.referenced = set()
+        self.referenced_globals = set()
+        for node in nodes(statements):
+            if isinstance(node, (expr.Variable, expr.Assign)):
+                binding = self.analyzer.references[id(node)]
+                if binding is None:
+                    self.referenced_globals.add(node.name.symbol)
+                else:
+                    self.referenced.add(binding)
+
+    def report(self, line: int | None, message: str):
+        if line is None:
+            self.removed.append(f"removed {message}")
+        else:
+            self.removed.append(f"line {line}: removed {message}")
+
+    def drop(self, node):
+        for inner in nodes(node):
+            if isinstance(inner, (expr.Variable, expr.Assign)):
+                self.used.append(inner.name)
+
+    def unreferenced(self, declaration, name: Token) -> bool:
+        if id(declaration) not in self.analyzer.declarations:
+            # A method, looked up by name on its instances.
+            return False
+        binding = self.analyzer.declarations[id(declaration)]
+        if binding is None:
+            return self.whole_program and name.symbol not in self.referenced_globals
+        return binding not in self.referenced
+
+    def is_pure(self, node: expr.Expr | None) -> bool:
+        """Whether evaluating node can neither fail nor change anything."""
+        if node is None or isinstance(node, (expr.Literal, expr.Anonym, expr.Self)):
+            return True
+        if isinstance(node, expr.Variable):
+            return self.analyzer.references[id(node)] is not None
+        if isinstance(node, expr.Grouping):
+            return self.is_pure(node.expression)
+        if isinstance(node, expr.Unary):
+            return node.operator._type == TokenType.BANG and self.is_pure(node.right)
+        if isinstance(node, expr.Binary):
+            return node.operator._type in (
+                TokenType.EQUAL_EQUAL,
+                TokenType.BANG_EQUAL,
+            ) and (self.is_pure(node.left) and self.is_pure(node.right))
+        if isinstance(node, expr.Logical):
+            return self.is_pure(node.left) and self.is_pure(node.right)
+        if isinstance(node, expr.Ternary):
+            return (
+                self.is_pure(node.condition)
+                and self.is_pure(node.expression_true)
+                and self.is_pure(node.expression_false)
+            )
+        return False
+
+    # Statements
+
+    def transform_statements(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        result = []
+        for index, statement in enumerate(statements):
+            statement = self.transform(statement)
+            if statement is not None:
+                result.append(statement)
+            if isinstance(
+                statement, (stmt.Return, stmt.Break, stmt.Continue)
+            ) and index + 1 < len(statements):
+                unreachable = statements[index + 1 :]
+                self.drop(unreachable)
+                self.report(
+                    first_line(unreachable),
+                    f"{len(unreachable)} unreachable statement(s) after "
+                    f"{statement.keyword.symbol}",
+                )
+                break
+        return result
+
+    def visit_if_stmt(self, statement: stmt.If) -> Any:
+        statement = super().visit_if_stmt(statement)
+        if not isinstance(statement.condition, expr.Literal):
+            return statement
+
+        line = first_line(statement)
+        if is_truthy(statement.condition.value):
+            if statement.els is not None:
+                self.drop(statement.els)
+                self.report(line, "else branch of an always true if")
+            else:
+                self.report(line, "always true if condition")
+            return statement.then
+        self.drop(statement.then)
+        self.report(line, "then branch of an always false if")
+        return statement.els
+
+    def visit_while_stmt(self, statement: stmt.While) -> Any:
+        statement = super().visit_while_stmt(statement)
+        condition = statement.condition
+        if isinstance(condition, expr.Literal) and not is_truthy(condition.value):
+            self.drop([statement.body, statement.increment])
+            self.report(first_line(statement), "loop with an always false condition")
+            return None
+        return statement
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        statement = super().visit_var_stmt(statement)
+        if self.unreferenced(statement, statement.name) and self.is_pure(
+            statement.initializer
+        ):
+            self.declared.append(statement.name)
+            self.drop(statement.initializer)
+            self.report(
+                statement.name.position.line,
+                f"unused variable '{statement.name.symbol}'",
+            )
+            return None
+        return statement
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        statement = super().visit_function_stmt(statement)
+        if self.unreferenced(statement, statement.name):
+            self.drop(statement.body)
+            self.report(
+                statement.name.position.line,
+                f"unused function '{statement.name.symbol}'",
+            )
+            return None
+        return statement
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        statement = super().visit_class_stmt(statement)
+        if statement.superclass is None and self.unreferenced(
+            statement, statement.name
+        ):
+            self.drop(statement.methods)
+            self.report(
+                statement.name.position.line,
+                f"unused class '{statement.name.symbol}'",
+            )
+            return None
+        return statement
@@ -0,0 +1,191 @@
+import operator
+from typing import Any
+
+from values.tokens import Token, TokenType
+from values import expr
+from values import stmt
+
+from inference import nodes
+from transpiler.scopes import Binding, ScopeAnalyzer
+
+from optimizer.transformer import Transformer
+
+FOLDABLE = {
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+
+def is_truthy(value) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, bool):
+        return value
+    return True
+
+
+class ConstantFolder(Transformer):
+    """Evaluates operators whose operands are literals, picks the live side
+    of constant conditions and logical operators, drops groupings, and
+    replaces reads of never reassigned locals that hold a literal with the
+    literal.
+
+    Folding mirrors the Interpreter exactly. Anything that would raise at
+    runtime, a type error or a division by zero, is left in place to raise
+    there. Globals are not propagated, a later REPL line may assign them,
+    except for top level consts holding a literal. Those are propagated
+    into the statements after their declaration, where they are defined.
+    """
+
+    def __init__(self) -> None:
+        self.analyzer = ScopeAnalyzer()
+        self.constants: dict[Binding, Any] = {}
+        self.global_constants: dict[str, Any] = {}
+        self.top_level: set[int] = set()
+        self.reassigned: set[Binding] = set()
+        self.written_names: set[str] = set()
+        self.assigned_globals: set[str] = set()
+        self.used: list[Token] = []
+        self.folded = 0
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        self.analyzer.analyze(statements)
+        self.top_level = {id(statement) for statement in statements}
+        references = self.analyzer.references
+
+        for node in nodes(statements):
+            target = None
+            if isinstance(node, expr.Assign):
+                self.reassigned.add(references[id(node)])
+                if references[id(node)] is None:
+                    self.assigned_globals.add(node.name.symbol)
+            elif isinstance(node, (expr.CompoundAssign, expr.Increment)):
+                target = node.target
+            if isinstance(target, expr.Variable):
+                binding = references[id(target)]
+                self.reassigned.add(binding)
+                # Kept out of global const propagation.
+                if binding is None:
+                    self.written_names.add(target.name.symbol)
+
+        return self.transform_statements(statements)
+
+    def literal(self, value) -> expr.Literal:
+        self.folded += 1
+        return expr.Literal(value)
+
+    def drop(self, node: expr.Expr):
+        """Keeps the names read in a removed subtree, so the Resolver does
+        not report their variables as unused."""
+        for inner in nodes(node):
+            if isinstance(inner, expr.Variable):
+                self.used.append(inner.name)
+            elif isinstance(inner, expr.Assign):
+                self.used.append(inner.name)
+
+    # Statements
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        statement.initializer = self.transform(statement.initializer)
+        binding = self.analyzer.declarations[id(statement)]
+        if (
+            binding is not None
+            and binding not in self.reassigned
+            and binding.name not in self.written_names
+            and isinstance(statement.initializer, expr.Literal)
+        ):
+            self.constants[binding] = statement.initializer.value
+        elif (
+            statement.constant
+            and id(statement) in self.top_level
+            # Left in place for the Resolver to reject.
+            and statement.name.symbol not in self.written_names
+            and statement.name.symbol not in self.assigned_globals
+            and isinstance(statement.initializer, expr.Literal)
+        ):
+            self.global_constants[statement.name.symbol] = statement.initializer.value
+        return statement
+
+    # Expressions
+
+    def visit_variable_expr(self, expression: expr.Variable) -> Any:
+        binding = self.analyzer.references[id(expression)]
+        if binding in self.constants:
+            self.used.append(expression.name)
+            return self.literal(self.constants[binding])
+        if binding is None and expression.name.symbol in self.global_constants:
+            self.used.append(expression.name)
+            return self.literal(self.global_constants[expression.name.symbol])
+        return expression
+
+    def visit_grouping_expr(self, expression: expr.Grouping) -> Any:
+        return self.transform(expression.expression)
+
+    def visit_unary_expr(self, expression: expr.Unary) -> Any:
+        right = self.transform(expression.right)
+        expression.right = right
+        if not isinstance(right, expr.Literal):
+            return expression
+
+        if expression.operator._type == TokenType.BANG:
+            return self.literal(not is_truthy(right.value))
+        if isinstance(right.value, float):
+            return self.literal(-right.value)
+        return expression
+
+    def visit_binary_expr(self, expression: expr.Binary) -> Any:
+        expression = super().visit_binary_expr(expression)
+        left, right = expression.left, expression.right
+        if not isinstance(left, expr.Literal) or not isinstance(right, expr.Literal):
+            return expression
+
+        operator_type = expression.operator._type
+        a, b = left.value, right.value
+        numbers = isinstance(a, float) and isinstance(b, float)
+
+        if operator_type in FOLDABLE and numbers:
+            return self.literal(FOLDABLE[operator_type](a, b))
+        if operator_type == TokenType.PLUS:
+            if numbers:
+                return self.literal(a + b)
+            if isinstance(a, str) or isinstance(b, str):
+                return self.literal(str(a) + str(b))
+        if operator_type == TokenType.SLASH and numbers and a != 0 and b != 0:
+            return self.literal(a / b)
+        # A zero divisor raises a Python error in the Interpreter as well.
+        if operator_type == TokenType.MODULO and numbers and b != 0:
+            return self.literal(a % b)
+        if operator_type == TokenType.EQUAL_EQUAL:
+            return self.literal(a == b)
+        if operator_type == TokenType.BANG_EQUAL:
+            return self.literal(not a == b)
+        return expression
+
+    def visit_logical_expr(self, expression: expr.Logical) -> Any:
+        left = self.transform(expression.left)
+        right = self.transform(expression.right)
+        expression.left, expression.right = left, right
+        if not isinstance(left, expr.Literal):
+            return expression
+
+        self.folded += 1
+        if is_truthy(left.value) == (expression.operator._type == TokenType.OR):
+            self.drop(right)
+            return left
+        return right
+
+    def visit_ternary_expr(self, expression: expr.Ternary) -> Any:
+        expression = super().visit_ternary_expr(expression)
+        if not isinstance(expression.condition, expr.Literal):
+            return expression
+
+        self.folded += 1
+        if is_truthy(expression.condition.value):
+            self.drop(expression.expression_false)
+            return expression.expression_true
+        self.drop(expression.expression_true)
+        return expression.expression_false
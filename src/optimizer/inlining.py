@@ -0,0 +1,254 @@
+import copy
+from dataclasses import fields
+from typing import Any
+
+from values.tokens import Token
+from values import expr
+from values import stmt
+
+from inference import nodes
+from transpiler.scopes import Binding, ScopeAnalyzer
+
+from optimizer.transformer import Transformer
+
+INLINE_THRESHOLD = 12
+
+INLINABLE = (
+    expr.Literal,
+    expr.Variable,
+    expr.Grouping,
+    expr.Unary,
+    expr.Binary,
+    expr.Logical,
+    expr.Ternary,
+    expr.Get,
+)
+
+
+class Inliner(Transformer):
+    """Replaces calls of small functions with the function's body.
+
+    A function is inlined when its body is a single `return expression`
+    of at most `threshold` nodes that neither calls nor writes anything,
+    it is declared with fn, never reassigned and only ever called directly,
+    so no closure over it exists. The body's free variables have to be
+    globals, and a call is inlined only where no local of the same name is
+    in scope, so they mean the same at the call site.
+
+    Arguments are inlined only when they are literals or locals: both
+    evaluate without effects or errors, and since nothing in the body can
+    write, reading a local where the parameter was read gives the value it
+    had at the call. Global functions are inlined in whole programs only,
+    at calls after their declaration.
+    """
+
+    def __init__(
+        self, threshold: int = INLINE_THRESHOLD, whole_program: bool = False
+    ) -> None:
+        self.threshold = threshold
+        self.whole_program = whole_program
+        self.analyzer = ScopeAnalyzer()
+        self.inlinable: dict[int, stmt.Function] = {}
+        self.global_inlinable: dict[str, tuple[stmt.Function, int]] = {}
+        # The globals each inlinable function reads.
+        self.globals: dict[int, set[str]] = {}
+        # The names of the locals in scope, per function and block.
+        self.scopes: list[set[str]] = []
+        self.position = 0
+        self.used: list[Token] = []
+        self.inlined: list[str] = []
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        if self.threshold <= 0:
+            return statements
+        self.analyzer.analyze(statements)
+        self.find_inlinable(statements)
+
+        result = []
+        for self.position, statement in enumerate(statements):
+            statement = self.transform(statement)
+            if statement is not None:
+                result.append(statement)
+        return result
+
+    def find_inlinable(self, statements: list[stmt.Stmt]):
+        references = self.analyzer.references
+        callees = set()
+        escaping: set[Binding] = set()
+        escaping_globals: set[str] = set()
+        global_declarations: dict[str, int] = {}
+        functions = []
+
+        for node in nodes(statements):
+            if isinstance(node, expr.Call):
+                callees.add(id(node.callee))
+            elif isinstance(node, (stmt.Var, stmt.Function, stmt._Class)) and (
+                id(node) in self.analyzer.declarations  # Not a method
+            ):
+                if self.analyzer.declarations[id(node)] is None:
+                    name = node.name.symbol
+                    global_declarations[name] = global_declarations.get(name, 0) + 1
+            if isinstance(node, stmt.Function) and id(node) in (
+                self.analyzer.declarations
+            ):
+                functions.append(node)
+
+        for node in nodes(statements):
+            if isinstance(node, expr.Variable) and id(node) in callees:
+                continue
+            # Every other reference, the target of ++, -- and compound
+            # assignment included, lets the function escape or writes it.
+            if isinstance(node, (expr.Variable, expr.Assign)):
+                binding = references[id(node)]
+                escaping.add(binding)
+                if binding is None:
+                    escaping_globals.add(node.name.symbol)
+
+        for function in functions:
+            binding = self.analyzer.declarations[id(function)]
+            name = function.name.symbol
+            if name in escaping_globals or not self.small(function):
+                continue
+            if binding is None:
+                if not self.whole_program or global_declarations[name] != 1:
+                    continue
+                for index, statement in enumerate(statements):
+                    if statement is function:
+                        self.global_inlinable[name] = (function, index)
+            elif binding not in escaping:
+                self.inlinable[id(binding)] = function
+
+    def small(self, function: stmt.Function) -> bool:
+        if len(function.body) != 1 or not isinstance(function.body[0], stmt.Return):
+            return False
+        value = function.body[0].value
+        if value is None:
+            return False
+
+        params = {
+            id(self.analyzer.declarations[id(param)]) for param in function.params
+        }
+        size = 0
+        reads = set()
+        for node in nodes(value):
+            size += 1
+            if not isinstance(node, INLINABLE):
+                return False
+            if isinstance(node, expr.Variable):
+                binding = self.analyzer.references[id(node)]
+                if binding is None:
+                    reads.add(node.name.symbol)
+                elif id(binding) not in params:
+                    return False
+        self.globals[id(function)] = reads
+        return size <= self.threshold
+
+    def shadowed(self, function: stmt.Function) -> bool:
+        """Whether a local in scope hides a global the body reads."""
+        reads = self.globals[id(function)]
+        return any(not reads.isdisjoint(scope) for scope in self.scopes)
+
+    def declare(self, declaration, name: Token):
+        if self.scopes and self.analyzer.declarations.get(id(declaration)):
+            self.scopes[-1].add(name.symbol)
+
+    def callee(self, expression: expr.Call) -> stmt.Function | None:
+        callee = expression.callee
+        if not isinstance(callee, expr.Variable):
+            return None
+        binding = self.analyzer.references[id(callee)]
+        if binding is not None:
+            return self.inlinable.get(id(binding))
+        if callee.name.symbol not in self.global_inlinable:
+            return None
+        function, index = self.global_inlinable[callee.name.symbol]
+        return function if index < self.position else None
+
+    def is_trivial(self, argument: expr.Expr) -> bool:
+        if isinstance(argument, expr.Literal):
+            return True
+        return (
+            isinstance(argument, expr.Variable)
+            and self.analyzer.references[id(argument)] is not None
+        )
+
+    def substitute(self, node, arguments: dict[int, expr.Expr]):
+        """A copy of node with the parameters replaced by the arguments."""
+        if isinstance(node, list):
+            return [self.substitute(item, arguments) for item in node]
+        if not isinstance(node, expr.Expr):
+            return node
+        if isinstance(node, expr.Variable):
+            binding = self.analyzer.references[id(node)]
+            if id(binding) in arguments:
+                return copy.copy(arguments[id(binding)])
+        clone = copy.copy(node)
+        for field in fields(node):
+            setattr(
+                clone, field.name, self.substitute(getattr(node, field.name), arguments)
+            )
+        return clone
+
+    # Scopes
+
+    def visit_block_stmt(self, statement: stmt.Block) -> Any:
+        self.scopes.append(set())
+        statement = super().visit_block_stmt(statement)
+        self.scopes.pop()
+        return statement
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        self.declare(statement, statement.name)
+        return super().visit_class_stmt(statement)
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        self.declare(statement, statement.name)
+        self.scopes.append({param.symbol for param in statement.params})
+        statement = super().visit_function_stmt(statement)
+        self.scopes.pop()
+        return statement
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        statement = super().visit_var_stmt(statement)
+        self.declare(statement, statement.name)
+        return statement
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        statement.iterable = self.transform(statement.iterable)
+        self.scopes.append({statement.name.symbol})
+        statement.body = self.transform(statement.body) or stmt.Block([])
+        self.scopes.pop()
+        return statement
+
+    def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
+        self.scopes.append({param.symbol for param in expression.params})
+        expression = super().visit_anonym_func_expr(expression)
+        self.scopes.pop()
+        return expression
+
+    # Expressions
+
+    def visit_call_expr(self, expression: expr.Call) -> Any:
+        expression = super().visit_call_expr(expression)
+        function = self.callee(expression)
+        if (
+            function is None
+            or len(function.params) != len(expression.arguments)
+            or self.shadowed(function)
+            or not all(self.is_trivial(argument) for argument in expression.arguments)
+        ):
+            return expression
+
+        arguments = {
+            id(self.analyzer.declarations[id(param)]): argument
+            for param, argument in zip(function.params, expression.arguments)
+        }
+        self.used.append(expression.callee.name)
+        for argument in expression.arguments:
+            if isinstance(argument, expr.Variable):
+                self.used.append(argument.name)
+        self.inlined.append(
+            f"line {expression.paren.position.line}: "
+            f"inlined call to '{function.name.symbol}'"
+        )
+        return self.substitute(function.body[0].value, arguments)
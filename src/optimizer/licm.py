@@ -0,0 +1,362 @@
+from typing import Any
+
+from values.tokens import Token, TokenType
+from values import expr
+from values import stmt
+
+from inference import nodes
+from transpiler.scopes import Binding, ScopeAnalyzer
+
+from optimizer.transformer import Transformer
+
+
+def write_target(node: expr.Expr) -> expr.Expr | None:
+    """The variable or field written by ++, -- or a compound assignment."""
+    if isinstance(node, (expr.CompoundAssign, expr.Increment)):
+        return node.target
+    return None
+
+
+class Effects:
+    """The variables, globals and fields written, the locals declared, the
+    calls made and whether a generator body suspends anywhere in a subtree,
+    nested functions included."""
+
+    def __init__(self, analyzer: ScopeAnalyzer, node) -> None:
+        self.bindings: set[Binding] = set()
+        self.names: set[str] = set()
+        self.fields: set[str] = set()
+        self.declared: set[Binding] = set()
+        self.calls: list[expr.Call] = []
+        self.echoes = False
+        self.suspends = False
+
+        for inner in nodes(node):
+            if isinstance(inner, expr.Assign):
+                self.write(analyzer.references[id(inner)], inner.name)
+            elif isinstance(inner, expr.Set):
+                self.fields.add(inner.name.symbol)
+            elif isinstance(inner, expr.Call):
+                self.calls.append(inner)
+            elif isinstance(inner, (stmt.Var, stmt.Function, stmt._Class, stmt.ForIn)):
+                binding = analyzer.declarations.get(id(inner))
+                if binding is not None:
+                    self.declared.add(binding)
+            elif isinstance(inner, stmt.Echo):
+                self.echoes = True
+            elif isinstance(inner, stmt.Yield):
+                self.suspends = True
+
+            target = write_target(inner)
+            if isinstance(target, expr.Variable):
+                self.write(analyzer.references[id(target)], target.name)
+            elif isinstance(target, expr.Get):
+                self.fields.add(target.name.symbol)
+
+    def write(self, binding: Binding | None, name: Token):
+        if binding is None:
+            self.names.add(name.symbol)
+        else:
+            self.bindings.add(binding)
+
+
+class LoopInvariantMotion(Transformer):
+    """Evaluates expressions that give the same value on every iteration of
+    a loop only once per execution of the loop.
+
+    An expression is invariant when nothing in the loop writes the locals,
+    globals and fields it reads, and it calls only pure functions: functions
+    declared with fn and never reassigned that only compute with their
+    parameters and locals and call other pure functions and do not yield. A
+    loop that calls anything else, or yields, may change any global,
+    captured local or field.
+
+    The expression is cached where it is, not moved in front of the loop:
+        _readyN ? _hoistedN : (_readyN = true) and (_hoistedN = expression)
+    with both temporaries declared in front of the loop, in the block that
+    holds it, which runs once for every execution of the loop. That way it
+    runs the first time the loop reaches it, and an expression in a branch
+    the loop never takes, or one that raises, behaves exactly as before.
+    """
+
+    def __init__(self) -> None:
+        self.analyzer = ScopeAnalyzer()
+        self.pure_functions: dict[int, stmt.Function] = {}
+        self.pure_globals: dict[str, stmt.Function] = {}
+        # Globals the program declares or writes.
+        self.global_names: set[str] = set()
+        self.counter = 0
+        self.hoisted: list[str] = []
+        self.effects: Effects | None = None
+        self.unknown_calls = False
+        self.invariant: dict[int, bool] = {}
+        self.loops: set[int] = set()
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        self.analyzer.analyze(statements)
+        self.find_pure_functions(statements)
+        # At the top level the temporaries stay in a block, as locals.
+        return [self.transform(statement) for statement in statements]
+
+    def transform_statements(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        result = []
+        for statement in statements:
+            statement = self.transform(statement)
+            if id(statement) in self.loops:
+                result.extend(statement.statements)
+            else:
+                result.append(statement)
+        return result
+
+    # Pure functions
+
+    def find_pure_functions(self, statements: list[stmt.Stmt]):
+        program = Effects(self.analyzer, statements)
+        global_declarations: dict[str, int] = {}
+        for node in nodes(statements):
+            if isinstance(node, (stmt.Var, stmt.Function, stmt._Class)) and (
+                self.analyzer.declarations.get(id(node), False) is None
+            ):
+                name = node.name.symbol
+                global_declarations[name] = global_declarations.get(name, 0) + 1
+        self.global_names = program.names | set(global_declarations)
+
+        for node in nodes(statements):
+            if not isinstance(node, stmt.Function) or (
+                id(node) not in self.analyzer.declarations  # A method
+            ):
+                continue
+            binding = self.analyzer.declarations[id(node)]
+            name = node.name.symbol
+            if name in program.names:
+                continue
+            if binding is None and global_declarations[name] == 1:
+                self.pure_globals[name] = node
+            elif binding is not None and binding not in program.bindings:
+                self.pure_functions[id(binding)] = node
+
+        changed = True
+        while changed:
+            changed = False
+            for functions in (self.pure_functions, self.pure_globals):
+                for key, function in list(functions.items()):
+                    if not self.is_pure(function):
+                        del functions[key]
+                        changed = True
+
+    def pure_function(self, callee: expr.Expr) -> stmt.Function | None:
+        if not isinstance(callee, expr.Variable):
+            return None
+        binding = self.analyzer.references[id(callee)]
+        if binding is None:
+            return self.pure_globals.get(callee.name.symbol)
+        return self.pure_functions.get(id(binding))
+
+    def is_pure(self, function: stmt.Function) -> bool:
+        if function.generator:
+            # Every call makes a new generator.
+            return False
+        scope = self.analyzer.functions[id(function)]
+        effects = Effects(self.analyzer, function.body)
+        if effects.echoes or effects.fields or effects.names:
+            return False
+        if any(binding.owner is not scope for binding in effects.bindings):
+            return False
+        for node in nodes(function.body):
+            if isinstance(
+                node,
+                (expr.Get, expr.Self, expr.Super, expr.Anonym, stmt.Function),
+            ) or isinstance(node, stmt._Class):
+                return False
+            if isinstance(node, expr.Call) and (
+                self.pure_function(node.callee) is None
+            ):
+                return False
+            if isinstance(node, expr.Variable):
+                binding = self.analyzer.references[id(node)]
+                if (
+                    binding is None or binding.owner is not scope
+                ) and self.pure_function(node) is None:
+                    return False
+        return True
+
+    # Invariants
+
+    def is_invariant(self, node: expr.Expr) -> bool:
+        if id(node) not in self.invariant:
+            self.invariant[id(node)] = self.check_invariant(node)
+        return self.invariant[id(node)]
+
+    def check_invariant(self, node: expr.Expr) -> bool:
+        effects = self.effects
+        if isinstance(node, (expr.Literal, expr.Self)):
+            return True
+        if isinstance(node, expr.Variable):
+            binding = self.analyzer.references[id(node)]
+            if binding is None:
+                if node.name.symbol in effects.names:
+                    return False
+                return not self.unknown_calls
+            if binding in effects.bindings or binding in effects.declared:
+                return False
+            return not self.unknown_calls or not binding.captured
+        if isinstance(node, expr.Grouping):
+            return self.is_invariant(node.expression)
+        if isinstance(node, expr.Unary):
+            return self.is_invariant(node.right)
+        if isinstance(node, (expr.Binary, expr.Logical)):
+            return self.is_invariant(node.left) and self.is_invariant(node.right)
+        if isinstance(node, expr.Ternary):
+            return (
+                self.is_invariant(node.condition)
+                and self.is_invariant(node.expression_true)
+                and self.is_invariant(node.expression_false)
+            )
+        if isinstance(node, expr.Get):
+            return (
+                not self.unknown_calls
+                and node.name.symbol not in effects.fields
+                and self.is_invariant(node.obj)
+            )
+        if isinstance(node, expr.Call):
+            return self.pure_function(node.callee) is not None and all(
+                self.is_invariant(argument) for argument in node.arguments
+            )
+        return False
+
+    def worth_hoisting(self, node: expr.Expr) -> bool:
+        """Whether node costs more than reading the two temporaries."""
+        operators = 0
+        for inner in nodes(node):
+            if isinstance(inner, (expr.Get, expr.Call)):
+                return True
+            if isinstance(inner, (expr.Unary, expr.Binary, expr.Logical)):
+                operators += 1
+            elif isinstance(inner, expr.Ternary):
+                operators += 2
+        return operators >= 2
+
+    # Statements
+
+    def visit_while_stmt(self, statement: stmt.While) -> Any:
+        statement = super().visit_while_stmt(statement)
+
+        hoister = self.hoister(statement)
+        statement.condition = hoister.transform(statement.condition)
+        statement.body = hoister.transform(statement.body)
+        statement.increment = hoister.transform(statement.increment)
+        return self.with_temporaries(statement, hoister)
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        statement = super().visit_for_in_stmt(statement)
+
+        # The iterable is evaluated once, in front of the loop, but an
+        # iterator other than a range or a string's may run code between
+        # iterations.
+        hoister = self.hoister(statement.body)
+        self.effects.declared.add(self.analyzer.declarations[id(statement)])
+        if not self.native_iterable(statement.iterable):
+            self.unknown_calls = True
+        statement.body = hoister.transform(statement.body)
+        return self.with_temporaries(statement, hoister)
+
+    def hoister(self, node: stmt.Stmt) -> "Hoister":
+        self.effects = Effects(self.analyzer, node)
+        # Whoever consumes a generator runs while it is suspended.
+        self.unknown_calls = self.effects.suspends or any(
+            self.pure_function(call.callee) is None for call in self.effects.calls
+        )
+        self.invariant = {}
+        return Hoister(self)
+
+    def native_iterable(self, iterable: expr.Expr) -> bool:
+        if isinstance(iterable, expr.Literal):
+            return isinstance(iterable.value, str)
+        return (
+            isinstance(iterable, expr.Call)
+            and isinstance(iterable.callee, expr.Variable)
+            and self.analyzer.references[id(iterable.callee)] is None
+            and iterable.callee.name.symbol == "range"
+            and "range" not in self.global_names
+        )
+
+    def with_temporaries(self, statement: stmt.Stmt, hoister: "Hoister") -> stmt.Stmt:
+        if not hoister.temporaries:
+            return statement
+        block = stmt.Block(hoister.temporaries + [statement])
+        self.loops.add(id(block))
+        return block
+
+
+class Hoister(Transformer):
+    """Caches the invariant expressions of one loop, see
+    LoopInvariantMotion."""
+
+    def __init__(self, motion: LoopInvariantMotion) -> None:
+        self.motion = motion
+        self.temporaries: list[stmt.Var] = []
+
+    def transform(self, node):
+        if (
+            isinstance(node, expr.Expr)
+            and self.motion.is_invariant(node)
+            and self.motion.worth_hoisting(node)
+        ):
+            return self.hoist(node)
+        return super().transform(node)
+
+    def hoist(self, expression: expr.Expr) -> expr.Expr:
+        motion = self.motion
+        position = next(
+            value.position
+            for inner in nodes(expression)
+            for value in vars(inner).values()
+            if isinstance(value, Token)
+        )
+        motion.hoisted.append(
+            f"line {position.line}: cached a loop invariant expression"
+        )
+
+        def token(_type: TokenType, symbol: str) -> Token:
+            return Token(_type, symbol, None, position, len(symbol))
+
+        def temporary(name: str, initializer: expr.Expr | None) -> Token:
+            name = token(TokenType.IDENTIFIER, f"_{name}{motion.counter}")
+            declaration = stmt.Var(name, initializer)
+            binding = Binding(name.symbol, name.symbol, None)
+            motion.analyzer.declarations[id(declaration)] = binding
+            self.temporaries.append(declaration)
+            return name
+
+        def reference(node: expr.Variable | expr.Assign) -> expr.Expr:
+            for declaration in self.temporaries:
+                if declaration.name is node.name:
+                    binding = motion.analyzer.declarations[id(declaration)]
+                    motion.analyzer.references[id(node)] = binding
+            return node
+
+        ready = temporary("ready", expr.Literal(False))
+        hoisted = temporary("hoisted", None)
+        motion.counter += 1
+        return expr.Ternary(
+            reference(expr.Variable(ready)),
+            token(TokenType.QUESTION_MARK, "?"),
+            reference(expr.Variable(hoisted)),
+            token(TokenType.COLON, ":"),
+            expr.Logical(
+                reference(expr.Assign(ready, expr.Literal(True))),
+                token(TokenType.AND, "and"),
+                reference(expr.Assign(hoisted, expression)),
+            ),
+        )
+
+    # Code in nested functions runs at other times.
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        return statement
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        return statement
+
+    def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
+        return expression
@@ -0,0 +1,67 @@
+from values.tokens import Token
+from values import stmt
+
+from optimizer.dead_code import DeadCodeEliminator
+from optimizer.folding import ConstantFolder
+from optimizer.inlining import INLINE_THRESHOLD, Inliner
+from optimizer.licm import LoopInvariantMotion
+
+
+class Optimizer:
+    """Runs the AST optimization passes between parsing and resolving.
+
+    Passes rewrite the tree and report names whose reads they removed in
+    `used`, so the Resolver's unused variable warnings stay the same as for
+    the unoptimized program. Variables they remove entirely are listed in
+    `declared`, the Resolver still warns about those.
+
+    With `debug` set, every inlined call, removal of dead code and cached
+    loop invariant is printed. `inline_threshold` is the largest function
+    body, in nodes, that gets inlined, 0 turns inlining off. `whole_program`
+    tells that no later input can reference the program's globals, as is the
+    case when running a file.
+    """
+
+    def __init__(
+        self,
+        whole_program: bool = False,
+        debug: bool = False,
+        inline_threshold: int = INLINE_THRESHOLD,
+    ) -> None:
+        self.whole_program = whole_program
+        self.debug = debug
+        self.inline_threshold = inline_threshold
+        self.used: list[Token] = []
+        self.declared: list[Token] = []
+
+    def optimize(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        folder = ConstantFolder()
+        statements = folder.optimize(statements)
+        self.used.extend(folder.used)
+
+        inliner = Inliner(self.inline_threshold, self.whole_program)
+        statements = inliner.optimize(statements)
+        self.used.extend(inliner.used)
+        if self.debug:
+            for inlined in inliner.inlined:
+                print(f"[inlining] {inlined}")
+        if inliner.inlined:
+            # Inlined bodies are folded with their arguments in place.
+            folder = ConstantFolder()
+            statements = folder.optimize(statements)
+            self.used.extend(folder.used)
+
+        eliminator = DeadCodeEliminator(self.whole_program)
+        statements = eliminator.optimize(statements)
+        self.used.extend(eliminator.used)
+        self.declared.extend(eliminator.declared)
+        if self.debug:
+            for removal in eliminator.removed:
+                print(f"[dead code] {removal}")
+
+        motion = LoopInvariantMotion()
+        statements = motion.optimize(statements)
+        if self.debug:
+            for hoisted in motion.hoisted:
+                print(f"[loop invariant] {hoisted}")
+        return statements
@@ -0,0 +1,169 @@
+from typing import Any
+
+from values import expr
+from values import stmt
+
+
+class Transformer(expr.Visitor, stmt.Visitor):
+    """Base class for the optimizer passes.
+
+    Every visit method transforms the node's children in place and returns
+    the node; a pass overrides the methods for the nodes it rewrites and
+    returns a replacement from them, or None to drop a statement. Nodes that
+    are kept keep their identity.
+    """
+
+    def transform(self, node):
+        if node is None:
+            return None
+        return node.accept(self)
+
+    def transform_statements(self, statements: list[stmt.Stmt]) -> list[stmt.Stmt]:
+        result = []
+        for statement in statements:
+            statement = self.transform(statement)
+            if statement is not None:
+                result.append(statement)
+        return result
+
+    def transform_target(self, target: expr.Variable | expr.Get) -> expr.Expr:
+        """Transforms the target of ++, -- or a compound assignment, which
+        stays the variable or field it writes."""
+        if isinstance(target, expr.Get):
+            target.obj = self.transform(target.obj)
+        return target
+
+    # Statements
+
+    def visit_block_stmt(self, statement: stmt.Block) -> Any:
+        statement.statements = self.transform_statements(statement.statements)
+        return statement
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        statement.methods = [self.transform(method) for method in statement.methods]
+        return statement
+
+    def visit_expression_stmt(self, statement: stmt.Expression) -> Any:
+        statement.expression = self.transform(statement.expression)
+        return statement
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        statement.body = self.transform_statements(statement.body)
+        return statement
+
+    def visit_if_stmt(self, statement: stmt.If) -> Any:
+        statement.condition = self.transform(statement.condition)
+        statement.then = self.transform(statement.then) or stmt.Block([])
+        statement.els = self.transform(statement.els)
+        return statement
+
+    def visit_match_stmt(self, statement: stmt.Match) -> Any:
+        statement.value = self.transform(statement.value)
+        statement.patterns = [self.transform(p) for p in statement.patterns]
+        statement.arms = [
+            self.transform(arm) or stmt.Block([]) for arm in statement.arms
+        ]
+        statement.els = self.transform(statement.els)
+        return statement
+
+    def visit_echo_stmt(self, statement: stmt.Echo) -> Any:
+        statement.expression = self.transform(statement.expression)
+        return statement
+
+    def visit_return_stmt(self, statement: stmt.Return) -> Any:
+        statement.value = self.transform(statement.value)
+        return statement
+
+    def visit_yield_stmt(self, statement: stmt.Yield) -> Any:
+        statement.value = self.transform(statement.value)
+        return statement
+
+    def visit_break_stmt(self, statement: stmt.Break) -> Any:
+        return statement
+
+    def visit_continue_stmt(self, statement: stmt.Continue) -> Any:
+        return statement
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        statement.initializer = self.transform(statement.initializer)
+        return statement
+
+    def visit_while_stmt(self, statement: stmt.While) -> Any:
+        statement.condition = self.transform(statement.condition)
+        statement.body = self.transform(statement.body) or stmt.Block([])
+        statement.increment = self.transform(statement.increment)
+        return statement
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        statement.iterable = self.transform(statement.iterable)
+        statement.body = self.transform(statement.body) or stmt.Block([])
+        return statement
+
+    # Expressions
+
+    def visit_literal_expr(self, expression: expr.Literal) -> Any:
+        return expression
+
+    def visit_self_expr(self, expression: expr.Self) -> Any:
+        return expression
+
+    def visit_variable_expr(self, expression: expr.Variable) -> Any:
+        return expression
+
+    def visit_grouping_expr(self, expression: expr.Grouping) -> Any:
+        expression.expression = self.transform(expression.expression)
+        return expression
+
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign) -> Any:
+        expression.target = self.transform_target(expression.target)
+        expression.value = self.transform(expression.value)
+        return expression
+
+    def visit_increment_expr(self, expression: expr.Increment) -> Any:
+        expression.target = self.transform_target(expression.target)
+        return expression
+
+    def visit_unary_expr(self, expression: expr.Unary) -> Any:
+        expression.right = self.transform(expression.right)
+        return expression
+
+    def visit_binary_expr(self, expression: expr.Binary) -> Any:
+        expression.left = self.transform(expression.left)
+        expression.right = self.transform(expression.right)
+        return expression
+
+    def visit_logical_expr(self, expression: expr.Logical) -> Any:
+        expression.left = self.transform(expression.left)
+        expression.right = self.transform(expression.right)
+        return expression
+
+    def visit_ternary_expr(self, expression: expr.Ternary) -> Any:
+        expression.condition = self.transform(expression.condition)
+        expression.expression_true = self.transform(expression.expression_true)
+        expression.expression_false = self.transform(expression.expression_false)
+        return expression
+
+    def visit_assign_expr(self, expression: expr.Assign) -> Any:
+        expression.value = self.transform(expression.value)
+        return expression
+
+    def visit_call_expr(self, expression: expr.Call) -> Any:
+        expression.callee = self.transform(expression.callee)
+        expression.arguments = [self.transform(a) for a in expression.arguments]
+        return expression
+
+    def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
+        expression.body = self.transform_statements(expression.body)
+        return expression
+
+    def visit_get_expr(self, expression: expr.Get) -> Any:
+        expression.obj = self.transform(expression.obj)
+        return expression
+
+    def visit_set_expr(self, expression: expr.Set) -> Any:
+        expression.obj = self.transform(expression.obj)
+        expression.value = self.transform(expression.value)
+        return expression
+
+    def visit_super_expr(self, expression: expr.Super) -> Any:
+        return expression
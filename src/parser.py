@@ -5,13 +5,19 @@ from values import stmt
 from errors.exceptions import ParseError
 from errors.error import parse_error
 
+from lazy import PendingBody
+
 
 class Parser:
 
-    def __init__(self, tokens: list[Token], source: str):
+    def __init__(self, tokens: list[Token], source: str, lazy: bool = False):
         self.tokens = tokens
         self.source = source
         self.current: int = 0
+        # Skip the bodies of fn declarations and methods, see lazy.py.
+        self.lazy = lazy
+        # Whether the body of the function being parsed yields so far.
+        self.generator = False
 
     def parse(self) -> list[stmt.Stmt | None]:
         statements = []
@@ -28,6 +34,8 @@ class Parser:
                 return self.function("function")
             if self.match(TokenType.LET):
                 return self.var_declaration()
+            if self.match(TokenType.CONST):
+                return self.const_declaration()
 
             return self.statement()
         except ParseError:
@@ -63,15 +71,30 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expected ';' after variable declaration.")
         return stmt.Var(name, initializer)
 
+    def const_declaration(self) -> stmt.Stmt:
+        name: Token = self.consume(TokenType.IDENTIFIER, "Expected constant name.")
+        self.consume(TokenType.EQUAL, "Expected '=' after constant name.")
+        initializer = self.expression()
+        self.consume(TokenType.SEMICOLON, "Expected ';' after constant declaration.")
+        return stmt.Var(name, initializer, constant=True)
+
     def statement(self) -> stmt.Stmt:
         if self.match(TokenType.FOR):
             return self.for_statement()
         if self.match(TokenType.IF):
             return self.if_statement()
+        if self.match(TokenType.MATCH):
+            return self.match_statement()
         if self.match(TokenType.ECHO):
             return self.echo()
         if self.match(TokenType.RETURN):
             return self.return_statement()
+        if self.match(TokenType.YIELD):
+            return self.yield_statement()
+        if self.match(TokenType.BREAK):
+            return self.loop_exit(stmt.Break, "break")
+        if self.match(TokenType.CONTINUE):
+            return self.loop_exit(stmt.Continue, "continue")
         if self.match(TokenType.WHILE):
             return self.while_statement()
         if self.match(TokenType.LEFT_BRACE):
@@ -80,6 +103,9 @@ class Parser:
         return self.expression_statement()
 
     def for_statement(self):
+        if self.check(TokenType.IDENTIFIER) and self.check_next(TokenType.IN):
+            return self.for_in_statement()
+
         initializer = None
         if self.match(TokenType.SEMICOLON):
             initializer = None
@@ -99,19 +125,23 @@ class Parser:
 
         body: stmt.Stmt = self.statement()
 
-        if increment is not None:
-            body = stmt.Block([body, stmt.Expression(increment)])
-
         if condition is None:
             condition = expr.Literal(True)
 
-        body = stmt.While(condition, body)
+        body = stmt.While(condition, body, increment)
 
         if initializer is not None:
             body = stmt.Block([initializer, body])
 
         return body
 
+    def for_in_statement(self) -> stmt.Stmt:
+        name: Token = self.advance()
+        keyword: Token = self.advance()
+        iterable: expr.Expr = self.expression()
+        body: stmt.Stmt = self.statement()
+        return stmt.ForIn(name, keyword, iterable, body)
+
     def if_statement(self) -> stmt.Stmt:
         condition: expr.Expr = self.expression()
 
@@ -123,6 +153,31 @@ class Parser:
 
         return stmt.If(condition, then_branch, else_branch)
 
+    def match_statement(self) -> stmt.Stmt:
+        keyword: Token = self.previous()
+        value: expr.Expr = self.expression()
+        self.consume(TokenType.LEFT_BRACE, "Expected '{' after match value.")
+
+        patterns = []
+        arms = []
+        els = None
+        while not self.check(TokenType.RIGHT_BRACE) and not self.is_at_end():
+            if self.match(TokenType.ELSE):
+                if els is not None:
+                    parse_error(self.previous(), "A match can only have one else.")
+                self.consume(TokenType.RIGHT_ARROW, "Expected '->' after else.")
+                els = self.statement()
+            else:
+                if els is not None:
+                    parse_error(self.peek(), "The else of a match must come last.")
+                patterns.append(self.expression())
+                self.consume(TokenType.RIGHT_ARROW, "Expected '->' after pattern.")
+                arms.append(self.statement())
+            self.match(TokenType.COMMA)
+
+        self.consume(TokenType.RIGHT_BRACE, "Expected '}' after match arms.")
+        return stmt.Match(keyword, value, patterns, arms, els)
+
     def echo(self) -> stmt.Stmt:
         value: expr.Expr = self.expression()
         self.consume(TokenType.SEMICOLON, "Expected ';' after value.")
@@ -137,6 +192,21 @@ class Parser:
         self.consume(TokenType.SEMICOLON, "Expected ';' after return value.")
         return stmt.Return(keyword, value)
 
+    def yield_statement(self) -> stmt.Stmt:
+        keyword: Token = self.previous()
+        value = None
+        if not self.check(TokenType.SEMICOLON):
+            value = self.expression()
+
+        self.consume(TokenType.SEMICOLON, "Expected ';' after yield value.")
+        self.generator = True
+        return stmt.Yield(keyword, value)
+
+    def loop_exit(self, statement: type, keyword: str) -> stmt.Stmt:
+        token: Token = self.previous()
+        self.consume(TokenType.SEMICOLON, f"Expected ';' after '{keyword}'.")
+        return statement(token)
+
     def while_statement(self):
         condition: expr.Expr = self.expression()
         self.consume(TokenType.COLON, "Expected ':' after condition.")
@@ -166,9 +236,41 @@ class Parser:
         self.consume(TokenType.RIGHT_PAREN, "Expected ')' after parameters.")
 
         self.consume(TokenType.LEFT_BRACE, "Expected '{' before" + kind + "body")
-        body: list[stmt.Stmt] = self.block()
-
-        return stmt.Function(name, parameters, body)
+        if self.lazy:
+            function = stmt.Function(name, parameters, [])
+            function.pending = self.skip_block()
+            return function
+        body, generator = self.function_body()
+
+        function = stmt.Function(name, parameters, body)
+        function.generator = generator
+        return function
+
+    def function_body(self) -> tuple[list[stmt.Stmt], bool]:
+        """Parses a body and tells whether it yields, nested functions
+        aside."""
+        enclosing = self.generator
+        self.generator = False
+        body = self.block()
+        generator = self.generator
+        self.generator = enclosing
+        return body, generator
+
+    def skip_block(self) -> PendingBody:
+        start = self.current
+        names = []
+        depth = 1
+        while not self.is_at_end():
+            token = self.advance()
+            if token._type == TokenType.IDENTIFIER:
+                names.append(token)
+            elif token._type == TokenType.LEFT_BRACE:
+                depth += 1
+            elif token._type == TokenType.RIGHT_BRACE:
+                depth -= 1
+                if depth == 0:
+                    return PendingBody(self.tokens, start, names)
+        raise self.error(self.previous(), "Expected '}' after block.")
 
     def block(self) -> list[stmt.Stmt]:
         statements = []
@@ -273,10 +375,16 @@ class Parser:
         ):
             operator: Token = self.previous()
             right: expr.Expr = self.term()
-            expression = expr.Binary(expression, operator, right)
+            self.check_target(expression, operator)
+            expression = expr.CompoundAssign(expression, operator, right)
 
         return expression
 
+    def check_target(self, target: expr.Expr, operator: Token):
+        """Compound assignments, ++ and -- write a variable or a field."""
+        if not isinstance(target, (expr.Variable, expr.Get)):
+            parse_error(operator, "Invalid assignment target.")
+
     def term(self) -> expr.Expr:
         expression: expr.Expr = self.modulo()
 
@@ -319,12 +427,14 @@ class Parser:
         if self.match(TokenType.PLUS_PLUS, TokenType.MINUS_MINUS):
             operator: Token = self.previous()
             right: expr.Expr = self.increment()
-            return expr.Prefix(operator, right)
+            self.check_target(right, operator)
+            return expr.Increment(operator, right, True)
 
         expression: expr.Expr = self.call()
         if self.match(TokenType.PLUS_PLUS, TokenType.MINUS_MINUS):
             operator: Token = self.previous()
-            expression = expr.Postfix(expression, operator)
+            self.check_target(expression, operator)
+            expression = expr.Increment(operator, expression, False)
 
         return expression
 
@@ -375,9 +485,10 @@ class Parser:
                     break
         self.consume(TokenType.RIGHT_PAREN, "Expected ')' after parameters.")
         self.consume(TokenType.LEFT_BRACE, "Expected '{' before" + kind + "body")
-        body: list[stmt.Stmt] = self.block()
+        body, generator = self.function_body()
 
         expression = expr.Anonym(parameters, body)
+        expression.generator = generator
         return expression
 
     def primary(self) -> expr.Expr:
@@ -425,6 +536,11 @@ class Parser:
             return False
         return self.peek()._type == _type
 
+    def check_next(self, _type: TokenType) -> bool:
+        if self.current + 1 >= len(self.tokens):
+            return False
+        return self.tokens[self.current + 1]._type == _type
+
     def advance(self):
         if not self.is_at_end():
             self.current += 1
@@ -457,16 +573,22 @@ class Parser:
                     return
                 case TokenType.LET:
                     return
+                case TokenType.CONST:
+                    return
                 case TokenType.FOR:
                     return
                 case TokenType.IF:
                     return
+                case TokenType.MATCH:
+                    return
                 case TokenType.WHILE:
                     return
                 case TokenType.ECHO:
                     return
                 case TokenType.RETURN:
                     return
+                case TokenType.YIELD:
+                    return
                 case TokenType.CLASS:
                     return
 
@@ -1,24 +1,60 @@
 import sys
 import pprint
+import threading
 
 from interpreter import Interpreter
+from closure_compiler import ClosureInterpreter
 from resolver import Resolver
+from inference import TypeInference
+from optimizer.pipeline import Optimizer
+from optimizer.inlining import INLINE_THRESHOLD
 from scanner import Scanner
 from parser import Parser
+from profiles import profile_path
+from vm.machine import VM
+from transpiler.engine import PythonInterpreter
 
 from errors import error
 
 DEBUG = False
-interpreter = Interpreter()
+
+# Every Plox call nests a few Python frames, the default limit of 1000 ran
+# out under a hundred calls deep. The main thread's stack has room for this
+# many, calls through C overflow it somewhere past 14000. Tail calls loop and
+# do not nest.
+RECURSION_LIMIT = 10_000
+# With --deep-stack programs run on a thread with a stack big enough for
+# this many frames instead.
+DEEP_RECURSION_LIMIT = 200_000
+STACK_SIZE = 1 << 30
+
+ENGINES = {
+    "tree": Interpreter,
+    "vm": VM,
+    "closure": ClosureInterpreter,
+    "python": PythonInterpreter,
+}
 
 
 class Plox:
+    def __init__(self, interpreter: Interpreter | None = None):
+        self.interpreter = interpreter if interpreter is not None else Interpreter()
+        self.profile = True
+        self.optimize = True
+        self.debug_optimizer = False
+        self.inline_threshold = INLINE_THRESHOLD
+        self.lazy = False
+
     def run_file(self, file_path: str):
         global source_code
         with open(file_path, "r") as f:
             source = f.read()
         error.source_code = source
-        self.run(source)
+        if self.profile:
+            self.interpreter.feedback.load(profile_path(file_path), source)
+        self.run(source, whole_program=True)
+        if self.profile:
+            self.interpreter.feedback.save(profile_path(file_path), source)
 
         if error.had_error:
             exit(65)
@@ -34,7 +70,7 @@ class Plox:
             self.run(line)
             error.had_error = False
 
-    def run(self, source: str):
+    def run(self, source: str, whole_program: bool = False):
         scanner: Scanner = Scanner(source)
         tokens: list = scanner.scan_tokens()
         if DEBUG:
@@ -44,7 +80,7 @@ class Plox:
         if error.had_error:
             return
 
-        parser: Parser = Parser(tokens, source)
+        parser: Parser = Parser(tokens, source, self.lazy)
         statements = parser.parse()
 
         if DEBUG:
@@ -54,16 +90,35 @@ class Plox:
         if error.had_error:
             return
 
-        resolver: Resolver = Resolver(interpreter)
-        resolver.analyze(statements)
+        used = []
+        declared = []
+        # The optimizer and type inference need every function body, which
+        # lazy mode does not parse before they run.
+        if self.optimize and not self.lazy:
+            Resolver(self.interpreter).check(statements)
+            if error.had_error:
+                return
+
+            optimizer = Optimizer(
+                whole_program, self.debug_optimizer, self.inline_threshold
+            )
+            statements = optimizer.optimize(statements)
+            used = optimizer.used
+            declared = optimizer.declared
+
+        resolver: Resolver = Resolver(self.interpreter)
+        resolver.analyze(statements, used, declared)
 
         if error.had_error:
             return
 
+        if not self.lazy:
+            TypeInference().analyze(statements)
+
         if DEBUG:
             print(f'\n{"-" * 20} PROGRAM OUTPUT {"-" * 20}\n')
 
-        interpreter.interpret(statements)
+        self.interpreter.interpret(statements)
 
     def print_tokens(self, tokens):
         for token in tokens:
@@ -75,15 +130,91 @@ class Plox:
 
 
 def main():
-    plox = Plox()
-
-    args = sys.argv[1:]
-    if len(args) > 1:
-        print("Usage: plox [script]")
-    elif len(args) != 0:
-        plox.run_file(args[0])
+    engine = "tree"
+    emit_python = False
+    threshold = None
+    profile = True
+    optimize = True
+    debug_optimizer = False
+    inline_threshold = INLINE_THRESHOLD
+    lazy = False
+    deep_stack = False
+    paths = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--engine="):
+            engine = arg.removeprefix("--engine=")
+        elif arg == "--emit-python":
+            emit_python = True
+        elif arg == "--no-profile":
+            profile = False
+        elif arg == "--no-optimize":
+            optimize = False
+        elif arg == "--lazy":
+            lazy = True
+        elif arg == "--deep-stack":
+            deep_stack = True
+        elif arg == "--debug-optimizer":
+            debug_optimizer = True
+        elif arg.startswith("--inline-threshold="):
+            inline_threshold = int(arg.removeprefix("--inline-threshold="))
+        elif arg.startswith("--tier-threshold="):
+            threshold = int(arg.removeprefix("--tier-threshold="))
+        else:
+            paths.append(arg)
+
+    # Only the tree-walker parses function bodies when they are called.
+    if len(paths) > 1 or engine not in ENGINES or (lazy and engine != "tree"):
+        print(
+            f"Usage: plox [--engine={'|'.join(ENGINES)}] [--emit-python] "
+            "[--tier-threshold=N] [--no-profile] [--no-optimize] "
+            "[--inline-threshold=N] [--debug-optimizer] [--lazy] "
+            "[--deep-stack] [script]"
+        )
+        return
+
+    if emit_python:
+        plox = Plox(PythonInterpreter(emit=True))
+    else:
+        plox = Plox(ENGINES[engine]())
+    if threshold is not None:
+        plox.interpreter.tiering.threshold = threshold
+    plox.profile = profile
+    plox.optimize = optimize
+    plox.debug_optimizer = debug_optimizer
+    plox.inline_threshold = inline_threshold
+    plox.lazy = lazy
+
+    def start():
+        if len(paths) != 0:
+            plox.run_file(paths[0])
+        else:
+            plox.run_prompt()
+
+    if deep_stack:
+        run_deep(start)
     else:
-        plox.run_prompt()
+        sys.setrecursionlimit(RECURSION_LIMIT)
+        start()
+
+
+def run_deep(function):
+    """Runs function on a thread with room for DEEP_RECURSION_LIMIT frames
+    and raises what it raised, `exit()` included, on the calling thread."""
+    raised = []
+
+    def target():
+        try:
+            function()
+        except BaseException as error:
+            raised.append(error)
+
+    sys.setrecursionlimit(DEEP_RECURSION_LIMIT)
+    threading.stack_size(STACK_SIZE)
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join()
+    if raised:
+        raise raised[0]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+
+from objects.callable import PloxCallable
+from objects.function import PloxAnonymFunction, PloxFunction
+from objects.klass import PloxClass, PloxInstance
+from values.tokens import Token
+
+# Past this many different observations a site is megamorphic and recording
+# stops, a specialization would not pay off there anyway.
+MAX_KINDS = 4
+MEGAMORPHIC = "*"
+
+TYPE_NAMES = {float: "float", str: "str", bool: "bool", type(None): "none"}
+
+
+def kind(value) -> str:
+    name = TYPE_NAMES.get(type(value))
+    if name is not None:
+        return name
+    if isinstance(value, PloxInstance):
+        return f"instance {value.klass.name}"
+    if isinstance(value, PloxClass):
+        return f"class {value.name}"
+    if isinstance(value, (PloxFunction, PloxAnonymFunction)):
+        return "function"
+    if isinstance(value, PloxCallable):
+        return "native"
+    return type(value).__name__
+
+
+def profile_path(script_path: str) -> str:
+    return f"{script_path}.profile"
+
+
+class TypeFeedback:
+    """Runtime types seen at Binary operators and call sites.
+
+    Sites are keyed by the "line:column" position of the operator or
+    closing paren token and hold the distinct kinds seen there: "float str"
+    for the operands of a Binary, "function" or "class Point" for a callee.
+    The tree-walker records, the compiled tiers read it to specialize.
+    """
+
+    def __init__(self) -> None:
+        self.sites: dict[str, list[str]] = {}
+        self.changed = False
+
+    def key(self, token: Token) -> str:
+        return f"{token.position.line}:{token.position.column}"
+
+    def record(self, token: Token, *values):
+        observed = " ".join(kind(value) for value in values)
+        site = self.sites.setdefault(self.key(token), [])
+        if observed in site or MEGAMORPHIC in site:
+            return
+        if len(site) == MAX_KINDS:
+            site[:] = [MEGAMORPHIC]
+        else:
+            site.append(observed)
+        self.changed = True
+
+    def kinds(self, token: Token) -> list[str]:
+        return self.sites.get(self.key(token), [])
+
+    def monomorphic(self, token: Token) -> str | None:
+        site = self.sites.get(self.key(token))
+        if site is not None and len(site) == 1 and site[0] != MEGAMORPHIC:
+            return site[0]
+        return None
+
+    def load(self, path: str, source: str):
+        """Loads the profile saved for this exact source. A profile of an
+        older version of the script, or one that does not parse, is deleted."""
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except OSError:
+            return
+        except ValueError:
+            data = None
+
+        if not isinstance(data, dict) or data.get("source") != digest(source):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return
+
+        sites = data.get("sites")
+        if isinstance(sites, dict):
+            self.sites = {key: list(value) for key, value in sites.items()}
+
+    def save(self, path: str, source: str):
+        if not self.changed:
+            return
+        data = {"source": digest(source), "sites": self.sites}
+        try:
+            with open(path, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True)
+        except OSError:
+            pass
+
+
+def digest(source: str) -> str:
+    return hashlib.sha256(source.encode()).hexdigest()
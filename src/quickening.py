@@ -0,0 +1,338 @@
+import operator
+from typing import Any, Callable
+
+from values.tokens import TokenType
+from values import expr
+
+from profiles import TypeFeedback, kind
+from inference import FLOAT
+
+Quickened = Callable[[Any, Any], Any]
+
+FLOAT_OPERATORS = {
+    TokenType.PLUS: operator.add,
+    TokenType.MINUS: operator.sub,
+    TokenType.STAR: operator.mul,
+    TokenType.MODULO: operator.mod,
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+}
+
+COMPOUND_OPERATORS = {
+    TokenType.PLUS_ASSIGN: operator.add,
+    TokenType.MINUS_ASSIGN: operator.sub,
+    TokenType.STAR_ASSIGN: operator.mul,
+}
+
+# Quickening
+#
+# The first time the interpreter evaluates an operator node it runs the
+# generic path and installs a variant specialized for the operand types it
+# saw (or that the persisted type feedback recorded for the site) in
+# node.quickened. Later evaluations call the variant directly, which checks
+# its types with one cheap guard and skips the operator dispatch. When a
+# guard fails the node falls back to its generic variant for good. Operands
+# that TypeInference proved to be floats need no guard at all.
+
+
+def quicken_binary(expression: expr.Binary, feedback: TypeFeedback) -> Quickened:
+    operator_type = expression.operator._type
+    if operator_type == TokenType.EQUAL_EQUAL:
+        return equal
+    if operator_type == TokenType.BANG_EQUAL:
+        return not_equal
+
+    if proven(expression.left) and proven(expression.right):
+        if operator_type in UNCHECKED_BINARIES:
+            return UNCHECKED_BINARIES[operator_type]
+
+    kinds = feedback.kinds(expression.operator)
+    if len(kinds) != 1:
+        return generic_binary
+    if kinds[0] == "float float":
+        if operator_type in FLOAT_BINARIES:
+            return FLOAT_BINARIES[operator_type]
+        if operator_type == TokenType.SLASH:
+            return float_divide
+    if kinds[0] == "str str" and operator_type == TokenType.PLUS:
+        return str_concat
+    return generic_binary
+
+
+def quicken_unary(expression: expr.Unary, right) -> Quickened:
+    if expression.operator._type == TokenType.BANG:
+        return bang
+    if proven(expression.right):
+        return unchecked_negate
+    if kind(right) == "float":
+        return float_negate
+    return generic_unary
+
+
+def quicken_compound(
+    expression: expr.CompoundAssign, feedback: TypeFeedback
+) -> Quickened:
+    operator_type = expression.operator._type
+    if operator_type not in COMPOUND_OPERATORS:
+        return generic_compound
+    field = isinstance(expression.target, expr.Get)
+    if not field and proven(expression.target) and proven(expression.value):
+        return UNCHECKED_COMPOUNDS[operator_type]
+    if feedback.monomorphic(expression.operator) != "float float":
+        return generic_compound
+    if field:
+        return FIELD_COMPOUNDS[operator_type]
+    return FLOAT_COMPOUNDS[operator_type]
+
+
+def quicken_increment(expression: expr.Increment, feedback: TypeFeedback) -> Quickened:
+    key = (expression.operator._type, expression.prefix)
+    field = isinstance(expression.target, expr.Get)
+    if not field and proven(expression.target):
+        return UNCHECKED_STEPS[key]
+    if feedback.monomorphic(expression.operator) != "float":
+        return generic_increment
+    if field:
+        return FIELD_STEPS[key]
+    return FLOAT_STEPS[key]
+
+
+def proven(operand: expr.Expr) -> bool:
+    return operand.inferred == FLOAT
+
+
+# Generic variants
+
+
+def generic_binary(interpreter, expression: expr.Binary):
+    left = expression.left.accept(interpreter)
+    right = expression.right.accept(interpreter)
+    interpreter.feedback.record(expression.operator, left, right)
+    return interpreter.binary(expression, left, right)
+
+
+def generic_unary(interpreter, expression: expr.Unary):
+    return interpreter.unary(expression, expression.right.accept(interpreter))
+
+
+def generic_compound(interpreter, expression: expr.CompoundAssign):
+    return interpreter.compound_assign(expression)
+
+
+def generic_increment(interpreter, expression: expr.Increment):
+    return interpreter.increment_assign(expression)
+
+
+# Binary
+
+
+def float_binary(apply) -> Quickened:
+    def binary(interpreter, expression: expr.Binary):
+        left = expression.left.accept(interpreter)
+        right = expression.right.accept(interpreter)
+        if type(left) is float and type(right) is float:
+            return apply(left, right)
+        expression.quickened = generic_binary
+        interpreter.feedback.record(expression.operator, left, right)
+        return interpreter.binary(expression, left, right)
+
+    return binary
+
+
+FLOAT_BINARIES = {
+    operator_type: float_binary(apply)
+    for operator_type, apply in FLOAT_OPERATORS.items()
+}
+
+
+def unchecked_binary(apply) -> Quickened:
+    def binary(interpreter, expression: expr.Binary):
+        left = expression.left.accept(interpreter)
+        return apply(left, expression.right.accept(interpreter))
+
+    return binary
+
+
+UNCHECKED_BINARIES = {
+    operator_type: unchecked_binary(apply)
+    for operator_type, apply in FLOAT_OPERATORS.items()
+}
+
+
+def float_divide(interpreter, expression: expr.Binary):
+    left = expression.left.accept(interpreter)
+    right = expression.right.accept(interpreter)
+    if type(left) is float and type(right) is float:
+        if left != 0 and right != 0:
+            return left / right
+        # Dividing by zero is an error, not a reason to deoptimize.
+        return interpreter.binary(expression, left, right)
+    expression.quickened = generic_binary
+    interpreter.feedback.record(expression.operator, left, right)
+    return interpreter.binary(expression, left, right)
+
+
+def str_concat(interpreter, expression: expr.Binary):
+    left = expression.left.accept(interpreter)
+    right = expression.right.accept(interpreter)
+    if type(left) is str and type(right) is str:
+        return left + right
+    expression.quickened = generic_binary
+    interpreter.feedback.record(expression.operator, left, right)
+    return interpreter.binary(expression, left, right)
+
+
+def equal(interpreter, expression: expr.Binary):
+    return expression.left.accept(interpreter) == expression.right.accept(interpreter)
+
+
+def not_equal(interpreter, expression: expr.Binary):
+    left = expression.left.accept(interpreter)
+    return not left == expression.right.accept(interpreter)
+
+
+# Unary
+
+
+def bang(interpreter, expression: expr.Unary):
+    value = expression.right.accept(interpreter)
+    return value is None or value is False
+
+
+def float_negate(interpreter, expression: expr.Unary):
+    value = expression.right.accept(interpreter)
+    if type(value) is float:
+        return -value
+    expression.quickened = generic_unary
+    return interpreter.unary(expression, value)
+
+
+def unchecked_negate(interpreter, expression: expr.Unary):
+    return -expression.right.accept(interpreter)
+
+
+# Compound assignment
+#
+# Guarded variants only ever run on floats, which the generic path raises
+# for anything else, so a failed guard deoptimizes and raises from there.
+
+
+def float_compound(apply) -> Quickened:
+    def compound(interpreter, expression: expr.CompoundAssign):
+        current = expression.target.accept(interpreter)
+        operand = expression.value.accept(interpreter)
+        if type(current) is float and type(operand) is float:
+            value = apply(current, operand)
+            interpreter.assign_variable(expression.target, value)
+            return value
+        expression.quickened = generic_compound
+        interpreter.feedback.record(expression.operator, current, operand)
+        return interpreter.compound(expression.operator, current, operand)
+
+    return compound
+
+
+def field_compound(apply) -> Quickened:
+    def compound(interpreter, expression: expr.CompoundAssign):
+        target = expression.target
+        obj = target.obj.accept(interpreter)
+        current = interpreter.get_property(obj, target.name)
+        operand = expression.value.accept(interpreter)
+        if type(current) is float and type(operand) is float:
+            value = obj.fields[target.name.symbol] = apply(current, operand)
+            return value
+        expression.quickened = generic_compound
+        interpreter.feedback.record(expression.operator, current, operand)
+        return interpreter.compound(expression.operator, current, operand)
+
+    return compound
+
+
+def unchecked_compound(apply) -> Quickened:
+    def compound(interpreter, expression: expr.CompoundAssign):
+        current = expression.target.accept(interpreter)
+        value = apply(current, expression.value.accept(interpreter))
+        interpreter.assign_variable(expression.target, value)
+        return value
+
+    return compound
+
+
+FLOAT_COMPOUNDS = {
+    operator_type: float_compound(apply)
+    for operator_type, apply in COMPOUND_OPERATORS.items()
+}
+
+FIELD_COMPOUNDS = {
+    operator_type: field_compound(apply)
+    for operator_type, apply in COMPOUND_OPERATORS.items()
+}
+
+UNCHECKED_COMPOUNDS = {
+    operator_type: unchecked_compound(apply)
+    for operator_type, apply in COMPOUND_OPERATORS.items()
+}
+
+
+# Increment and decrement
+
+STEPS = {TokenType.PLUS_PLUS: 1.0, TokenType.MINUS_MINUS: -1.0}
+
+
+def float_step(step: float, prefix: bool) -> Quickened:
+    def increment(interpreter, expression: expr.Increment):
+        value = expression.target.accept(interpreter)
+        if type(value) is float:
+            interpreter.assign_variable(expression.target, value + step)
+            return value + step if prefix else value
+        expression.quickened = generic_increment
+        interpreter.feedback.record(expression.operator, value)
+        return interpreter.increment(expression.operator, value)
+
+    return increment
+
+
+def field_step(step: float, prefix: bool) -> Quickened:
+    def increment(interpreter, expression: expr.Increment):
+        target = expression.target
+        obj = target.obj.accept(interpreter)
+        value = interpreter.get_property(obj, target.name)
+        if type(value) is float:
+            obj.fields[target.name.symbol] = value + step
+            return value + step if prefix else value
+        expression.quickened = generic_increment
+        interpreter.feedback.record(expression.operator, value)
+        return interpreter.increment(expression.operator, value)
+
+    return increment
+
+
+def unchecked_step(step: float, prefix: bool) -> Quickened:
+    def increment(interpreter, expression: expr.Increment):
+        value = expression.target.accept(interpreter)
+        interpreter.assign_variable(expression.target, value + step)
+        return value + step if prefix else value
+
+    return increment
+
+
+# Keyed by operator and whether it is a prefix.
+FLOAT_STEPS = {
+    (operator_type, prefix): float_step(step, prefix)
+    for operator_type, step in STEPS.items()
+    for prefix in (True, False)
+}
+
+FIELD_STEPS = {
+    (operator_type, prefix): field_step(step, prefix)
+    for operator_type, step in STEPS.items()
+    for prefix in (True, False)
+}
+
+UNCHECKED_STEPS = {
+    (operator_type, prefix): unchecked_step(step, prefix)
+    for operator_type, step in STEPS.items()
+    for prefix in (True, False)
+}
@@ -6,6 +6,7 @@ from values.tokens import Token
 from values import stmt
 from values import expr
 
+from errors import error
 from errors.error import parse_error, resolver_error
 
 
@@ -23,12 +24,57 @@ class ClassType(Enum):
     SUBCLASS = auto()
 
 
+def declares(statements: list[stmt.Stmt]) -> bool:
+    """Whether a block declares anything, declarations only appear directly
+    in a block."""
+    return any(
+        isinstance(statement, (stmt.Var, stmt.Function, stmt._Class))
+        for statement in statements
+    )
+
+
+class FunctionScope:
+    """A function being resolved: the index of the scope of its parameters
+    and the variables of enclosing functions and scopes it captures, by name
+    and as where to find their Cells when the function is created."""
+
+    def __init__(self, scope: int, names: dict[str, int] | None = None) -> None:
+        self.scope = scope
+        self.names: dict[str, int] = {}
+        self.captures: list[tuple[int, int]] = []
+        if names is not None:
+            self.names = dict(names)
+
+
 class Resolver(expr.Visitor, stmt.Visitor):
     def __init__(self, interpreter) -> None:
         self.interpreter = interpreter
         self.scopes: list[dict[str, bool]] = []
+        # The slot of each local in its scope's Env.
+        self.slots: list[dict[str, int]] = []
+        # The locals of each scope that functions capture, which live in
+        # Cells, the declarations of each scope and the reads and writes of
+        # its locals not captured yet, marked as going through the Cell once
+        # a function captures them.
+        self.cells: list[set[str]] = []
+        self.declarations: list[dict[str, Any]] = []
+        self.reads: list[dict[str, list[expr.Expr]]] = []
+        self.functions: list[FunctionScope] = []
+        # The names declared with const in each scope, and at the top level.
+        self.constants: list[set[str]] = []
+        self.global_constants: set[str] = set()
+        self.declared_constants: set[str] = set()
+        self.checking = False
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
+        # How many loops of the current function the code being resolved
+        # is nested in, break and continue need at least one.
+        self.loops = 0
+        # Whether the current function is a generator, and the statements
+        # of it the code being resolved is nested in, which a `yield` can
+        # suspend.
+        self.generator = False
+        self.suspending: list[stmt.Stmt] = []
         self.unresolved = set()
         self.resolved = set()
 
@@ -36,7 +82,7 @@ class Resolver(expr.Visitor, stmt.Visitor):
         enclosing_class = self.current_class
         self.current_class = ClassType.CLASS
 
-        self.declare(statement.name)
+        statement.slot = self.declare(statement.name, statement)
         self.define(statement.name)
 
         if (
@@ -53,10 +99,10 @@ class Resolver(expr.Visitor, stmt.Visitor):
 
         if statement.superclass:
             self.begin_scope()
-            self.peek()["super"] = True
+            self.declare_implicit("super")
 
         self.begin_scope()
-        self.peek()["self"] = True
+        self.declare_implicit("self")
         for method in statement.methods:
             declaration = FunctionType.METHOD
             if method.name.symbol == "init":
@@ -70,15 +116,21 @@ class Resolver(expr.Visitor, stmt.Visitor):
         self.current_class = enclosing_class
 
     def visit_block_stmt(self, statement: stmt.Block) -> Any:
-        self.begin_scope()
-        self.resolve(statement.statements)
-        self.end_scope()
+        statement.scoped = declares(statement.statements)
+        self.suspending.append(statement)
+        if statement.scoped:
+            self.begin_scope()
+            self.resolve(statement.statements)
+            self.end_scope(statement)
+        else:
+            self.resolve(statement.statements)
+        self.suspending.pop()
 
     def visit_expression_stmt(self, statement: stmt.Expression) -> Any:
         self.resolve_node(statement.expression)
 
     def visit_function_stmt(self, statement: stmt.Function) -> Any:
-        self.declare(statement.name)
+        statement.slot = self.declare(statement.name, statement)
         self.define(statement.name)
         self.resolve_function(statement, FunctionType.FUNCTION)
 
@@ -87,9 +139,27 @@ class Resolver(expr.Visitor, stmt.Visitor):
 
     def visit_if_stmt(self, statement: stmt.If) -> Any:
         self.resolve_node(statement.condition)
+        self.suspending.append(statement)
         self.resolve_node(statement.then)
         if statement.els is not None:
             self.resolve_node(statement.els)
+        self.suspending.pop()
+
+    def visit_match_stmt(self, statement: stmt.Match) -> Any:
+        self.resolve_node(statement.value)
+        self.suspending.append(statement)
+        for pattern, arm in zip(statement.patterns, statement.arms):
+            self.resolve_node(pattern)
+            self.resolve_node(arm)
+        if statement.els is not None:
+            self.resolve_node(statement.els)
+        self.suspending.pop()
+
+        if all(isinstance(pattern, expr.Literal) for pattern in statement.patterns):
+            table = {}
+            for index, pattern in enumerate(statement.patterns):
+                table.setdefault(pattern.value, index)
+            statement.table = table
 
     def visit_echo_stmt(self, statement: stmt.Echo) -> Any:
         self.resolve_node(statement.expression)
@@ -102,18 +172,62 @@ class Resolver(expr.Visitor, stmt.Visitor):
                 resolver_error(
                     statement.keyword, "Can't return a value from an initializer."
                 )
+            if self.generator:
+                parse_error(statement.keyword, "Can't return a value from a generator.")
+            self.resolve_node(statement.value)
+            statement.tail = isinstance(statement.value, expr.Call)
+
+    def visit_yield_stmt(self, statement: stmt.Yield) -> Any:
+        if self.current_function == FunctionType.NONE:
+            parse_error(statement.keyword, "Can't yield from top-level code.")
+        elif self.current_function == FunctionType.INITIALIZER:
+            parse_error(statement.keyword, "Can't yield from an initializer.")
+        if statement.value is not None:
             self.resolve_node(statement.value)
+        for enclosing in self.suspending:
+            enclosing.yields = True
+
+    def visit_break_stmt(self, statement: stmt.Break) -> Any:
+        if self.loops == 0:
+            parse_error(statement.keyword, "Can't use 'break' outside of a loop.")
+
+    def visit_continue_stmt(self, statement: stmt.Continue) -> Any:
+        if self.loops == 0:
+            parse_error(statement.keyword, "Can't use 'continue' outside of a loop.")
 
     def visit_var_stmt(self, statement: stmt.Var) -> Any:
-        self.declare(statement.name)
+        statement.slot = self.declare(statement.name, statement)
         if statement.initializer is not None:
             self.resolve_node(statement.initializer)
         self.define(statement.name)
         self.unresolved.add(statement.name)
+        if statement.constant:
+            if len(self.scopes) == 0:
+                self.declared_constants.add(statement.name.symbol)
+            else:
+                self.constants[-1].add(statement.name.symbol)
 
     def visit_while_stmt(self, statement: stmt.While) -> Any:
         self.resolve_node(statement.condition)
+        self.suspending.append(statement)
+        self.loops += 1
         self.resolve_node(statement.body)
+        self.loops -= 1
+        self.suspending.pop()
+        if statement.increment is not None:
+            self.resolve_node(statement.increment)
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        self.resolve_node(statement.iterable)
+        self.begin_scope()
+        statement.slot = self.declare(statement.name, statement)
+        self.define(statement.name)
+        self.suspending.append(statement)
+        self.loops += 1
+        self.resolve_node(statement.body)
+        self.loops -= 1
+        self.suspending.pop()
+        self.end_scope()
 
     def visit_self_expr(self, expression: expr.Self):
         if self.current_class == ClassType.NONE:
@@ -135,12 +249,25 @@ class Resolver(expr.Visitor, stmt.Visitor):
                 expression.keyword, "Can't use 'super' in a class with no superclass"
             )
         self.resolve_local(expression, expression.keyword)
+        if not self.checking and self.functions:
+            # `self` is declared in the scope inside the one of `super`.
+            expression.self_slot = self.capture(
+                len(self.functions) - 1, "self", self.find_scope(expression.keyword) + 1
+            )
 
-    def visit_prefix_expr(self, expression: expr.Prefix):
-        self.resolve_node(expression.right)
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign):
+        self.resolve_target(expression.target)
+        self.resolve_node(expression.value)
 
-    def visit_postfix_expr(self, expression: expr.Postfix):
-        self.resolve_node(expression.left)
+    def visit_increment_expr(self, expression: expr.Increment):
+        self.resolve_target(expression.target)
+
+    def resolve_target(self, target: expr.Variable | expr.Get):
+        """Resolves a variable the node reads and writes in one go to its
+        slot, or the object of a field."""
+        self.resolve_node(target)
+        if isinstance(target, expr.Variable):
+            self.check_assignable(target.name)
 
     def visit_binary_expr(self, expression: expr.Binary):
         self.resolve_node(expression.left)
@@ -173,6 +300,7 @@ class Resolver(expr.Visitor, stmt.Visitor):
     def visit_assign_expr(self, expression: expr.Assign) -> Any:
         self.resolve_node(expression.value)
         self.resolve_local(expression, expression.name)
+        self.check_assignable(expression.name)
 
     def visit_variable_expr(self, expression: expr.Variable) -> Any:
         if len(self.scopes) != 0 and self.peek().get(expression.name.symbol) is False:
@@ -180,14 +308,43 @@ class Resolver(expr.Visitor, stmt.Visitor):
                 expression.name, "Can't read local variable in its own initilizer."
             )
         self.resolve_local(expression, expression.name)
+        if (
+            not self.checking
+            and self.find_scope(expression.name) < 0
+            and self.is_constant(expression.name)
+        ):
+            expression.constant = True
 
-    def analyze(self, statements: list):
+    def analyze(self, statements: list, used=(), declared=()):
+        self.resolved.update(used)
+        self.unresolved.update(declared)
+        self.find_constants(statements)
         self.resolve(statements)
+        if not error.had_error:
+            self.interpreter.constants.update(self.declared_constants)
+        self.warn_unused()
+
+    def warn_unused(self):
         unused = self.unresolved - self.resolved
         if unused:
             for name in unused:
                 resolver_error(name, f"Variable '{name.symbol}' was never used.")
 
+    def check(self, statements: list):
+        """Reports the errors in statements without resolving them or warning,
+        for a program the optimizer is about to rewrite: it may remove the
+        code an error is in."""
+        self.checking = True
+        self.find_constants(statements)
+        self.resolve(statements)
+
+    def find_constants(self, statements: list):
+        # Functions declared before a global const must not write it either.
+        self.global_constants = set(self.interpreter.constants)
+        for statement in statements:
+            if isinstance(statement, stmt.Var) and statement.constant:
+                self.global_constants.add(statement.name.symbol)
+
     def resolve(self, statements: list):
         for statement in statements:
             self.resolve_node(statement)
@@ -197,38 +354,183 @@ class Resolver(expr.Visitor, stmt.Visitor):
 
     def resolve_local(self, expression: expr.Expr, name: Token):
         self.resolved.add(name)
+        i = self.find_scope(name)
+        if self.checking:
+            return
+        if i < 0:
+            self.interpreter.resolve_global(expression, name.symbol)
+            return
+
+        symbol = name.symbol
+        if not self.functions or i >= self.functions[-1].scope:
+            expression.cell = symbol in self.cells[i]
+            if not expression.cell:
+                self.reads[i].setdefault(symbol, []).append(expression)
+            self.interpreter.resolve(
+                expression, len(self.scopes) - 1 - i, self.slots[i][symbol]
+            )
+            return
+
+        # Declared outside the function, read from its captured Cells, in
+        # the Env enclosing the one of its parameters.
+        function = self.functions[-1]
+        expression.cell = True
+        self.interpreter.resolve(
+            expression,
+            len(self.scopes) - function.scope,
+            self.capture(len(self.functions) - 1, symbol, i),
+        )
+
+    def capture(self, level: int, symbol: str, i: int) -> int:
+        """Captures the local symbol declared in scope i in the function at
+        level and the functions between them, returns its index among the
+        captures of the function at level."""
+        function = self.functions[level]
+        if symbol in function.names:
+            return function.names[symbol]
+
+        # Where the function is created.
+        creation = function.scope - 1
+        enclosing = self.functions[level - 1] if level > 0 else None
+        if enclosing is None or i >= enclosing.scope:
+            self.capture_local(symbol, i)
+            location = (creation - i, self.slots[i][symbol])
+        else:
+            location = (
+                creation - enclosing.scope + 1,
+                self.capture(level - 1, symbol, i),
+            )
+        function.names[symbol] = len(function.captures)
+        function.captures.append(location)
+        return function.names[symbol]
+
+    def capture_local(self, symbol: str, i: int):
+        if symbol in self.cells[i]:
+            return
+        self.cells[i].add(symbol)
+        for expression in self.reads[i].pop(symbol, []):
+            expression.cell = True
+        declaration = self.declarations[i].get(symbol)
+        if declaration is not None:
+            declaration.cell = True
+
+    def find_scope(self, name: Token) -> int:
+        """The index of the innermost scope declaring name, -1 for a global."""
         for i in range(len(self.scopes) - 1, -1, -1):
             if name.symbol in self.scopes[i]:
-                self.interpreter.resolve(expression, len(self.scopes) - 1 - i)
-                return
+                return i
+        return -1
+
+    def is_constant(self, name: Token) -> bool:
+        i = self.find_scope(name)
+        if i >= 0:
+            return name.symbol in self.constants[i]
+        return name.symbol in self.global_constants
+
+    def check_assignable(self, name: Token):
+        if self.is_constant(name):
+            parse_error(name, f"Can't assign to constant '{name.symbol}'.")
 
     def resolve_function(
-        self, function: stmt.Function | expr.Anonym, _type: FunctionType
+        self,
+        function: stmt.Function | expr.Anonym,
+        _type: FunctionType,
+        captured: dict[str, int] | None = None,
     ):
-        enclosing_function = self.current_function
-        self.current_function = _type
+        if isinstance(function, stmt.Function) and function.pending is not None:
+            self.defer_function(function, _type)
+            return
+
+        enclosing_function, enclosing_loops = self.current_function, self.loops
+        enclosing_generator, enclosing_suspending = self.generator, self.suspending
+        self.current_function, self.loops = _type, 0
+        self.generator, self.suspending = function.generator, []
         self.begin_scope()
+        scope = FunctionScope(len(self.scopes) - 1, captured)
+        self.functions.append(scope)
+        if captured is not None:
+            scope.captures = list(function.captures)
+        elif _type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            # Always the first capture, bind fills it in.
+            self.capture(len(self.functions) - 1, "self", scope.scope - 1)
         for param in function.params:
             self.declare(param)
             self.define(param)
         self.resolve(function.body)
+        self.functions.pop(-1)
+        function.captures = scope.captures
+        self.end_scope(function)
+        self.current_function, self.loops = enclosing_function, enclosing_loops
+        self.generator, self.suspending = enclosing_generator, enclosing_suspending
+
+    def defer_function(self, function: stmt.Function, _type: FunctionType):
+        """Captures every local of the enclosing scopes named in the pending
+        body of function, the body is only resolved on the first call."""
+        if self.checking:
+            return
+        self.begin_scope()
+        scope = FunctionScope(len(self.scopes) - 1)
+        self.functions.append(scope)
+        level = len(self.functions) - 1
+        if _type in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            self.capture(level, "self", scope.scope - 1)
+            if self.current_class == ClassType.SUBCLASS:
+                self.capture(level, "super", scope.scope - 2)
+        for name in function.pending.names:
+            i = self.find_scope(name)
+            if i >= 0:
+                self.capture(level, name.symbol, i)
+        self.functions.pop(-1)
         self.end_scope()
-        self.current_function = enclosing_function
+        function.captures = scope.captures
+        function.pending.defer(self, _type, scope.names)
 
     def begin_scope(self):
         self.scopes.append({})
-
-    def end_scope(self):
+        self.constants.append(set())
+        self.slots.append({})
+        self.cells.append(set())
+        self.declarations.append({})
+        self.reads.append({})
+
+    def end_scope(self, node: stmt.Block | stmt.Function | expr.Anonym | None = None):
+        """Closes the innermost scope, records its number of slots and which
+        of them hold Cells on node, the Block or function it belongs to."""
         self.scopes.pop(-1)
-
-    def declare(self, name: Token):
+        self.constants.pop(-1)
+        self.declarations.pop(-1)
+        self.reads.pop(-1)
+        slots = self.slots.pop(-1)
+        cells = self.cells.pop(-1)
+        if node is not None:
+            node.slots = len(slots)
+            node.cells = [slots[name] for name in cells]
+
+    def declare(self, name: Token, declaration=None) -> int | None:
+        """Declares name in the innermost scope and returns its slot, None
+        for a global."""
         if len(self.scopes) == 0:
-            return
+            if name.symbol in self.interpreter.constants | self.declared_constants:
+                parse_error(name, f"Already a constant named '{name.symbol}'.")
+            return None
 
         scope = self.peek()
         if name.symbol in scope:
             parse_error(name, "Already a variable with this name is this scope")
         scope[name.symbol] = False
+        if declaration is not None:
+            declaration.cell = False
+            self.declarations[-1][name.symbol] = declaration
+        slots = self.slots[-1]
+        slots.setdefault(name.symbol, len(slots))
+        return slots[name.symbol]
+
+    def declare_implicit(self, name: str):
+        """Declares `self` or `super`, alone in the scope around methods.
+        They are always held in a Cell."""
+        self.peek()[name] = True
+        self.slots[-1][name] = 0
+        self.cells[-1].add(name)
 
     def define(self, name: Token):
         if len(self.scopes) == 0:
@@ -14,12 +14,16 @@ class Scanner:
         self.line_start = 0
         self.keywords = {
             "and": TokenType.AND,
+            "break": TokenType.BREAK,
             "class": TokenType.CLASS,
+            "continue": TokenType.CONTINUE,
             "else": TokenType.ELSE,
             "false": TokenType.FALSE,
             "for": TokenType.FOR,
             "fn": TokenType.FN,
             "if": TokenType.IF,
+            "in": TokenType.IN,
+            "match": TokenType.MATCH,
             "none": TokenType.NONE,
             "or": TokenType.OR,
             "echo": TokenType.ECHO,
@@ -28,7 +32,9 @@ class Scanner:
             "self": TokenType.SELF,
             "true": TokenType.TRUE,
             "let": TokenType.LET,
+            "const": TokenType.CONST,
             "while": TokenType.WHILE,
+            "yield": TokenType.YIELD,
         }
 
     def scan_tokens(self) -> list[Token]:
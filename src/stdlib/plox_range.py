@@ -0,0 +1,43 @@
+from objects.callable import PloxCallable
+
+
+class Range:
+    """The numbers from start up to but not including stop, in steps of 1.
+    Iterating it hands out Python floats without going through Plox code."""
+
+    __slots__ = ("start", "stop")
+
+    def __init__(self, start, stop) -> None:
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self):
+        if self.start.is_integer() and self.stop.is_integer():
+            return map(float, range(int(self.start), int(self.stop)))
+        return self.steps()
+
+    def steps(self):
+        value = self.start
+        while value < self.stop:
+            yield value
+            value += 1.0
+
+    def __str__(self) -> str:
+        return "<range>"
+
+    def __repr__(self) -> str:
+        return "<range>"
+
+
+class PloxRange(PloxCallable):
+    def arity(self):
+        return 2
+
+    def call(self, interpreter, arguments: list):
+        return Range(*arguments)
+
+    def __str__(self) -> str:
+        return "<Native Fn>"
+
+    def __repr__(self) -> str:
+        return "<Native Fn>"
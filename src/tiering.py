@@ -0,0 +1,78 @@
+from typing import Any, Callable
+
+from values import stmt
+
+from environment import Env
+
+Node = Callable[[Env], Any]
+
+HOT_THRESHOLD = 1000
+
+
+class Profile:
+    def __init__(self, node) -> None:
+        # Holding on to the node keeps its id from being reused in the REPL.
+        self.node = node
+        self.count = 0
+        self.compiled: Node | None = None
+        self.failed = False
+
+
+class Tiering:
+    """Hotness counters for the tree-walker.
+
+    Functions count their calls and loops their back-edges. Once a
+    count crosses the threshold the node is compiled by the ClosureCompiler,
+    which shares the tree-walker's environments, so execution can switch
+    tiers at any call or loop iteration. A node the compiler cannot handle
+    stays in the tree-walker for good. A threshold of 0 disables tiering.
+    """
+
+    def __init__(self, interpreter, threshold: int = HOT_THRESHOLD) -> None:
+        self.interpreter = interpreter
+        self.threshold = threshold
+        self.profiles: dict[int, Profile] = {}
+        self.compiler = None
+
+    def profile(self, node) -> Profile:
+        profile = self.profiles.get(id(node))
+        if profile is None:
+            profile = Profile(node)
+            self.profiles[id(node)] = profile
+        return profile
+
+    def function_body(self, declaration) -> Node | None:
+        """Counts one call and returns the compiled body once it is hot."""
+        if not self.threshold:
+            return None
+        profile = self.profile(declaration)
+        if profile.compiled is None and not profile.failed:
+            profile.count += 1
+            if profile.count >= self.threshold:
+                self.promote(profile, lambda c: c.function_body(declaration))
+        return profile.compiled
+
+    def loop(self, statement: stmt.While | stmt.ForIn, back_edges: int) -> Node | None:
+        """Adds the back-edges a loop took and returns the compiled loop once
+        it is hot. A compiled while loop picks up at the next condition
+        check, a compiled for-in loop takes its Env and the iterator and
+        picks up at the next item."""
+        if not self.threshold:
+            return None
+        profile = self.profile(statement)
+        if profile.compiled is None and not profile.failed:
+            profile.count += back_edges
+            if profile.count >= self.threshold:
+                self.promote(profile, lambda c: c.loop(statement))
+        return profile.compiled
+
+    def promote(self, profile: Profile, compile: Callable) -> None:
+        if self.compiler is None:
+            # Imported here, the closure compiler builds on the interpreter.
+            from closure_compiler import ClosureCompiler
+
+            self.compiler = ClosureCompiler(self.interpreter)
+        try:
+            profile.compiled = compile(self.compiler)
+        except NotImplementedError:
+            profile.failed = True
@@ -0,0 +1,691 @@
+import itertools
+from typing import Any
+
+from values.tokens import Token, TokenType
+from values import expr
+from values import stmt
+
+from resolver import FunctionType
+from vm.compiler import contains_function
+from inference import BOOL, FLOAT
+
+from transpiler.scopes import Binding, FunctionScope, ScopeAnalyzer
+
+HEADER = "# Generated by plox --emit-python"
+
+ARITHMETIC = {
+    TokenType.MINUS: "-",
+    TokenType.STAR: "*",
+    TokenType.MODULO: "%",
+    TokenType.GREATER: ">",
+    TokenType.GREATER_EQUAL: ">=",
+    TokenType.LESS: "<",
+    TokenType.LESS_EQUAL: "<=",
+}
+
+COMPOUND = {
+    TokenType.PLUS_ASSIGN: "+",
+    TokenType.MINUS_ASSIGN: "-",
+    TokenType.STAR_ASSIGN: "*",
+    TokenType.SLASH_ASSIGN: "/",
+}
+
+COMPARISONS = {
+    TokenType.GREATER,
+    TokenType.GREATER_EQUAL,
+    TokenType.LESS,
+    TokenType.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL,
+    TokenType.BANG_EQUAL,
+}
+
+# Module level names are shared by every program run in the same namespace,
+# so token constants are numbered across transpilations.
+constant_ids = itertools.count()
+
+
+class Transpiler(expr.Visitor, stmt.Visitor):
+    """Translates a program into Python source.
+
+    Plox globals become module globals suffixed with "_", locals become
+    uniquely numbered Python locals and captured locals are kept in cells
+    that nested functions receive as keyword-only defaults. Every generated
+    name that is not a Plox variable starts with "_", which the scanner
+    never produces. Arithmetic is inlined with its type checks; anything
+    unusual falls back to the helpers in transpiler.runtime.
+    """
+
+    def __init__(self, defined=()) -> None:
+        self.analyzer = ScopeAnalyzer()
+        self.lines: list[str] = [HEADER]
+        self.depth = 0
+        self.constants: dict[str, Any] = {}
+        self.token_names: dict[int, str] = {}
+        self.defined: set[str] = set(defined)
+        # The global reads and calls on each line, to map errors back to.
+        self.line_tokens: dict[int, list[Token]] = {}
+        self.pending: list[Token] = []
+        self.function: FunctionScope | None = None
+        # The loops of the current function the code is nested in.
+        self.loops: list[stmt.While | stmt.ForIn] = []
+        # Whether the current function returns the value of a call.
+        self.tail_calls = False
+        self.temps = 0
+        self.names = 0
+
+    def transpile(self, statements: list[stmt.Stmt]) -> str:
+        self.function = self.analyzer.analyze(statements)
+        self.emit("def _main():")
+        self.depth += 1
+        self.declare_globals(self.function)
+        self.suite(statements)
+        self.depth -= 1
+        return "\n".join(self.lines) + "\n"
+
+    def undefined(self, line: int, name: str) -> Token | None:
+        for token in self.line_tokens.get(line, []):
+            if f"{token.symbol}_" == name:
+                return token
+        return None
+
+    def call_site(self, line: int) -> Token | None:
+        for token in self.line_tokens.get(line, []):
+            if token._type == TokenType.RIGHT_PAREN:
+                return token
+        return None
+
+    # Output
+
+    def emit(self, line: str):
+        self.lines.append("    " * self.depth + line)
+        if self.pending:
+            self.line_tokens[len(self.lines)] = self.pending
+            self.pending = []
+
+    def suite(self, statements: list[stmt.Stmt]):
+        start = len(self.lines)
+        for statement in statements:
+            self.transpile_node(statement)
+        if len(self.lines) == start:
+            self.emit("pass")
+
+    def indented(self, statements: list[stmt.Stmt]):
+        self.depth += 1
+        self.suite(statements)
+        self.depth -= 1
+
+    def transpile_node(self, node):
+        return node.accept(self)
+
+    def constant(self, token: Token) -> str:
+        if id(token) not in self.token_names:
+            name = f"_k{next(constant_ids)}"
+            self.token_names[id(token)] = name
+            self.constants[name] = token
+        return self.token_names[id(token)]
+
+    def temp(self) -> str:
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    def unique(self, name: str) -> str:
+        self.names += 1
+        return f"_{name}_{self.names}"
+
+    def declare_globals(self, function: FunctionScope):
+        if function.global_writes:
+            names = ", ".join(sorted(f"{name}_" for name in function.global_writes))
+            self.emit(f"global {names}")
+
+    # Variables
+
+    def load(self, binding: Binding | None, name: Token) -> str:
+        if binding is None:
+            self.pending.append(name)
+            return f"{name.symbol}_"
+        if binding.captured:
+            return f"{binding.python_name}.value"
+        return binding.python_name
+
+    def store(self, binding: Binding | None, name: Token, value: str, checked=False):
+        if binding is None:
+            target = f"{name.symbol}_"
+            if not checked and target not in self.defined:
+                value = f"_defined({target!r}, {value}, {self.constant(name)})"
+            return f"({target} := {value})"
+        if binding.captured:
+            return f"_store({binding.python_name}, {value})"
+        return f"({binding.python_name} := {value})"
+
+    def assign(self, binding: Binding | None, name: Token, value: str):
+        if binding is None:
+            target = f"{name.symbol}_"
+            if target not in self.defined:
+                value = f"_defined({target!r}, {value}, {self.constant(name)})"
+            self.emit(f"{target} = {value}")
+        elif binding.captured:
+            self.emit(f"{binding.python_name}.value = {value}")
+        else:
+            self.emit(f"{binding.python_name} = {value}")
+
+    def define(self, binding: Binding | None, name: Token, initializer):
+        if binding is None:
+            self.emit(f"{name.symbol}_ = {initializer()}")
+            if self.depth == 1 and self.function is self.analyzer.main:
+                self.defined.add(f"{name.symbol}_")
+        elif not binding.captured:
+            self.emit(f"{binding.python_name} = {initializer()}")
+        else:
+            self.emit(f"{binding.python_name} = _Cell()")
+            self.emit(f"{binding.python_name}.value = {initializer()}")
+
+    # Functions
+
+    def function_def(self, declaration, python_name: str, kind: FunctionType):
+        scope = self.analyzer.functions[id(declaration)]
+        params = []
+        if kind in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            params.append(self.analyzer.declarations[id(declaration.name)])
+        params.extend(self.analyzer.declarations[id(p)] for p in declaration.params)
+
+        signature = [param.python_name for param in params]
+        if scope.captures:
+            signature.append("*")
+            signature.extend(f"{b.python_name}={b.python_name}" for b in scope.captures)
+        self.emit(f"def {python_name}({', '.join(signature)}):")
+
+        enclosing, temps, pending = self.function, self.temps, self.pending
+        loops, tail_calls = self.loops, self.tail_calls
+        self.function, self.temps, self.pending = scope, 0, []
+        self.loops, self.tail_calls = [], False
+        self.depth += 1
+
+        self.declare_globals(scope)
+        for param in params:
+            if param.captured:
+                self.emit(f"{param.python_name} = _Cell({param.python_name})")
+        if kind == FunctionType.INITIALIZER:
+            for statement in declaration.body:
+                self.transpile_node(statement)
+            self.emit(f"return {self.load(params[0], declaration.name)}")
+        else:
+            self.suite(declaration.body)
+        if declaration.generator:
+            # Dead code elimination may have removed every yield.
+            self.emit("yield from ()")
+
+        self.depth -= 1
+        if self.tail_calls:
+            self.emit(f"{python_name} = _trampoline({python_name})")
+        self.function, self.temps, self.pending = enclosing, temps, pending
+        self.loops, self.tail_calls = loops, tail_calls
+        if declaration.generator:
+            name = getattr(declaration, "name", None)
+            name = "Anonymous" if name is None else name.symbol
+            self.emit(f"{python_name} = _generator({python_name}, {name!r})")
+
+    # Statements
+
+    def visit_block_stmt(self, statement: stmt.Block) -> Any:
+        for inner in statement.statements:
+            self.transpile_node(inner)
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        binding = self.analyzer.declarations[id(statement)]
+        name = statement.name
+
+        superclass = "None"
+        if statement.superclass:
+            variable = statement.superclass
+            value = self.expression(variable)
+            check = f"_superclass({value}, {self.constant(variable.name)})"
+            super_binding = self.analyzer.declarations[id(variable.name)]
+            self.define(super_binding, variable.name, lambda: check)
+            superclass = self.load(super_binding, variable.name)
+
+        if binding is not None and binding.captured:
+            self.emit(f"{binding.python_name} = _Cell()")
+
+        methods = []
+        for method in statement.methods:
+            kind = FunctionType.METHOD
+            if method.name.symbol == "init":
+                kind = FunctionType.INITIALIZER
+            python_name = self.unique(f"{name.symbol}_{method.name.symbol}")
+            self.function_def(method, python_name, kind)
+            methods.append(
+                f"{method.name.symbol!r}: _Function({python_name}, "
+                f"{method.name.symbol!r}, {len(method.params)})"
+            )
+
+        klass = f"_Class({name.symbol!r}, {{{', '.join(methods)}}}, {superclass})"
+        if binding is not None and binding.captured:
+            self.emit(f"{binding.python_name}.value = {klass}")
+        else:
+            self.define(binding, name, lambda: klass)
+
+    def visit_expression_stmt(self, statement: stmt.Expression) -> Any:
+        expression = statement.expression
+        if isinstance(expression, expr.Assign):
+            value = self.expression(expression.value)
+            binding = self.analyzer.references[id(expression)]
+            self.assign(binding, expression.name, value)
+        elif isinstance(expression, expr.Increment):
+            # The old value is discarded, so `i++;` runs as `++i;`.
+            self.emit(self.increment(expression, False))
+        else:
+            self.emit(self.expression(expression))
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        binding = self.analyzer.declarations[id(statement)]
+        python_name = self.unique(statement.name.symbol)
+        if binding is not None and binding.captured:
+            self.emit(f"{binding.python_name} = _Cell()")
+            self.function_def(statement, python_name, FunctionType.FUNCTION)
+            self.emit(
+                f"{binding.python_name}.value = _Function({python_name}, "
+                f"{statement.name.symbol!r}, {len(statement.params)})"
+            )
+            return
+
+        self.function_def(statement, python_name, FunctionType.FUNCTION)
+        function = (
+            f"_Function({python_name}, {statement.name.symbol!r}, "
+            f"{len(statement.params)})"
+        )
+        self.define(binding, statement.name, lambda: function)
+
+    def visit_if_stmt(self, statement: stmt.If) -> Any:
+        self.emit(f"if {self.condition(statement.condition)}:")
+        self.indented([statement.then])
+        if statement.els is not None:
+            self.emit("else:")
+            self.indented([statement.els])
+
+    def visit_match_stmt(self, statement: stmt.Match) -> Any:
+        value = self.expression(statement.value)
+        subject = self.temp()
+        if statement.table is None:
+            self.emit(f"{subject} = {value}")
+            keyword = "if"
+            for pattern, arm in zip(statement.patterns, statement.arms):
+                self.emit(f"{keyword} {subject} == {self.expression(pattern)}:")
+                self.indented([arm])
+                keyword = "elif"
+            if statement.els is not None:
+                self.emit("else:")
+                self.indented([statement.els])
+            return
+
+        # Python has no computed jump, the index of the arm is looked up
+        # and then narrowed down by halves.
+        table = f"_k{next(constant_ids)}"
+        self.constants[table] = statement.table
+        self.emit(f"{subject} = {table}.get({value})")
+        self.emit(f"if {subject} is None:")
+        self.indented([] if statement.els is None else [statement.els])
+        if statement.arms:
+            self.emit("else:")
+            self.depth += 1
+            self.arm_tree(subject, statement.arms, 0, len(statement.arms))
+            self.depth -= 1
+
+    def arm_tree(self, index: str, arms: list[stmt.Stmt], low: int, high: int):
+        if high - low == 1:
+            self.suite([arms[low]])
+            return
+        middle = (low + high) // 2
+        self.emit(f"if {index} < {middle}:")
+        self.depth += 1
+        self.arm_tree(index, arms, low, middle)
+        self.depth -= 1
+        self.emit("else:")
+        self.depth += 1
+        self.arm_tree(index, arms, middle, high)
+        self.depth -= 1
+
+    def visit_echo_stmt(self, statement: stmt.Echo) -> Any:
+        self.emit(f"print(_stringify({self.expression(statement.expression)}))")
+
+    def visit_return_stmt(self, statement: stmt.Return) -> Any:
+        if statement.tail:
+            # The caller's trampoline makes the call once this frame is gone.
+            self.tail_calls = True
+            function, fast, listed = self.call_parts(statement.value)
+            self.emit(
+                f"return (_TailCall({function}, [{listed}]) if {fast} "
+                f"and {function}.n == {len(statement.value.arguments)} "
+                f"else _call({function}, [{listed}], "
+                f"{self.constant(statement.value.paren)}))"
+            )
+            return
+
+        value = "None"
+        if statement.value is not None:
+            value = self.expression(statement.value)
+
+        if self.function.kind == FunctionType.INITIALIZER:
+            if statement.value is not None:
+                self.emit(value)
+            binding = self.analyzer.references[id(statement)]
+            self.emit(f"return {self.load(binding, statement.keyword)}")
+        else:
+            self.emit(f"return {value}")
+
+    def visit_break_stmt(self, statement: stmt.Break) -> Any:
+        self.emit("break")
+
+    def visit_yield_stmt(self, statement: stmt.Yield) -> Any:
+        if statement.value is None:
+            self.emit("yield None")
+        else:
+            self.emit(f"yield {self.expression(statement.value)}")
+
+    def visit_continue_stmt(self, statement: stmt.Continue) -> Any:
+        # A Python continue would skip the increment of a for.
+        self.loop_increment(self.loops[-1])
+        self.emit("continue")
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        binding = self.analyzer.declarations[id(statement)]
+        initializer = statement.initializer
+        if initializer is None:
+            self.define(binding, statement.name, lambda: "None")
+        elif (
+            binding is not None and binding.captured and contains_function(initializer)
+        ):
+            self.define(binding, statement.name, lambda: self.expression(initializer))
+        else:
+            value = self.expression(initializer)
+            if binding is not None and binding.captured:
+                value = f"_Cell({value})"
+                self.emit(f"{binding.python_name} = {value}")
+            else:
+                self.define(binding, statement.name, lambda: value)
+
+    def visit_while_stmt(self, statement: stmt.While) -> Any:
+        self.emit(f"while {self.condition(statement.condition)}:")
+        self.loops.append(statement)
+        self.depth += 1
+        self.suite([statement.body])
+        self.loop_increment(statement)
+        self.depth -= 1
+        self.loops.pop()
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        binding = self.analyzer.declarations[id(statement)]
+        iterable = self.expression(statement.iterable)
+        keyword = self.constant(statement.keyword)
+        iterator = f"_iterate({iterable}, {keyword})"
+        self.loops.append(statement)
+        self.emit("try:")
+        self.depth += 1
+        if binding.captured:
+            # Every item gets its own Cell, closures keep the one they saw.
+            item = self.temp()
+            self.emit(f"for {item} in {iterator}:")
+            self.depth += 1
+            self.emit(f"{binding.python_name} = _Cell({item})")
+        else:
+            self.emit(f"for {binding.python_name} in {iterator}:")
+            self.depth += 1
+        self.suite([statement.body])
+        self.depth -= 2
+        error = self.temp()
+        self.emit(f"except ValueError as {error}:")
+        self.emit(f"    _reentered({error}, {keyword})")
+        self.loops.pop()
+
+    def loop_increment(self, statement: stmt.While | stmt.ForIn):
+        if isinstance(statement, stmt.While) and statement.increment is not None:
+            self.transpile_node(stmt.Expression(statement.increment))
+
+    # Expressions
+
+    def expression(self, node: expr.Expr) -> str:
+        return node.accept(self)
+
+    def condition(self, node: expr.Expr) -> str:
+        code = self.expression(node)
+        if self.is_boolean(node):
+            return code
+        value = self.temp()
+        return f"(({value} := {code}) is not None and {value} is not False)"
+
+    def is_boolean(self, node: expr.Expr) -> bool:
+        if node.inferred == BOOL:
+            return True
+        if isinstance(node, expr.Literal):
+            return isinstance(node.value, bool)
+        if isinstance(node, expr.Grouping):
+            return self.is_boolean(node.expression)
+        if isinstance(node, expr.Binary):
+            return node.operator._type in COMPARISONS
+        if isinstance(node, expr.Unary):
+            return node.operator._type == TokenType.BANG
+        if isinstance(node, expr.Logical):
+            return self.is_boolean(node.left) and self.is_boolean(node.right)
+        return False
+
+    def numeric(
+        self, left: expr.Expr | str, operator: str, right: expr.Expr, token: Token
+    ):
+        fallback = f"_operands_error({self.constant(token)})"
+        return self.checked(left, operator, right, fallback)
+
+    def checked(self, left, operator: str, right, fallback: str) -> str:
+        """Inline "left operator right" for two floats, otherwise evaluate to
+        fallback. Operands are nodes, or already generated code. Float
+        literals and operands inferred to be floats need no check."""
+        checks = []
+        operands = []
+        proven_left = None
+        for operand in (left, right):
+            if isinstance(operand, expr.Literal) and type(operand.value) is float:
+                operands.append(repr(operand.value))
+                continue
+            code = operand if isinstance(operand, str) else self.expression(operand)
+            if not isinstance(operand, str) and operand.inferred == FLOAT:
+                operands.append(f"({code})")
+                if operand is left:
+                    proven_left = code
+                continue
+            value = self.temp()
+            operands.append(value)
+            checks.append(f"(type({value} := {code}) is float)")
+
+        a, b = operands
+        if not checks:
+            return f"({a} {operator} {b})"
+        if proven_left is not None:
+            # The check of the right operand runs before the body of the
+            # conditional, so bind the left one ahead of it to keep the
+            # operands in source order.
+            a = self.temp()
+            checks.insert(0, f"(({a} := {proven_left}) is {a})")
+        fallback = fallback.format(a=a, b=b)
+        return f"({a} {operator} {b} if {' & '.join(checks)} else {fallback})"
+
+    def increment(self, expression: expr.Increment, postfix: bool) -> str:
+        operator = expression.operator
+        target = expression.target
+        token = self.constant(operator)
+        old = self.temp()
+        sign = "-" if operator._type == TokenType.MINUS_MINUS else "+"
+        if isinstance(target, expr.Get):
+            obj = self.temp()
+            read = self.field(obj, target.name)
+            new = f"({old} {sign} 1.0 if type({old} := {read}) is float else _operand_error({token}))"
+            write = f"_set(({obj} := {self.expression(target.obj)}), {target.name.symbol!r}, {new})"
+            if postfix:
+                return f"({write}, {old})[1]"
+            return write
+
+        binding = self.analyzer.references[id(target)]
+        if target.inferred == FLOAT:
+            if postfix:
+                write = self.store(binding, target.name, f"{old} {sign} 1.0", True)
+                return f"({old} := {self.load(binding, target.name)}, {write})[0]"
+            new = f"{self.load(binding, target.name)} {sign} 1.0"
+            return self.store(binding, target.name, new, True)
+        read = f"type({old} := {self.load(binding, target.name)}) is float"
+        if postfix:
+            write = self.store(binding, target.name, f"{old} {sign} 1.0", True)
+            return f"(({old}, {write})[0] if {read} else _operand_error({token}))"
+        new = f"({old} {sign} 1.0 if {read} else _operand_error({token}))"
+        return self.store(binding, target.name, new, True)
+
+    def visit_literal_expr(self, expression: expr.Literal) -> Any:
+        return repr(expression.value)
+
+    def visit_self_expr(self, expression: expr.Self) -> Any:
+        binding = self.analyzer.references[id(expression)]
+        return self.load(binding, expression.keyword)
+
+    def visit_variable_expr(self, expression: expr.Variable) -> Any:
+        binding = self.analyzer.references[id(expression)]
+        return self.load(binding, expression.name)
+
+    def visit_grouping_expr(self, expression: expr.Grouping) -> Any:
+        return f"({self.expression(expression.expression)})"
+
+    def visit_increment_expr(self, expression: expr.Increment) -> Any:
+        return self.increment(expression, not expression.prefix)
+
+    def visit_unary_expr(self, expression: expr.Unary) -> Any:
+        right = self.expression(expression.right)
+        value = self.temp()
+        if expression.operator._type == TokenType.BANG:
+            return f"(({value} := {right}) is None or {value} is False)"
+        if expression.right.inferred == FLOAT:
+            return f"(-{right})"
+        token = self.constant(expression.operator)
+        return f"(-{value} if type({value} := {right}) is float else _operand_error({token}))"
+
+    def visit_binary_expr(self, expression: expr.Binary) -> Any:
+        operator = expression.operator
+        kind = operator._type
+
+        if kind in ARITHMETIC:
+            return self.numeric(
+                expression.left, ARITHMETIC[kind], expression.right, operator
+            )
+        if kind == TokenType.PLUS:
+            fallback = f"_add({{a}}, {{b}}, {self.constant(operator)})"
+            return self.checked(expression.left, "+", expression.right, fallback)
+
+        left = self.expression(expression.left)
+        right = self.expression(expression.right)
+        if kind == TokenType.SLASH:
+            return f"_divide({left}, {right}, {self.constant(operator)})"
+        if kind == TokenType.EQUAL_EQUAL:
+            return f"({left} == {right})"
+        return f"(not {left} == {right})"
+
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign) -> Any:
+        operator = expression.operator
+        target = expression.target
+        symbol = COMPOUND[operator._type]
+        if isinstance(target, expr.Get):
+            # The object is evaluated into a temporary first, as an argument
+            # of _set, then read and written through it.
+            obj = self.temp()
+            current = self.field(obj, target.name)
+        else:
+            binding = self.analyzer.references[id(target)]
+            current = target
+
+        if symbol == "/":
+            left = current if isinstance(current, str) else self.expression(current)
+            right = self.expression(expression.value)
+            value = f"_divide({left}, {right}, {self.constant(operator)})"
+        else:
+            value = self.numeric(current, symbol, expression.value, operator)
+
+        if isinstance(target, expr.Get):
+            obj_code = self.expression(target.obj)
+            return f"_set(({obj} := {obj_code}), {target.name.symbol!r}, {value})"
+        return self.store(binding, target.name, value, True)
+
+    def visit_logical_expr(self, expression: expr.Logical) -> Any:
+        left = self.expression(expression.left)
+        right = self.expression(expression.right)
+        value = self.temp()
+        truthy = f"({value} := {left}) is not None and {value} is not False"
+        if expression.operator._type == TokenType.OR:
+            return f"({value} if {truthy} else {right})"
+        return f"({right} if {truthy} else {value})"
+
+    def visit_ternary_expr(self, expression: expr.Ternary) -> Any:
+        condition = self.condition(expression.condition)
+        when_true = self.expression(expression.expression_true)
+        when_false = self.expression(expression.expression_false)
+        return f"({when_true} if {condition} else {when_false})"
+
+    def visit_assign_expr(self, expression: expr.Assign) -> Any:
+        value = self.expression(expression.value)
+        binding = self.analyzer.references[id(expression)]
+        return self.store(binding, expression.name, value)
+
+    def visit_call_expr(self, expression: expr.Call) -> Any:
+        function, fast, listed = self.call_parts(expression)
+        return (
+            f"({function}.function({listed}) if {fast} "
+            f"and {function}.n == {len(expression.arguments)} "
+            f"else _call({function}, [{listed}], {self.constant(expression.paren)}))"
+        )
+
+    def call_parts(self, expression: expr.Call) -> tuple[str, str, str]:
+        """The temporary holding the callee, the test of whether it is a
+        transpiled function, which evaluates the arguments, and the
+        arguments."""
+        callee = self.expression(expression.callee)
+        function = self.temp()
+        fast = f"type({function} := {callee}) is _Function"
+
+        # Both branches need the arguments; anything beyond a literal or a
+        # name is evaluated once into a temporary first.
+        arguments = []
+        for argument in expression.arguments:
+            code = self.expression(argument)
+            if not isinstance(argument, (expr.Literal, expr.Variable, expr.Self)):
+                value = self.temp()
+                fast = f"({fast}, ({value} := {code}))[0]"
+                code = value
+            arguments.append(code)
+
+        self.pending.append(expression.paren)
+        return function, fast, ", ".join(arguments)
+
+    def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
+        python_name = self.unique("anonymous")
+        self.function_def(expression, python_name, FunctionType.ANON)
+        return f"_Function({python_name}, None, {len(expression.params)})"
+
+    def visit_get_expr(self, expression: expr.Get) -> Any:
+        obj = self.expression(expression.obj)
+        name = expression.name.symbol
+        value = self.temp()
+        return (
+            f"({value}.fields[{name!r}] if type({value} := {obj}) is _Instance "
+            f"and {name!r} in {value}.fields else _get({value}, {self.constant(expression.name)}))"
+        )
+
+    def field(self, obj: str, name: Token) -> str:
+        """Reads field name of the object already in temporary obj."""
+        return (
+            f"({obj}.fields[{name.symbol!r}] if type({obj}) is _Instance "
+            f"and {name.symbol!r} in {obj}.fields else _get({obj}, {self.constant(name)}))"
+        )
+
+    def visit_set_expr(self, expression: expr.Set) -> Any:
+        token = self.constant(expression.name)
+        obj = f"_instance({self.expression(expression.obj)}, {token})"
+        value = self.expression(expression.value)
+        return f"_set({obj}, {expression.name.symbol!r}, {value})"
+
+    def visit_super_expr(self, expression: expr.Super) -> Any:
+        superclass, receiver = self.analyzer.references[id(expression)]
+        klass = self.load(superclass, expression.keyword)
+        obj = self.load(receiver, expression.keyword)
+        return f"_super({klass}, {obj}, {self.constant(expression.method)})"
@@ -0,0 +1,66 @@
+from values import expr
+
+from interpreter import Interpreter
+
+from errors.exceptions import PloxRuntimeError
+from errors.error import runtime_error
+
+from transpiler.codegen import Transpiler
+from transpiler.runtime import Runtime
+
+FILENAME = "<plox>"
+
+
+class PythonInterpreter(Interpreter):
+    """Runs a program by transpiling it to Python source and handing that to
+    compile()/exec(). With emit set, the source is printed instead.
+
+    The module namespace outlives a single program, so the REPL keeps its
+    globals between lines.
+    """
+
+    def __init__(self, emit: bool = False):
+        super().__init__()
+        self.emit = emit
+        self.namespace: dict = {}
+        self.namespace.update(Runtime(self, self.namespace).helpers())
+        for name, cell in self.globals.cells.items():
+            self.namespace[f"{name}_"] = cell.value
+
+    def resolve(self, expression: expr.Expr, depth: int, slot: int):
+        pass
+
+    def interpret(self, statements):
+        transpiler = Transpiler(self.namespace)
+        source = transpiler.transpile(statements)
+        if self.emit:
+            print(source, end="")
+            return
+
+        self.namespace.update(transpiler.constants)
+        try:
+            exec(compile(source, FILENAME, "exec"), self.namespace)
+            self.namespace["_main"]()
+        except PloxRuntimeError as error:
+            runtime_error(error)
+        except NameError as error:
+            token = transpiler.undefined(self.line_of(error), error.name)
+            if token is None:
+                raise
+            runtime_error(
+                PloxRuntimeError(token, f"Undefined variable '{token.symbol}'.")
+            )
+        except RecursionError as error:
+            token = transpiler.call_site(self.line_of(error))
+            if token is None:
+                raise
+            runtime_error(PloxRuntimeError(token, "Stack overflow."))
+
+    def line_of(self, error: Exception) -> int:
+        line = 0
+        traceback = error.__traceback__
+        while traceback is not None:
+            if traceback.tb_frame.f_code.co_filename == FILENAME:
+                line = traceback.tb_lineno
+            traceback = traceback.tb_next
+        return line
@@ -0,0 +1,176 @@
+from functools import partial
+from typing import Any, Callable
+
+from objects.callable import PloxCallable
+from objects.generator import PloxGenerator
+from objects.klass import PloxClass, PloxInstance
+from objects.returns import TailCall
+from values.tokens import Token
+
+from errors.exceptions import PloxRuntimeError
+
+
+class Cell:
+    __slots__ = ("value",)
+
+    def __init__(self, value=None) -> None:
+        self.value = value
+
+
+class TranspiledFunction(PloxCallable):
+    def __init__(
+        self, function: Callable, name: str | None, n: int, tail: Callable = None
+    ) -> None:
+        self.function = function
+        # Runs the body without the trampoline, a tail call in it gives back
+        # its TailCall.
+        self.tail = getattr(function, "tail", function) if tail is None else tail
+        self.name = name
+        self.n = n
+
+    def arity(self) -> Any:
+        return self.n
+
+    def call(self, interpreter, arguments: list):
+        return self.function(*arguments)
+
+    def bind(self, instance: PloxInstance):
+        return TranspiledFunction(
+            partial(self.function, instance),
+            self.name,
+            self.n,
+            partial(self.tail, instance),
+        )
+
+    def __str__(self) -> str:
+        if self.name is None:
+            return "<fn Anonymous>"
+        return f"<fn {self.name}>"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+class Runtime:
+    """Slow paths of the generated code.
+
+    The transpiler inlines the common case of every operation and falls back
+    to these helpers for everything else, including error reporting, so the
+    messages stay identical to the tree-walker's.
+    """
+
+    def __init__(self, interpreter, namespace: dict) -> None:
+        self.interpreter = interpreter
+        self.namespace = namespace
+
+    def helpers(self) -> dict[str, Any]:
+        return {
+            "_Cell": Cell,
+            "_Function": TranspiledFunction,
+            "_TailCall": TailCall,
+            "_trampoline": self.trampoline,
+            "_Class": PloxClass,
+            "_Instance": PloxInstance,
+            "_stringify": self.interpreter.stringify,
+            "_call": self.call,
+            "_add": self.add,
+            "_divide": self.divide,
+            "_operand_error": self.operand_error,
+            "_operands_error": self.operands_error,
+            "_get": self.get,
+            "_set": self.set,
+            "_instance": self.instance,
+            "_super": self.super,
+            "_superclass": self.superclass,
+            "_defined": self.defined,
+            "_store": self.store,
+            "_iterate": self.interpreter.iterate,
+            "_reentered": self.interpreter.reentered,
+            "_generator": self.generator,
+        }
+
+    def call(self, callee, arguments: list, paren: Token):
+        if not isinstance(callee, PloxCallable):
+            raise PloxRuntimeError(paren, "Can only call functions and classes.")
+
+        if len(arguments) != callee.arity():
+            raise PloxRuntimeError(
+                paren,
+                f"Expected {callee.arity()} arguments but got {len(arguments)}.",
+            )
+
+        return callee.call(self.interpreter, arguments)
+
+    def add(self, left, right, operator: Token):
+        if isinstance(left, float) and isinstance(right, float):
+            return left + right
+        if isinstance(left, str) or isinstance(right, str):
+            return str(left) + str(right)
+        raise PloxRuntimeError(operator, "Operands must be two numbers or two strings.")
+
+    def divide(self, left, right, operator: Token):
+        if not isinstance(left, float) or not isinstance(right, float):
+            raise PloxRuntimeError(operator, "Operands must be numbers")
+        if left == 0 or right == 0:
+            raise PloxRuntimeError(operator, "Trying to devide by Zero.")
+        return left / right
+
+    def operand_error(self, operator: Token):
+        raise PloxRuntimeError(operator, "Operand must be a number")
+
+    def operands_error(self, operator: Token):
+        raise PloxRuntimeError(operator, "Operands must be numbers")
+
+    def get(self, obj, name: Token):
+        if isinstance(obj, PloxInstance):
+            return obj.get(name)
+        raise PloxRuntimeError(name, "Only instances have properties.")
+
+    def set(self, obj: PloxInstance, name: str, value):
+        obj.fields[name] = value
+        return value
+
+    def instance(self, obj, name: Token):
+        if not isinstance(obj, PloxInstance):
+            raise PloxRuntimeError(name, "Only instances have fields.")
+        return obj
+
+    def super(self, superclass: PloxClass, obj: PloxInstance, method: Token):
+        function = superclass.find_method(method.symbol)
+        if function is None:
+            raise PloxRuntimeError(method, f"undefined property '{method.symbol}'.")
+        return function.bind(obj)
+
+    def superclass(self, value, name: Token):
+        if not isinstance(value, PloxClass):
+            raise PloxRuntimeError(name, "superclass must be a class.")
+        return value
+
+    def defined(self, global_name: str, value, name: Token):
+        if global_name not in self.namespace:
+            raise PloxRuntimeError(name, f"Undefined variable '{name.symbol}'.")
+        return value
+
+    def store(self, cell: Cell, value):
+        cell.value = value
+        return value
+
+    def trampoline(self, body: Callable) -> Callable:
+        """Wraps the body of a function that returns the value of a call, so
+        the call runs after the body's frame is gone and tail recursion
+        loops instead of nesting."""
+
+        def call(*arguments):
+            value = body(*arguments)
+            while type(value) is TailCall:
+                value = value.function.tail(*value.arguments)
+            return value
+
+        call.tail = body
+        return call
+
+    def generator(self, function: Callable, name: str) -> Callable:
+        def start(*arguments):
+            return PloxGenerator(name, function(*arguments))
+
+        return start
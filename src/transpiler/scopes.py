@@ -0,0 +1,243 @@
+from typing import Any
+
+from values import expr
+from values import stmt
+
+from resolver import FunctionType
+
+
+class Binding:
+    def __init__(self, name: str, python_name: str, owner) -> None:
+        self.name = name
+        self.python_name = python_name
+        self.owner = owner
+        self.captured = False
+
+
+class FunctionScope:
+    def __init__(self, enclosing, kind: FunctionType) -> None:
+        self.enclosing = enclosing
+        self.kind = kind
+        self.captures: list[Binding] = []
+        self.global_writes: set[str] = set()
+
+
+class ScopeAnalyzer(expr.Visitor, stmt.Visitor):
+    """Binds every variable reference to its declaration, the same way the
+    Resolver does, and records which locals are captured by closures.
+
+    Globals resolve to None. Declarations and references are keyed by node
+    identity, function scopes by their declaration node.
+    """
+
+    def __init__(self) -> None:
+        self.scopes: list[dict[str, Binding]] = []
+        self.function = FunctionScope(None, FunctionType.NONE)
+        self.main = self.function
+        self.references: dict[int, Any] = {}
+        self.declarations: dict[int, Binding | None] = {}
+        self.functions: dict[int, FunctionScope] = {}
+        self.counter = 0
+
+    def analyze(self, statements: list[stmt.Stmt]) -> FunctionScope:
+        for statement in statements:
+            self.analyze_node(statement)
+        return self.main
+
+    def analyze_node(self, node):
+        node.accept(self)
+
+    # Statements
+
+    def visit_block_stmt(self, statement: stmt.Block) -> Any:
+        self.scopes.append({})
+        for inner in statement.statements:
+            self.analyze_node(inner)
+        self.scopes.pop()
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        self.declarations[id(statement)] = self.declare(statement.name.symbol)
+
+        if statement.superclass:
+            self.analyze_node(statement.superclass)
+            self.scopes.append({})
+            self.declarations[id(statement.superclass.name)] = self.declare("super")
+
+        for method in statement.methods:
+            kind = FunctionType.METHOD
+            if method.name.symbol == "init":
+                kind = FunctionType.INITIALIZER
+            self.function_scope(method, kind)
+
+        if statement.superclass:
+            self.scopes.pop()
+
+    def visit_expression_stmt(self, statement: stmt.Expression) -> Any:
+        self.analyze_node(statement.expression)
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        self.declarations[id(statement)] = self.declare(statement.name.symbol)
+        self.function_scope(statement, FunctionType.FUNCTION)
+
+    def visit_if_stmt(self, statement: stmt.If) -> Any:
+        self.analyze_node(statement.condition)
+        self.analyze_node(statement.then)
+        if statement.els is not None:
+            self.analyze_node(statement.els)
+
+    def visit_match_stmt(self, statement: stmt.Match) -> Any:
+        self.analyze_node(statement.value)
+        for pattern, arm in zip(statement.patterns, statement.arms):
+            self.analyze_node(pattern)
+            self.analyze_node(arm)
+        if statement.els is not None:
+            self.analyze_node(statement.els)
+
+    def visit_echo_stmt(self, statement: stmt.Echo) -> Any:
+        self.analyze_node(statement.expression)
+
+    def visit_return_stmt(self, statement: stmt.Return) -> Any:
+        if statement.value is not None:
+            self.analyze_node(statement.value)
+        if self.function.kind == FunctionType.INITIALIZER:
+            self.references[id(statement)] = self.lookup("self")
+
+    def visit_yield_stmt(self, statement: stmt.Yield) -> Any:
+        if statement.value is not None:
+            self.analyze_node(statement.value)
+
+    def visit_break_stmt(self, statement: stmt.Break) -> Any:
+        pass
+
+    def visit_continue_stmt(self, statement: stmt.Continue) -> Any:
+        pass
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        self.declarations[id(statement)] = self.declare(statement.name.symbol)
+        if statement.initializer is not None:
+            self.analyze_node(statement.initializer)
+
+    def visit_while_stmt(self, statement: stmt.While) -> Any:
+        self.analyze_node(statement.condition)
+        self.analyze_node(statement.body)
+        if statement.increment is not None:
+            self.analyze_node(statement.increment)
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        self.analyze_node(statement.iterable)
+        self.scopes.append({})
+        self.declarations[id(statement)] = self.declare(statement.name.symbol)
+        self.analyze_node(statement.body)
+        self.scopes.pop()
+
+    # Expressions
+
+    def visit_literal_expr(self, expression: expr.Literal) -> Any:
+        pass
+
+    def visit_self_expr(self, expression: expr.Self) -> Any:
+        self.references[id(expression)] = self.lookup("self")
+
+    def visit_variable_expr(self, expression: expr.Variable) -> Any:
+        self.references[id(expression)] = self.lookup(expression.name.symbol)
+
+    def visit_grouping_expr(self, expression: expr.Grouping) -> Any:
+        self.analyze_node(expression.expression)
+
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign) -> Any:
+        self.analyze_node(expression.target)
+        self.analyze_node(expression.value)
+        self.write_target(expression.target)
+
+    def visit_increment_expr(self, expression: expr.Increment) -> Any:
+        self.analyze_node(expression.target)
+        self.write_target(expression.target)
+
+    def visit_unary_expr(self, expression: expr.Unary) -> Any:
+        self.analyze_node(expression.right)
+
+    def visit_binary_expr(self, expression: expr.Binary) -> Any:
+        self.analyze_node(expression.left)
+        self.analyze_node(expression.right)
+
+    def visit_logical_expr(self, expression: expr.Logical) -> Any:
+        self.analyze_node(expression.left)
+        self.analyze_node(expression.right)
+
+    def visit_ternary_expr(self, expression: expr.Ternary) -> Any:
+        self.analyze_node(expression.condition)
+        self.analyze_node(expression.expression_true)
+        self.analyze_node(expression.expression_false)
+
+    def visit_assign_expr(self, expression: expr.Assign) -> Any:
+        self.analyze_node(expression.value)
+        binding = self.lookup(expression.name.symbol)
+        self.references[id(expression)] = binding
+        if binding is None:
+            self.function.global_writes.add(expression.name.symbol)
+
+    def visit_call_expr(self, expression: expr.Call) -> Any:
+        self.analyze_node(expression.callee)
+        for argument in expression.arguments:
+            self.analyze_node(argument)
+
+    def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
+        self.function_scope(expression, FunctionType.ANON)
+
+    def visit_get_expr(self, expression: expr.Get) -> Any:
+        self.analyze_node(expression.obj)
+
+    def visit_set_expr(self, expression: expr.Set) -> Any:
+        self.analyze_node(expression.obj)
+        self.analyze_node(expression.value)
+
+    def visit_super_expr(self, expression: expr.Super) -> Any:
+        self.references[id(expression)] = (self.lookup("super"), self.lookup("self"))
+
+    # Scopes
+
+    def function_scope(self, declaration, kind: FunctionType):
+        enclosing = self.function
+        self.function = FunctionScope(enclosing, kind)
+        self.functions[id(declaration)] = self.function
+
+        self.scopes.append({})
+        if kind in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            self.declarations[id(declaration.name)] = self.declare("self")
+        for param in declaration.params:
+            self.declarations[id(param)] = self.declare(param.symbol)
+        for statement in declaration.body:
+            self.analyze_node(statement)
+        self.scopes.pop()
+
+        self.function = enclosing
+
+    def declare(self, name: str) -> Binding | None:
+        if len(self.scopes) == 0:
+            self.function.global_writes.add(name)
+            return None
+
+        self.counter += 1
+        binding = Binding(name, f"{name}_{self.counter}", self.function)
+        self.scopes[-1][name] = binding
+        return binding
+
+    def lookup(self, name: str) -> Binding | None:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                binding = scope[name]
+                self.capture(binding)
+                return binding
+        return None
+
+    def capture(self, binding: Binding):
+        function = self.function
+        while function is not binding.owner:
+            binding.captured = True
+            if binding not in function.captures:
+                function.captures.append(binding)
+            function = function.enclosing
+
+    def write_target(self, target: expr.Expr):
+        if isinstance(target, expr.Variable) and self.references[id(target)] is None:
+            self.function.global_writes.add(target.name.symbol)
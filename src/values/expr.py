@@ -4,14 +4,32 @@ from typing import Any
 
 from values.tokens import Token
 
+# The value of a constant Variable that was not read yet.
+UNSET = object()
+
 
 class Expr(ABC):
+    # Specialized evaluator the interpreter installs on operator nodes, see
+    # quickening.py. Not a dataclass field, so it is left out of str/hash.
+    quickened = None
+    # "float", "str" or "bool" when TypeInference proved the type.
+    inferred = None
+    # How many scopes out the local a Variable, Assign, Self or Super
+    # refers to is declared, set when the Resolver resolves it. None for a
+    # global.
+    depth = None
+    # Its slot in the Env of that scope, and whether the slot holds a Cell.
+    slot = None
+    cell = False
+    # The Cell of the global it refers to otherwise.
+    global_cell = None
+
     @abstractmethod
     def accept(self, visitor) -> Any:
         pass
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -19,11 +37,14 @@ class Super(Expr):
     keyword: Token
     method: Token
 
+    # The capture of `self` next to the one of `super`.
+    self_slot = None
+
     def accept(self, visitor):
         return visitor.visit_super_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -36,7 +57,7 @@ class Set(Expr):
         return visitor.visit_set_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -48,7 +69,7 @@ class Get(Expr):
         return visitor.visit_get_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -61,7 +82,7 @@ class Call(Expr):
         return visitor.visit_call_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -73,7 +94,7 @@ class Assign(Expr):
         return visitor.visit_assign_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -88,7 +109,7 @@ class Ternary(Expr):
         return visitor.visit_ternary_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -101,7 +122,7 @@ class Logical(Expr):
         return visitor.visit_logical_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -114,7 +135,7 @@ class Binary(Expr):
         return visitor.visit_binary_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -126,31 +147,36 @@ class Unary(Expr):
         return visitor.visit_unary_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
-class Prefix(Expr):
+class CompoundAssign(Expr):
+    # A Variable, resolved like any other, or a Get for a field.
+    target: Expr
     operator: Token
-    right: Expr
+    value: Expr
 
     def accept(self, visitor):
-        return visitor.visit_prefix_expr(self)
+        return visitor.visit_compound_assign_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
-class Postfix(Expr):
-    left: Expr
+class Increment(Expr):
     operator: Token
+    # A Variable or a Get, as for CompoundAssign.
+    target: Expr
+    # ++a gives back the new value, a++ the old one.
+    prefix: bool
 
     def accept(self, visitor):
-        return visitor.visit_postfix_expr(self)
+        return visitor.visit_increment_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -161,18 +187,23 @@ class Grouping(Expr):
         return visitor.visit_grouping_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
 class Variable(Expr):
     name: Token
 
+    # Set by the Resolver on reads of a global const; the interpreter then
+    # caches the value on the node after the first read.
+    constant = False
+    value = UNSET
+
     def accept(self, visitor):
         return visitor.visit_variable_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -183,7 +214,7 @@ class Self(Expr):
         return visitor.visit_self_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -191,11 +222,19 @@ class Anonym(Expr):
     params: list[Token]
     body: list
 
+    # The size of the Env of its calls, its slots holding Cells and where
+    # the Cells it captures are, set by the Resolver.
+    slots = 0
+    cells = ()
+    captures = ()
+    # Whether its body yields, set by the Parser.
+    generator = False
+
     def accept(self, visitor):
         return visitor.visit_anonym_func_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 @dataclass
@@ -206,7 +245,7 @@ class Literal(Expr):
         return visitor.visit_literal_expr(self)
 
     def __hash__(self) -> int:
-        return hash((str(self)))
+        return id(self)
 
 
 class Visitor(ABC):
@@ -227,11 +266,11 @@ class Visitor(ABC):
         pass
 
     @abstractmethod
-    def visit_prefix_expr(self, expression: Prefix) -> Any:
+    def visit_compound_assign_expr(self, expression: CompoundAssign) -> Any:
         pass
 
     @abstractmethod
-    def visit_postfix_expr(self, expression: Postfix) -> Any:
+    def visit_increment_expr(self, expression: Increment) -> Any:
         pass
 
     @abstractmethod
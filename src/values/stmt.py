@@ -7,6 +7,10 @@ from values import expr
 
 
 class Stmt(ABC):
+    # Whether running it can suspend its generator at a `yield` nested in
+    # it, set by the Resolver.
+    yields = False
+
     @abstractmethod
     def accept(self, visitor):
         pass
@@ -16,6 +20,13 @@ class Stmt(ABC):
 class Block(Stmt):
     statements: list[Stmt]
 
+    # Whether it gets a scope, it runs in the enclosing one when it
+    # declares nothing. The size of its Env and the slots holding Cells. All
+    # set by the Resolver.
+    scoped = True
+    slots = 0
+    cells = ()
+
     def accept(self, visitor):
         return visitor.visit_block_stmt(self)
 
@@ -34,6 +45,21 @@ class Function(Stmt):
     params: list[Token]
     body: list[Stmt]
 
+    # A lazy.PendingBody while the body is not parsed yet. Not a dataclass
+    # field, so it is left out of str/eq.
+    pending = None
+    # The slot it is declared in, None for a global, whether that slot
+    # holds a Cell, the size of the Env of its calls and its slots holding
+    # Cells, and where the Cells it captures are, set by the Resolver.
+    slot = None
+    cell = False
+    slots = 0
+    cells = ()
+    captures = ()
+    # Whether its body yields, which makes a call give back a generator.
+    # Set by the Parser.
+    generator = False
+
     def accept(self, visitor):
         return visitor.visit_function_stmt(self)
 
@@ -44,10 +70,32 @@ class _Class(Stmt):
     methods: list[Function]
     superclass: expr.Variable | None = None
 
+    # The slot it is declared in, None for a global, and whether that slot
+    # holds a Cell.
+    slot = None
+    cell = False
+
     def accept(self, visitor):
         return visitor.visit_class_stmt(self)
 
 
+@dataclass
+class ForIn(Stmt):
+    name: Token
+    keyword: Token
+    iterable: expr.Expr
+    body: Stmt
+
+    # The loop variable lives alone in the Env of the loop, in slot 0.
+    # Whether it holds a Cell, a fresh one per iteration, set by the
+    # Resolver.
+    slot = None
+    cell = False
+
+    def accept(self, visitor):
+        return visitor.visit_for_in_stmt(self)
+
+
 @dataclass
 class If(Stmt):
     condition: expr.Expr
@@ -58,6 +106,24 @@ class If(Stmt):
         return visitor.visit_if_stmt(self)
 
 
+@dataclass
+class Match(Stmt):
+    keyword: Token
+    value: expr.Expr
+    # The pattern of each arm and the statement it runs, in order.
+    patterns: list[expr.Expr]
+    arms: list[Stmt]
+    els: Stmt | None
+
+    # The index of the arm for each pattern value when every pattern is a
+    # literal, the first arm for a value that appears twice. None when the
+    # patterns have to be tested in order. Set by the Resolver.
+    table = None
+
+    def accept(self, visitor):
+        return visitor.visit_match_stmt(self)
+
+
 @dataclass
 class Echo(Stmt):
     expression: expr.Expr
@@ -71,14 +137,49 @@ class Return(Stmt):
     keyword: Token
     value: expr.Expr | None
 
+    # Whether its value is a call it can hand to the call of its function
+    # instead of making itself, set by the Resolver.
+    tail = False
+
     def accept(self, visitor):
         return visitor.visit_return_stmt(self)
 
 
+@dataclass
+class Yield(Stmt):
+    keyword: Token
+    value: expr.Expr | None
+
+    def accept(self, visitor):
+        return visitor.visit_yield_stmt(self)
+
+
+@dataclass
+class Break(Stmt):
+    keyword: Token
+
+    def accept(self, visitor):
+        return visitor.visit_break_stmt(self)
+
+
+@dataclass
+class Continue(Stmt):
+    keyword: Token
+
+    def accept(self, visitor):
+        return visitor.visit_continue_stmt(self)
+
+
 @dataclass
 class Var(Stmt):
     name: Token
     initializer: expr.Expr | None
+    constant: bool = False
+
+    # The slot it is declared in, None for a global, and whether that slot
+    # holds a Cell.
+    slot = None
+    cell = False
 
     def accept(self, visitor):
         return visitor.visit_var_stmt(self)
@@ -88,6 +189,8 @@ class Var(Stmt):
 class While(Stmt):
     condition: expr.Expr
     body: Stmt
+    # Run after the body and after a `continue`, the third clause of a for.
+    increment: expr.Expr | None = None
 
     def accept(self, visitor):
         return visitor.visit_while_stmt(self)
@@ -114,6 +217,10 @@ class Visitor(ABC):
     def visit_if_stmt(self, statement: If) -> Any:
         pass
 
+    @abstractmethod
+    def visit_match_stmt(self, statement: Match) -> Any:
+        pass
+
     @abstractmethod
     def visit_echo_stmt(self, statement: Echo) -> Any:
         pass
@@ -122,6 +229,18 @@ class Visitor(ABC):
     def visit_return_stmt(self, statement: Return) -> Any:
         pass
 
+    @abstractmethod
+    def visit_yield_stmt(self, statement: Yield) -> Any:
+        pass
+
+    @abstractmethod
+    def visit_break_stmt(self, statement: Break) -> Any:
+        pass
+
+    @abstractmethod
+    def visit_continue_stmt(self, statement: Continue) -> Any:
+        pass
+
     @abstractmethod
     def visit_var_stmt(self, statement: Var) -> Any:
         pass
@@ -129,3 +248,7 @@ class Visitor(ABC):
     @abstractmethod
     def visit_while_stmt(self, statement: While) -> Any:
         pass
+
+    @abstractmethod
+    def visit_for_in_stmt(self, statement: ForIn) -> Any:
+        pass
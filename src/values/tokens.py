@@ -48,12 +48,16 @@ class TokenType(Enum):
 
     # Keywords.
     AND = auto()
+    BREAK = auto()
     CLASS = auto()
+    CONTINUE = auto()
     ELSE = auto()
     FALSE = auto()
     FN = auto()
     FOR = auto()
     IF = auto()
+    IN = auto()
+    MATCH = auto()
     NONE = auto()
     OR = auto()
     ECHO = auto()
@@ -62,7 +66,9 @@ class TokenType(Enum):
     SELF = auto()
     TRUE = auto()
     LET = auto()
+    CONST = auto()
     WHILE = auto()
+    YIELD = auto()
 
     EOF = auto()
 
@@ -0,0 +1,64 @@
+from typing import Any
+
+from values.tokens import Token
+
+from vm.opcodes import OpCode
+
+
+class Chunk:
+    def __init__(self) -> None:
+        self.code: list[int] = []
+        self.tokens: list[Token | None] = []
+        self.constants: list[Any] = []
+        self.constant_index: dict[tuple, int] = {}
+
+    def write(self, op: OpCode, operand: int = 0, token: Token | None = None) -> int:
+        offset = len(self.code)
+        self.code.append(op)
+        self.code.append(operand)
+        self.tokens.append(token)
+        self.tokens.append(token)
+        return offset
+
+    def add_constant(self, value) -> int:
+        # Literals are shared through the pool. The type is part of the key
+        # because 1.0 == True in Python, everything else is kept by identity.
+        if value is None or isinstance(value, (bool, float, str)):
+            key = (type(value), value)
+        else:
+            key = (type(value), id(value))
+
+        index = self.constant_index.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self.constant_index[key] = index
+        return index
+
+
+class Function:
+    def __init__(self, name: str | None, arity: int, kind) -> None:
+        self.name = name
+        self.arity = arity
+        self.kind = kind
+        self.chunk = Chunk()
+        self.slot_count = 1
+        self.padding: list[None] = []
+        self.cell_params: list[int] = []
+        self.captures: list[tuple[bool, int]] = []
+        # Whether its body yields, see GeneratorClosure.
+        self.generator = False
+
+    def __repr__(self) -> str:
+        if self.name is None:
+            return "<fn Anonymous>"
+        return f"<fn {self.name}>"
+
+
+class ClassInfo:
+    def __init__(self, name: Token, methods: list[str]) -> None:
+        self.name = name
+        self.methods = methods
+
+    def __repr__(self) -> str:
+        return f"<class {self.name.symbol}>"
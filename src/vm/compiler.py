@@ -0,0 +1,590 @@
+from dataclasses import fields
+from typing import Any
+
+from values.tokens import Token, TokenType
+from values import expr
+from values import stmt
+
+from resolver import FunctionType
+
+from vm.chunk import ClassInfo, Function
+from vm.opcodes import OpCode
+
+# Instructions rewritten once a local turns out to be captured by a closure.
+CELL_OPS = {
+    OpCode.GET_LOCAL: OpCode.GET_CELL,
+    OpCode.SET_LOCAL: OpCode.SET_CELL,
+    OpCode.DEFINE_LOCAL: OpCode.MAKE_CELL,
+    OpCode.NOP: OpCode.NEW_CELL,
+}
+
+BINARY_OPS = {
+    TokenType.PLUS: OpCode.ADD,
+    TokenType.MINUS: OpCode.SUBTRACT,
+    TokenType.STAR: OpCode.MULTIPLY,
+    TokenType.SLASH: OpCode.DIVIDE,
+    TokenType.MODULO: OpCode.MODULO,
+    TokenType.GREATER: OpCode.GREATER,
+    TokenType.GREATER_EQUAL: OpCode.GREATER_EQUAL,
+    TokenType.LESS: OpCode.LESS,
+    TokenType.LESS_EQUAL: OpCode.LESS_EQUAL,
+    TokenType.EQUAL_EQUAL: OpCode.EQUAL,
+    TokenType.BANG_EQUAL: OpCode.NOT_EQUAL,
+}
+
+ASSIGN_OPS = {
+    TokenType.PLUS_ASSIGN: OpCode.ADD_ASSIGN,
+    TokenType.MINUS_ASSIGN: OpCode.SUBTRACT_ASSIGN,
+    TokenType.STAR_ASSIGN: OpCode.MULTIPLY_ASSIGN,
+    TokenType.SLASH_ASSIGN: OpCode.DIVIDE_ASSIGN,
+}
+
+
+def contains_function(node) -> bool:
+    if isinstance(node, expr.Anonym):
+        return True
+    if isinstance(node, list):
+        return any(contains_function(item) for item in node)
+    if isinstance(node, (expr.Expr, stmt.Stmt)):
+        return any(contains_function(getattr(node, f.name)) for f in fields(node))
+    return False
+
+
+class Local:
+    def __init__(self, name: str, depth: int, slot: int) -> None:
+        self.name = name
+        self.depth = depth
+        self.slot = slot
+        self.captured = False
+        self.uses: list[int] = []
+
+
+class Loop:
+    """A loop being compiled: the jumps of its `break`s and `continue`s,
+    patched once the code they go to is emitted."""
+
+    def __init__(self) -> None:
+        self.breaks: list[int] = []
+        self.continues: list[int] = []
+
+
+class FunctionState:
+    def __init__(self, enclosing, function: Function, kind: FunctionType) -> None:
+        self.enclosing = enclosing
+        self.function = function
+        self.kind = kind
+        self.locals: list[Local] = []
+        self.scope_depth = 0
+        self.loops: list[Loop] = []
+
+
+class Compiler(expr.Visitor, stmt.Visitor):
+    """Lowers a resolved program to bytecode for the VM.
+
+    Locals live in numbered frame slots. A local that is captured by a closure
+    is boxed in a cell instead; since that is only known once its scope is
+    closed, every access is recorded and rewritten to the cell variant then.
+    """
+
+    def __init__(self) -> None:
+        self.state: FunctionState
+
+    def compile(self, statements: list[stmt.Stmt]) -> Function:
+        script = Function(None, 0, FunctionType.NONE)
+        self.state = FunctionState(None, script, FunctionType.NONE)
+        self.add_local("")
+
+        for statement in statements:
+            self.compile_node(statement)
+
+        self.emit_constant(None)
+        self.emit(OpCode.RETURN)
+        self.end_function()
+        return script
+
+    def compile_node(self, node):
+        node.accept(self)
+
+    # Statements
+
+    def visit_block_stmt(self, statement: stmt.Block) -> Any:
+        self.begin_scope()
+        for inner in statement.statements:
+            self.compile_node(inner)
+        self.end_scope()
+
+    def visit_class_stmt(self, statement: stmt._Class) -> Any:
+        if statement.superclass:
+            self.compile_node(statement.superclass)
+            self.emit(OpCode.CHECK_SUPERCLASS, token=statement.superclass.name)
+
+        self.declare_variable(statement.name, None, True)
+
+        if statement.superclass:
+            self.begin_scope()
+            local = self.add_local("super")
+            self.emit_local(OpCode.DEFINE_LOCAL, local)
+            self.emit_local(OpCode.GET_LOCAL, local)
+        else:
+            self.emit_constant(None)
+
+        for method in statement.methods:
+            kind = FunctionType.METHOD
+            if method.name.symbol == "init":
+                kind = FunctionType.INITIALIZER
+            self.function(method, kind)
+
+        info = ClassInfo(
+            statement.name, [method.name.symbol for method in statement.methods]
+        )
+        self.emit(OpCode.CLASS, self.make_constant(info))
+
+        if statement.superclass:
+            self.end_scope()
+
+        self.set_variable(statement.name)
+        self.emit(OpCode.POP)
+
+    def visit_expression_stmt(self, statement: stmt.Expression) -> Any:
+        expression = statement.expression
+        if isinstance(expression, expr.Increment) and not expression.prefix:
+            # The old value is discarded, so `i++;` can skip keeping a copy.
+            expression = expr.Increment(expression.operator, expression.target, True)
+        self.compile_node(expression)
+        self.emit(OpCode.POP)
+
+    def visit_function_stmt(self, statement: stmt.Function) -> Any:
+        self.declare_variable(
+            statement.name,
+            lambda: self.function(statement, FunctionType.FUNCTION),
+            True,
+        )
+
+    def visit_if_stmt(self, statement: stmt.If) -> Any:
+        self.compile_node(statement.condition)
+        else_jump = self.emit(OpCode.JUMP_IF_FALSE)
+        self.compile_node(statement.then)
+
+        if statement.els is None:
+            self.patch_jump(else_jump)
+            return
+
+        end_jump = self.emit(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        self.compile_node(statement.els)
+        self.patch_jump(end_jump)
+
+    def visit_match_stmt(self, statement: stmt.Match) -> Any:
+        self.compile_node(statement.value)
+        if statement.table is not None:
+            self.match_table(statement)
+            return
+
+        # The value stays on the stack while the patterns are tested and is
+        # popped before an arm runs, which may leave through a jump.
+        end_jumps = []
+        for pattern, arm in zip(statement.patterns, statement.arms):
+            self.emit(OpCode.DUP)
+            self.compile_node(pattern)
+            self.emit(OpCode.EQUAL)
+            next_jump = self.emit(OpCode.JUMP_IF_FALSE)
+            self.emit(OpCode.POP)
+            self.compile_node(arm)
+            end_jumps.append(self.emit(OpCode.JUMP))
+            self.patch_jump(next_jump)
+        self.emit(OpCode.POP)
+        if statement.els is not None:
+            self.compile_node(statement.els)
+        for jump in end_jumps:
+            self.patch_jump(jump)
+
+    def match_table(self, statement: stmt.Match):
+        offset = self.emit(OpCode.MATCH)
+        starts = []
+        end_jumps = []
+        for arm in statement.arms:
+            starts.append(len(self.chunk.code))
+            self.compile_node(arm)
+            end_jumps.append(self.emit(OpCode.JUMP))
+        default = len(self.chunk.code)
+        if statement.els is not None:
+            self.compile_node(statement.els)
+        for jump in end_jumps:
+            self.patch_jump(jump)
+
+        targets = {value: starts[index] for value, index in statement.table.items()}
+        self.chunk.code[offset + 1] = self.make_constant((targets, default))
+
+    def visit_echo_stmt(self, statement: stmt.Echo) -> Any:
+        self.compile_node(statement.expression)
+        self.emit(OpCode.ECHO)
+
+    def visit_return_stmt(self, statement: stmt.Return) -> Any:
+        if self.state.kind == FunctionType.INITIALIZER:
+            # Initializers always hand back the instance, but a returned
+            # expression is still evaluated for its side effects.
+            if statement.value is not None:
+                self.compile_node(statement.value)
+                self.emit(OpCode.POP)
+            self.get_variable(statement.keyword, "self")
+        elif statement.value is not None:
+            self.compile_node(statement.value)
+        else:
+            self.emit_constant(None)
+        self.emit(OpCode.RETURN)
+
+    def visit_yield_stmt(self, statement: stmt.Yield) -> Any:
+        if statement.value is not None:
+            self.compile_node(statement.value)
+        else:
+            self.emit_constant(None)
+        self.emit(OpCode.YIELD)
+
+    def visit_break_stmt(self, statement: stmt.Break) -> Any:
+        # Locals live in frame slots, leaving their scopes needs no pops.
+        self.state.loops[-1].breaks.append(self.emit(OpCode.JUMP))
+
+    def visit_continue_stmt(self, statement: stmt.Continue) -> Any:
+        self.state.loops[-1].continues.append(self.emit(OpCode.JUMP))
+
+    def visit_var_stmt(self, statement: stmt.Var) -> Any:
+        initializer = statement.initializer
+        if initializer is None:
+            self.declare_variable(statement.name, None, False)
+            return
+
+        self.declare_variable(
+            statement.name,
+            lambda: self.compile_node(initializer),
+            contains_function(initializer),
+        )
+
+    def visit_while_stmt(self, statement: stmt.While) -> Any:
+        loop_start = len(self.chunk.code)
+        self.compile_node(statement.condition)
+        exit_jump = self.emit(OpCode.JUMP_IF_FALSE)
+        loop = Loop()
+        self.state.loops.append(loop)
+        self.compile_node(statement.body)
+        self.state.loops.pop()
+        for jump in loop.continues:
+            self.patch_jump(jump)
+        if statement.increment is not None:
+            self.visit_expression_stmt(stmt.Expression(statement.increment))
+        self.emit(OpCode.JUMP, loop_start)
+        self.patch_jump(exit_jump)
+        for jump in loop.breaks:
+            self.patch_jump(jump)
+
+    def visit_for_in_stmt(self, statement: stmt.ForIn) -> Any:
+        # The iterator stays on the stack for the whole loop, the loop
+        # variable gets a fresh slot, or Cell, per item.
+        self.compile_node(statement.iterable)
+        self.emit(OpCode.GET_ITER, token=statement.keyword)
+        loop_start = len(self.chunk.code)
+        exit_jump = self.emit(OpCode.FOR_ITER, token=statement.keyword)
+        self.begin_scope()
+        self.emit_local(OpCode.DEFINE_LOCAL, self.add_local(statement.name.symbol))
+        loop = Loop()
+        self.state.loops.append(loop)
+        self.compile_node(statement.body)
+        self.state.loops.pop()
+        self.end_scope()
+        for jump in loop.continues:
+            self.chunk.code[jump + 1] = loop_start
+        self.emit(OpCode.JUMP, loop_start)
+        self.patch_jump(exit_jump)
+        for jump in loop.breaks:
+            self.patch_jump(jump)
+        self.emit(OpCode.POP)
+
+    # Expressions
+
+    def visit_literal_expr(self, expression: expr.Literal) -> Any:
+        self.emit_constant(expression.value)
+
+    def visit_self_expr(self, expression: expr.Self) -> Any:
+        self.get_variable(expression.keyword, "self")
+
+    def visit_variable_expr(self, expression: expr.Variable) -> Any:
+        self.get_variable(expression.name, expression.name.symbol)
+
+    def visit_grouping_expr(self, expression: expr.Grouping) -> Any:
+        self.compile_node(expression.expression)
+
+    def visit_increment_expr(self, expression: expr.Increment) -> Any:
+        operator = expression.operator
+        target = expression.target
+        increment = operator._type == TokenType.PLUS_PLUS
+
+        if isinstance(target, expr.Get):
+            self.compile_node(target.obj)
+            step = (target.name, 1.0 if increment else -1.0, expression.prefix)
+            self.emit(OpCode.STEP_PROPERTY, self.make_constant(step), operator)
+            return
+
+        self.compile_node(target)
+        if expression.prefix:
+            self.emit(
+                OpCode.INCREMENT if increment else OpCode.DECREMENT, token=operator
+            )
+            self.set_variable(target.name)
+            return
+
+        self.emit(OpCode.CHECK_NUMBER, token=operator)
+        self.emit(OpCode.DUP)
+        self.emit(OpCode.INCREMENT if increment else OpCode.DECREMENT, token=operator)
+        self.set_variable(target.name)
+        self.emit(OpCode.POP)
+
+    def visit_unary_expr(self, expression: expr.Unary) -> Any:
+        self.compile_node(expression.right)
+        if expression.operator._type == TokenType.BANG:
+            self.emit(OpCode.NOT)
+        else:
+            self.emit(OpCode.NEGATE, token=expression.operator)
+
+    def visit_binary_expr(self, expression: expr.Binary) -> Any:
+        operator = expression.operator
+        self.compile_node(expression.left)
+        self.compile_node(expression.right)
+        self.emit(BINARY_OPS[operator._type], token=operator)
+
+    def visit_compound_assign_expr(self, expression: expr.CompoundAssign) -> Any:
+        operator = expression.operator
+        target = expression.target
+
+        if isinstance(target, expr.Get):
+            name = self.make_constant(target.name)
+            # The object stays below the value for SET_PROPERTY.
+            self.compile_node(target.obj)
+            self.emit(OpCode.DUP)
+            self.emit(OpCode.GET_PROPERTY, name, target.name)
+            self.compile_node(expression.value)
+            self.emit(ASSIGN_OPS[operator._type], token=operator)
+            self.emit(OpCode.SET_PROPERTY, name, target.name)
+            return
+
+        self.compile_node(target)
+        self.compile_node(expression.value)
+        self.emit(ASSIGN_OPS[operator._type], token=operator)
+        self.set_variable(target.name)
+
+    def visit_logical_expr(self, expression: expr.Logical) -> Any:
+        self.compile_node(expression.left)
+        if expression.operator._type == TokenType.OR:
+            end_jump = self.emit(OpCode.JUMP_IF_TRUE_KEEP)
+        else:
+            end_jump = self.emit(OpCode.JUMP_IF_FALSE_KEEP)
+        self.emit(OpCode.POP)
+        self.compile_node(expression.right)
+        self.patch_jump(end_jump)
+
+    def visit_ternary_expr(self, expression: expr.Ternary) -> Any:
+        self.compile_node(expression.condition)
+        else_jump = self.emit(OpCode.JUMP_IF_FALSE)
+        self.compile_node(expression.expression_true)
+        end_jump = self.emit(OpCode.JUMP)
+        self.patch_jump(else_jump)
+        self.compile_node(expression.expression_false)
+        self.patch_jump(end_jump)
+
+    def visit_assign_expr(self, expression: expr.Assign) -> Any:
+        self.compile_node(expression.value)
+        self.set_variable(expression.name)
+
+    def visit_call_expr(self, expression: expr.Call) -> Any:
+        self.compile_node(expression.callee)
+        for arg in expression.arguments:
+            self.compile_node(arg)
+        self.emit(OpCode.CALL, len(expression.arguments), expression.paren)
+
+    def visit_anonym_func_expr(self, expression: expr.Anonym) -> Any:
+        self.function(expression, FunctionType.ANON)
+
+    def visit_get_expr(self, expression: expr.Get) -> Any:
+        self.compile_node(expression.obj)
+        self.emit(
+            OpCode.GET_PROPERTY, self.make_constant(expression.name), expression.name
+        )
+
+    def visit_set_expr(self, expression: expr.Set) -> Any:
+        self.compile_node(expression.obj)
+        self.emit(OpCode.CHECK_INSTANCE, token=expression.name)
+        self.compile_node(expression.value)
+        self.emit(
+            OpCode.SET_PROPERTY, self.make_constant(expression.name), expression.name
+        )
+
+    def visit_super_expr(self, expression: expr.Super) -> Any:
+        self.get_variable(expression.keyword, "self")
+        self.get_variable(expression.keyword, "super")
+        self.emit(
+            OpCode.GET_SUPER, self.make_constant(expression.method), expression.method
+        )
+
+    # Functions
+
+    def function(self, declaration: stmt.Function | expr.Anonym, kind: FunctionType):
+        name = None
+        if isinstance(declaration, stmt.Function):
+            name = declaration.name.symbol
+
+        function = Function(name, len(declaration.params), kind)
+        function.generator = declaration.generator
+        self.state = FunctionState(self.state, function, kind)
+        self.state.scope_depth = 1
+
+        # Slot 0 holds the receiver for methods and is unused otherwise.
+        if kind in (FunctionType.METHOD, FunctionType.INITIALIZER):
+            self.add_local("self")
+        else:
+            self.add_local("")
+        for param in declaration.params:
+            self.add_local(param.symbol)
+
+        for statement in declaration.body:
+            self.compile_node(statement)
+
+        if kind == FunctionType.INITIALIZER:
+            self.get_variable(None, "self")
+        else:
+            self.emit_constant(None)
+        self.emit(OpCode.RETURN)
+
+        self.end_function()
+        self.state = self.state.enclosing
+        self.emit(OpCode.CLOSURE, self.make_constant(function))
+
+    def end_function(self):
+        function = self.state.function
+        for local in self.state.locals:
+            if local.captured and local.slot <= function.arity:
+                function.cell_params.append(local.slot)
+            self.close_local(local)
+        function.padding = [None] * (function.slot_count - function.arity - 1)
+
+    # Variables
+
+    def declare_variable(self, name: Token, initializer, self_capturable: bool):
+        """Emits a declaration. A local whose initializer may capture the
+        local itself gets its cell created before the initializer runs."""
+        if self.state.scope_depth == 0:
+            if initializer is None:
+                self.emit_constant(None)
+            else:
+                initializer()
+            self.emit(OpCode.DEFINE_GLOBAL, self.make_constant(name.symbol), name)
+            return
+
+        local = self.add_local(name.symbol)
+        if self_capturable:
+            self.emit_local(OpCode.NOP, local)
+        if initializer is None:
+            self.emit_constant(None)
+        else:
+            initializer()
+        if self_capturable:
+            self.emit_local(OpCode.SET_LOCAL, local)
+            self.emit(OpCode.POP)
+        else:
+            self.emit_local(OpCode.DEFINE_LOCAL, local)
+
+    def get_variable(self, token: Token | None, name: str):
+        local = self.resolve_local(self.state, name)
+        if local is not None:
+            self.emit_local(OpCode.GET_LOCAL, local)
+            return
+
+        upvalue = self.resolve_upvalue(self.state, name)
+        if upvalue is not None:
+            self.emit(OpCode.GET_UPVALUE, upvalue)
+            return
+
+        self.emit(OpCode.GET_GLOBAL, self.make_constant(name), token)
+
+    def set_variable(self, token: Token):
+        local = self.resolve_local(self.state, token.symbol)
+        if local is not None:
+            self.emit_local(OpCode.SET_LOCAL, local)
+            return
+
+        upvalue = self.resolve_upvalue(self.state, token.symbol)
+        if upvalue is not None:
+            self.emit(OpCode.SET_UPVALUE, upvalue)
+            return
+
+        self.emit(OpCode.SET_GLOBAL, self.make_constant(token.symbol), token)
+
+    def resolve_local(self, state: FunctionState, name: str) -> Local | None:
+        for local in reversed(state.locals):
+            if local.name == name:
+                return local
+        return None
+
+    def resolve_upvalue(self, state: FunctionState, name: str) -> int | None:
+        if state.enclosing is None:
+            return None
+
+        local = self.resolve_local(state.enclosing, name)
+        if local is not None:
+            local.captured = True
+            return self.add_upvalue(state, True, local.slot)
+
+        upvalue = self.resolve_upvalue(state.enclosing, name)
+        if upvalue is not None:
+            return self.add_upvalue(state, False, upvalue)
+
+        return None
+
+    def add_upvalue(self, state: FunctionState, is_local: bool, index: int) -> int:
+        captures = state.function.captures
+        if (is_local, index) in captures:
+            return captures.index((is_local, index))
+        captures.append((is_local, index))
+        return len(captures) - 1
+
+    def add_local(self, name: str) -> Local:
+        state = self.state
+        slot = len(state.locals)
+        local = Local(name, state.scope_depth, slot)
+        state.locals.append(local)
+        state.function.slot_count = max(state.function.slot_count, slot + 1)
+        return local
+
+    def close_local(self, local: Local):
+        if not local.captured:
+            return
+        code = self.chunk.code
+        for offset in local.uses:
+            code[offset] = CELL_OPS[code[offset]]
+
+    def begin_scope(self):
+        self.state.scope_depth += 1
+
+    def end_scope(self):
+        state = self.state
+        state.scope_depth -= 1
+        while state.locals and state.locals[-1].depth > state.scope_depth:
+            self.close_local(state.locals.pop())
+
+    # Emitting
+
+    @property
+    def chunk(self):
+        return self.state.function.chunk
+
+    def emit(self, op: OpCode, operand: int = 0, token: Token | None = None) -> int:
+        return self.chunk.write(op, operand, token)
+
+    def emit_local(self, op: OpCode, local: Local):
+        local.uses.append(self.emit(op, local.slot))
+
+    def emit_constant(self, value):
+        self.emit(OpCode.CONSTANT, self.make_constant(value))
+
+    def make_constant(self, value) -> int:
+        return self.chunk.add_constant(value)
+
+    def patch_jump(self, offset: int):
+        self.chunk.code[offset + 1] = len(self.chunk.code)
@@ -0,0 +1,469 @@
+from typing import Any
+
+from objects.callable import PloxCallable
+from objects.generator import PloxGenerator
+from objects.klass import PloxClass, PloxInstance
+
+from values import expr
+
+from environment import UNDEFINED
+from interpreter import Interpreter
+
+from vm.compiler import Compiler
+from vm.objects import BoundMethod, Cell, Closure, GeneratorClosure, GeneratorFrame
+from vm.opcodes import OpCode
+
+from errors.exceptions import PloxRuntimeError
+from errors.error import runtime_error
+
+# How deep calls can nest before it is reported as a stack overflow,
+# instead of growing `frames` until memory runs out.
+FRAMES_MAX = 250_000
+
+CONSTANT = OpCode.CONSTANT.value
+POP = OpCode.POP.value
+DUP = OpCode.DUP.value
+GET_LOCAL = OpCode.GET_LOCAL.value
+SET_LOCAL = OpCode.SET_LOCAL.value
+DEFINE_LOCAL = OpCode.DEFINE_LOCAL.value
+GET_CELL = OpCode.GET_CELL.value
+SET_CELL = OpCode.SET_CELL.value
+MAKE_CELL = OpCode.MAKE_CELL.value
+NEW_CELL = OpCode.NEW_CELL.value
+GET_UPVALUE = OpCode.GET_UPVALUE.value
+SET_UPVALUE = OpCode.SET_UPVALUE.value
+GET_GLOBAL = OpCode.GET_GLOBAL.value
+SET_GLOBAL = OpCode.SET_GLOBAL.value
+DEFINE_GLOBAL = OpCode.DEFINE_GLOBAL.value
+GET_PROPERTY = OpCode.GET_PROPERTY.value
+SET_PROPERTY = OpCode.SET_PROPERTY.value
+GET_SUPER = OpCode.GET_SUPER.value
+CHECK_INSTANCE = OpCode.CHECK_INSTANCE.value
+STEP_PROPERTY = OpCode.STEP_PROPERTY.value
+ADD = OpCode.ADD.value
+SUBTRACT = OpCode.SUBTRACT.value
+MULTIPLY = OpCode.MULTIPLY.value
+DIVIDE = OpCode.DIVIDE.value
+MODULO = OpCode.MODULO.value
+GREATER = OpCode.GREATER.value
+GREATER_EQUAL = OpCode.GREATER_EQUAL.value
+LESS = OpCode.LESS.value
+LESS_EQUAL = OpCode.LESS_EQUAL.value
+EQUAL = OpCode.EQUAL.value
+NOT_EQUAL = OpCode.NOT_EQUAL.value
+NOT = OpCode.NOT.value
+NEGATE = OpCode.NEGATE.value
+CHECK_NUMBER = OpCode.CHECK_NUMBER.value
+INCREMENT = OpCode.INCREMENT.value
+DECREMENT = OpCode.DECREMENT.value
+ADD_ASSIGN = OpCode.ADD_ASSIGN.value
+SUBTRACT_ASSIGN = OpCode.SUBTRACT_ASSIGN.value
+MULTIPLY_ASSIGN = OpCode.MULTIPLY_ASSIGN.value
+DIVIDE_ASSIGN = OpCode.DIVIDE_ASSIGN.value
+JUMP = OpCode.JUMP.value
+JUMP_IF_FALSE = OpCode.JUMP_IF_FALSE.value
+JUMP_IF_FALSE_KEEP = OpCode.JUMP_IF_FALSE_KEEP.value
+JUMP_IF_TRUE_KEEP = OpCode.JUMP_IF_TRUE_KEEP.value
+MATCH = OpCode.MATCH.value
+YIELD = OpCode.YIELD.value
+GET_ITER = OpCode.GET_ITER.value
+FOR_ITER = OpCode.FOR_ITER.value
+CALL = OpCode.CALL.value
+CLOSURE = OpCode.CLOSURE.value
+RETURN = OpCode.RETURN.value
+CHECK_SUPERCLASS = OpCode.CHECK_SUPERCLASS.value
+CLASS = OpCode.CLASS.value
+ECHO = OpCode.ECHO.value
+NOP = OpCode.NOP.value
+
+
+class VM(Interpreter):
+    """Stack based bytecode interpreter.
+
+    Shares the globals, natives and value semantics of the tree walking
+    Interpreter but executes the output of vm.compiler.Compiler. Plox calls
+    do not recurse on the Python stack, every frame lives in `frames`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stack: list = []
+
+    def interpret(self, statements):
+        script = Compiler().compile(statements)
+        try:
+            self.run(Closure(script, []), [None] * script.slot_count)
+        except PloxRuntimeError as error:
+            self.stack.clear()
+            runtime_error(error)
+
+    def resolve(self, expression: expr.Expr, depth: int, slot: int):
+        # The compiler assigns frame slots itself.
+        pass
+
+    def call_closure(self, closure: Closure, receiver, arguments: list):
+        return self.run(closure, self.frame_slots(closure, receiver, arguments))
+
+    def start_generator(self, closure: Closure, receiver, arguments: list):
+        slots = self.frame_slots(closure, receiver, arguments)
+        name = closure.function.name
+        return PloxGenerator(
+            "Anonymous" if name is None else name,
+            GeneratorFrame(self, closure, slots),
+        )
+
+    def frame_slots(self, closure: Closure, receiver, arguments: list) -> list:
+        function = closure.function
+        slots = [receiver, *arguments, *function.padding]
+        for slot in function.cell_params:
+            slots[slot] = Cell(slots[slot])
+        return slots
+
+    def run(
+        self, closure: Closure, slots: list, generator: GeneratorFrame | None = None
+    ) -> Any:
+        """Runs closure until it returns, or, for the frame of a generator,
+        until it returns or yields."""
+        stack = self.stack
+        globals = self.globals.cells
+        define_global = self.globals.define
+        frames = []
+
+        code = closure.function.chunk.code
+        constants = closure.function.chunk.constants
+        upvalues = closure.upvalues
+        base = len(stack)
+        ip = 0
+        if generator is not None:
+            ip = generator.ip
+            generator.ip = None
+            stack.extend(generator.stack)
+
+        while True:
+            op = code[ip]
+            arg = code[ip + 1]
+            ip += 2
+
+            if op == GET_LOCAL:
+                stack.append(slots[arg])
+            elif op == CONSTANT:
+                stack.append(constants[arg])
+            elif op == GET_GLOBAL:
+                cell = globals.get(constants[arg])
+                if cell is None or cell.value is UNDEFINED:
+                    self.undefined_variable(closure, ip, constants[arg])
+                stack.append(cell.value)
+            elif op == SET_LOCAL:
+                slots[arg] = stack[-1]
+            elif op == POP:
+                stack.pop()
+            elif op == JUMP_IF_FALSE:
+                value = stack.pop()
+                if value is None or value is False:
+                    ip = arg
+            elif op == LESS:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left < right
+            elif op == ADD:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is float and type(right) is float:
+                    stack[-1] = left + right
+                elif isinstance(left, str) or isinstance(right, str):
+                    stack[-1] = str(left) + str(right)
+                else:
+                    raise PloxRuntimeError(
+                        self.token(closure, ip),
+                        "Operands must be two numbers or two strings.",
+                    )
+            elif op == SUBTRACT:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left - right
+            elif op == JUMP:
+                ip = arg
+            elif op == FOR_ITER:
+                try:
+                    item = next(stack[-1], UNDEFINED)
+                except ValueError as error:
+                    self.reentered(error, self.token(closure, ip))
+                if item is UNDEFINED:
+                    ip = arg
+                else:
+                    stack.append(item)
+            elif op == SET_GLOBAL:
+                name = constants[arg]
+                cell = globals.get(name)
+                if cell is None or cell.value is UNDEFINED:
+                    self.undefined_variable(closure, ip, name)
+                cell.value = stack[-1]
+            elif op == DEFINE_LOCAL:
+                slots[arg] = stack.pop()
+            elif op == CALL:
+                callee = stack[-arg - 1]
+                kind = type(callee)
+                if kind is Closure:
+                    receiver = callee
+                elif kind is BoundMethod:
+                    receiver = callee.receiver
+                    callee = callee.method
+                elif kind is PloxClass:
+                    receiver = PloxInstance(callee)
+                    initializer = callee.find_method("init")
+                    if initializer is None:
+                        if arg != 0:
+                            self.arity_error(closure, ip, 0, arg)
+                        stack[-1] = receiver
+                        continue
+                    callee = initializer
+                elif isinstance(callee, PloxCallable):
+                    arguments = stack[len(stack) - arg :]
+                    if arg != callee.arity():
+                        self.arity_error(closure, ip, callee.arity(), arg)
+                    del stack[-arg - 1 :]
+                    stack.append(callee.call(self, arguments))
+                    continue
+                else:
+                    raise PloxRuntimeError(
+                        self.token(closure, ip), "Can only call functions and classes."
+                    )
+
+                function = callee.function
+                if arg != function.arity:
+                    self.arity_error(closure, ip, function.arity, arg)
+
+                if len(frames) == FRAMES_MAX:
+                    raise PloxRuntimeError(self.token(closure, ip), "Stack overflow.")
+                frames.append((closure, code, constants, upvalues, ip, slots, base))
+                slots = stack[-arg - 1 :]
+                del stack[-arg - 1 :]
+                slots[0] = receiver
+                slots += function.padding
+                for slot in function.cell_params:
+                    slots[slot] = Cell(slots[slot])
+
+                closure = callee
+                code = function.chunk.code
+                constants = function.chunk.constants
+                upvalues = callee.upvalues
+                base = len(stack)
+                ip = 0
+            elif op == RETURN:
+                result = stack.pop()
+                del stack[base:]
+                if not frames:
+                    return result
+                closure, code, constants, upvalues, ip, slots, base = frames.pop()
+                stack.append(result)
+            elif op == GET_UPVALUE:
+                stack.append(upvalues[arg].value)
+            elif op == GET_CELL:
+                stack.append(slots[arg].value)
+            elif op == INCREMENT:
+                if type(stack[-1]) is not float:
+                    self.operand_error(closure, ip)
+                stack[-1] += 1
+            elif op == DECREMENT:
+                if type(stack[-1]) is not float:
+                    self.operand_error(closure, ip)
+                stack[-1] -= 1
+            elif op == GET_PROPERTY:
+                obj = stack[-1]
+                if not isinstance(obj, PloxInstance):
+                    raise PloxRuntimeError(
+                        constants[arg], "Only instances have properties."
+                    )
+                stack[-1] = obj.get(constants[arg])
+            elif op == MULTIPLY:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left * right
+            elif op == SET_PROPERTY:
+                value = stack.pop()
+                stack[-1].set(constants[arg], value)
+                stack[-1] = value
+            elif op == STEP_PROPERTY:
+                name, step, prefix = constants[arg]
+                obj = stack[-1]
+                if not isinstance(obj, PloxInstance):
+                    raise PloxRuntimeError(name, "Only instances have properties.")
+                value = obj.get(name)
+                if type(value) is not float:
+                    self.operand_error(closure, ip)
+                obj.fields[name.symbol] = value + step
+                stack[-1] = value + step if prefix else value
+            elif op == CHECK_INSTANCE:
+                if not isinstance(stack[-1], PloxInstance):
+                    raise PloxRuntimeError(
+                        self.token(closure, ip), "Only instances have fields."
+                    )
+            elif op == SET_UPVALUE:
+                upvalues[arg].value = stack[-1]
+            elif op == SET_CELL:
+                slots[arg].value = stack[-1]
+            elif op == MAKE_CELL:
+                slots[arg] = Cell(stack.pop())
+            elif op == EQUAL:
+                right = stack.pop()
+                stack[-1] = stack[-1] == right
+            elif op == NOT_EQUAL:
+                right = stack.pop()
+                stack[-1] = not stack[-1] == right
+            elif op == GREATER:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left > right
+            elif op == GREATER_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left >= right
+            elif op == LESS_EQUAL:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left <= right
+            elif op == DIVIDE:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                if left == 0 or right == 0:
+                    self.zero_division_error(closure, ip)
+                stack[-1] = left / right
+            elif op == MODULO:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left % right
+            elif op == NOT:
+                value = stack[-1]
+                stack[-1] = value is None or value is False
+            elif op == NEGATE:
+                if type(stack[-1]) is not float:
+                    self.operand_error(closure, ip)
+                stack[-1] = -stack[-1]
+            elif op == JUMP_IF_FALSE_KEEP:
+                value = stack[-1]
+                if value is None or value is False:
+                    ip = arg
+            elif op == JUMP_IF_TRUE_KEEP:
+                value = stack[-1]
+                if value is not None and value is not False:
+                    ip = arg
+            elif op == MATCH:
+                targets, default = constants[arg]
+                ip = targets.get(stack.pop(), default)
+            elif op == CHECK_NUMBER:
+                if type(stack[-1]) is not float:
+                    self.operand_error(closure, ip)
+            elif op == DUP:
+                stack.append(stack[-1])
+            elif op == ADD_ASSIGN:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left + right
+            elif op == SUBTRACT_ASSIGN:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left - right
+            elif op == MULTIPLY_ASSIGN:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                stack[-1] = left * right
+            elif op == DIVIDE_ASSIGN:
+                right = stack.pop()
+                left = stack[-1]
+                if type(left) is not float or type(right) is not float:
+                    self.operands_error(closure, ip)
+                if left == 0 or right == 0:
+                    self.zero_division_error(closure, ip)
+                stack[-1] = left / right
+            elif op == CLOSURE:
+                function = constants[arg]
+                stack.append(
+                    (GeneratorClosure if function.generator else Closure)(
+                        function,
+                        [
+                            slots[index] if is_local else upvalues[index]
+                            for is_local, index in function.captures
+                        ],
+                    )
+                )
+            elif op == NEW_CELL:
+                slots[arg] = Cell()
+            elif op == DEFINE_GLOBAL:
+                define_global(constants[arg], stack.pop())
+            elif op == GET_SUPER:
+                superclass = stack.pop()
+                name = constants[arg]
+                method = superclass.find_method(name.symbol)
+                if method is None:
+                    raise PloxRuntimeError(name, f"undefined property '{name.symbol}'.")
+                stack[-1] = method.bind(stack[-1])
+            elif op == YIELD:
+                # Only ever runs in the frame of the generator, the first of
+                # this run.
+                generator.ip = ip
+                value = stack.pop()
+                generator.stack = stack[base:]
+                del stack[base:]
+                return value
+            elif op == GET_ITER:
+                stack[-1] = self.iterate(stack[-1], self.token(closure, ip))
+            elif op == CHECK_SUPERCLASS:
+                if not isinstance(stack[-1], PloxClass):
+                    raise PloxRuntimeError(
+                        self.token(closure, ip), "superclass must be a class."
+                    )
+            elif op == CLASS:
+                info = constants[arg]
+                count = len(info.methods)
+                methods = dict(zip(info.methods, stack[len(stack) - count :]))
+                if count:
+                    del stack[-count:]
+                stack[-1] = PloxClass(info.name.symbol, methods, stack[-1])
+            elif op == ECHO:
+                print(self.stringify(stack.pop()))
+            elif op == NOP:
+                pass
+            else:
+                raise RuntimeError(f"Unknown opcode {op}.")
+
+    def token(self, closure: Closure, ip: int):
+        return closure.function.chunk.tokens[ip - 2]
+
+    def operand_error(self, closure: Closure, ip: int):
+        raise PloxRuntimeError(self.token(closure, ip), "Operand must be a number")
+
+    def operands_error(self, closure: Closure, ip: int):
+        raise PloxRuntimeError(self.token(closure, ip), "Operands must be numbers")
+
+    def zero_division_error(self, closure: Closure, ip: int):
+        raise PloxRuntimeError(self.token(closure, ip), "Trying to devide by Zero.")
+
+    def arity_error(self, closure: Closure, ip: int, expected: int, got: int):
+        raise PloxRuntimeError(
+            self.token(closure, ip), f"Expected {expected} arguments but got {got}."
+        )
+
+    def undefined_variable(self, closure: Closure, ip: int, name: str):
+        raise PloxRuntimeError(self.token(closure, ip), f"Undefined variable '{name}'.")
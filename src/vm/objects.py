@@ -0,0 +1,101 @@
+from typing import Any
+
+from objects.callable import PloxCallable
+
+from vm.chunk import Function
+
+
+class Cell:
+    __slots__ = ("value",)
+
+    def __init__(self, value=None) -> None:
+        self.value = value
+
+
+class Closure(PloxCallable):
+    def __init__(self, function: Function, upvalues: list[Cell]) -> None:
+        self.function = function
+        self.upvalues = upvalues
+
+    def arity(self) -> Any:
+        return self.function.arity
+
+    def call(self, interpreter, arguments: list):
+        return interpreter.call_closure(self, self, arguments)
+
+    def bind(self, instance):
+        return BoundMethod(instance, self)
+
+    def __str__(self) -> str:
+        return repr(self.function)
+
+    def __repr__(self) -> str:
+        return repr(self.function)
+
+
+class GeneratorClosure(Closure):
+    """A closure over a function whose body yields. Calling it gives back a
+    generator instead of running the body."""
+
+    def call(self, interpreter, arguments: list):
+        return interpreter.start_generator(self, self, arguments)
+
+    def bind(self, instance):
+        return BoundGenerator(instance, self)
+
+
+class BoundMethod(PloxCallable):
+    def __init__(self, receiver, method: Closure) -> None:
+        self.receiver = receiver
+        self.method = method
+
+    def arity(self) -> Any:
+        return self.method.function.arity
+
+    def call(self, interpreter, arguments: list):
+        return interpreter.call_closure(self.method, self.receiver, arguments)
+
+    def __str__(self) -> str:
+        return repr(self.method.function)
+
+    def __repr__(self) -> str:
+        return repr(self.method.function)
+
+
+class BoundGenerator(BoundMethod):
+    def call(self, interpreter, arguments: list):
+        return interpreter.start_generator(self.method, self.receiver, arguments)
+
+
+class GeneratorFrame:
+    """The frame of a generator call while it is suspended: its slots, the
+    instruction to resume at and the part of the stack it had. Every item
+    asked for runs the call up to its next YIELD, ip is None once it
+    returned. Like a Python generator it can't be asked while it runs."""
+
+    __slots__ = ("vm", "closure", "slots", "ip", "stack", "running")
+
+    def __init__(self, vm, closure: Closure, slots: list) -> None:
+        self.vm = vm
+        self.closure = closure
+        self.slots = slots
+        self.ip = 0
+        self.stack: list = []
+        self.running = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.running:
+            raise ValueError("generator already executing")
+        if self.ip is None:
+            raise StopIteration
+        self.running = True
+        try:
+            value = self.vm.run(self.closure, self.slots, self)
+        finally:
+            self.running = False
+        if self.ip is None:
+            raise StopIteration
+        return value
@@ -0,0 +1,82 @@
+from enum import IntEnum, auto
+
+
+class OpCode(IntEnum):
+    # Every instruction is two words wide: the opcode followed by one
+    # operand (0 when the instruction takes none).
+
+    # Constants and stack.
+    CONSTANT = auto()
+    POP = auto()
+    DUP = auto()
+
+    # Variables.
+    GET_LOCAL = auto()
+    SET_LOCAL = auto()
+    DEFINE_LOCAL = auto()
+    GET_CELL = auto()
+    SET_CELL = auto()
+    MAKE_CELL = auto()
+    NEW_CELL = auto()
+    GET_UPVALUE = auto()
+    SET_UPVALUE = auto()
+    GET_GLOBAL = auto()
+    SET_GLOBAL = auto()
+    DEFINE_GLOBAL = auto()
+
+    # Properties.
+    GET_PROPERTY = auto()
+    SET_PROPERTY = auto()
+    GET_SUPER = auto()
+    CHECK_INSTANCE = auto()
+    # ++ and -- on a field, the operand is a (name, step, prefix) constant.
+    STEP_PROPERTY = auto()
+
+    # Operators.
+    ADD = auto()
+    SUBTRACT = auto()
+    MULTIPLY = auto()
+    DIVIDE = auto()
+    MODULO = auto()
+    GREATER = auto()
+    GREATER_EQUAL = auto()
+    LESS = auto()
+    LESS_EQUAL = auto()
+    EQUAL = auto()
+    NOT_EQUAL = auto()
+    NOT = auto()
+    NEGATE = auto()
+    CHECK_NUMBER = auto()
+    INCREMENT = auto()
+    DECREMENT = auto()
+    ADD_ASSIGN = auto()
+    SUBTRACT_ASSIGN = auto()
+    MULTIPLY_ASSIGN = auto()
+    DIVIDE_ASSIGN = auto()
+
+    # Control flow.
+    JUMP = auto()
+    JUMP_IF_FALSE = auto()
+    JUMP_IF_FALSE_KEEP = auto()
+    JUMP_IF_TRUE_KEEP = auto()
+    # Pops a value and jumps through a jump table, the operand is a
+    # (targets by value, default target) constant.
+    MATCH = auto()
+    # Replaces the value on top with its Python iterator for a for-in loop.
+    GET_ITER = auto()
+    # Pushes the next item of the iterator on top, or jumps to the operand
+    # once it is exhausted, leaving the iterator for the POP there.
+    FOR_ITER = auto()
+
+    # Functions and classes.
+    CALL = auto()
+    CLOSURE = auto()
+    RETURN = auto()
+    # Suspends the generator running in this frame, handing out the value
+    # on top.
+    YIELD = auto()
+    CHECK_SUPERCLASS = auto()
+    CLASS = auto()
+
+    ECHO = auto()
+    NOP = auto()
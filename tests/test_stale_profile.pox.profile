@@ -0,0 +1,7 @@
+{
+ "sites": {
+  "5:25": 1,
+  "7:40": "float float"
+ },
+ "source": "0000000000000000000000000000000000000000000000000000000000000000"
+}